@@ -7,11 +7,18 @@
 
 import sys
 import os
-import re
 import json
+import time
 import subprocess
+import importlib.util
 from pathlib import Path
-from datetime import datetime
+
+# وحدات الفحص الخفيفة التي تحتاجها النافذة عند ظهورها؛ وبقية الوحدات (القاموس، الذاكرة،
+# قاعدة النتائج، التقارير، القياس...) تستورد حيث تستعمل حتى لا تؤخر فتح النافذة
+from style_checker.aggregate import ErrorSummary
+from style_checker.incremental import scan_paragraph, update_matches
+from style_checker.matcher import OVERLAP_ALL, OVERLAP_LABELS, OVERLAP_LONGEST, OVERLAP_POLICIES, make_error
+from style_checker.normalize import DEFAULT_NORMALIZER
 
 # محاولة استيراد المكتبات المطلوبة
 try:
@@ -19,22 +26,24 @@ try:
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
         QPushButton, QTextEdit, QLabel, QFileDialog, QMessageBox,
         QSplitter, QToolBar, QStatusBar, QMenuBar, QMenu, QSizePolicy,
-        QListWidget, QListWidgetItem
+        QListView, QProgressBar, QDialog, QDialogButtonBox, QPlainTextEdit
+    )
+    from PyQt6.QtCore import (
+        Qt, QSize, QThread, QTimer, QAbstractListModel, QModelIndex, QSettings, QFileSystemWatcher,
+        pyqtSignal
+    )
+    from PyQt6.QtGui import (
+        QFont, QColor, QPalette, QAction, QActionGroup, QKeySequence, QTextBlockUserData,
+        QSyntaxHighlighter, QTextCharFormat
     )
-    from PyQt6.QtCore import Qt, QSize
-    from PyQt6.QtGui import QFont, QColor, QPalette, QAction, QKeySequence
     PYQT6_AVAILABLE = True
 except ImportError:
     PYQT6_AVAILABLE = False
     print("❌ PyQt6 غير مثبت. قم بتثبيته باستخدام: pip install PyQt6")
 
-try:
-    from docx import Document
-    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-    from docx.shared import RGBColor, Pt
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# ملفات Word تقرأ دون python-docx، ولا تحتاجها إلا قالب تقرير Word، فيكفي التحقق من توفرها
+# دون استيرادها (استيرادها مع lxml يكلف عشرات المللي ثانية عند البدء)
+DOCX_AVAILABLE = importlib.util.find_spec('docx') is not None
 
 # ألوان رمادية
 COLORS = {
@@ -51,44 +60,559 @@ COLORS = {
     'success': '#006400'             # لون النجاح
 }
 
+# حجم الجزء الذي يفحصه الخيط الخلفي قبل إرسال دفعة النتائج (بالأحرف)
+CHECK_CHUNK_SIZE = 16384
+
+# الفحص أثناء الكتابة: التعديلات الأكبر من هذا الحد (لصق أو استيراد) تُفحص كاملة في الخلفية
+LIVE_CHECK_MAX_SPAN = 20000
+LIVE_CHECK_DELAY = 500  # مللي ثانية بعد آخر تعديل كبير
+
+# البحث عن corrections.json في المجلدات الفرعية محدود العمق والعدد حتى لا يطول على مجلدات الشبكة
+CORRECTIONS_SEARCH_DEPTH = 3
+CORRECTIONS_SEARCH_MAX_DIRS = 500
+CORRECTIONS_SEARCH_SKIP = {'.git', '__pycache__', 'node_modules', '.venv', 'venv'}
+
+# إعادة تحميل القاموس بعد تعديله: تُجمع تنبيهات الحفظ المتتالية في إعادة واحدة
+DICTIONARY_RELOAD_DELAY = 300  # مللي ثانية
+
+
+class BlockErrors(QTextBlockUserData):
+    """مطابقات فقرة واحدة بمواضع نسبية إلى بداية الفقرة
+
+    revision رقم مراجعة الفقرة عند فحصها؛ إذا اختلف عن مراجعتها الحالية فالمطابقات قديمة.
+    """
+
+    def __init__(self, matches, revision):
+        super().__init__()
+        self.matches = matches
+        self.revision = revision
+
+
+class ErrorHighlighter(QSyntaxHighlighter):
+    """تسطير الأخطاء داخل النص فقرةً فقرة
+
+    تُرسم الفقرات من مطابقاتها المحفوظة، ولا يعاد فحص فقرة إلا إذا عُدلت بعد آخر فحص.
+    الفقرات التي لم تُفحص بعد تُترك دون تسطير حتى لا يتحول التمييز إلى فحص كامل.
+    """
+
+    def __init__(self, document, checker):
+        super().__init__(document)
+        self.checker = checker
+        self.error_format = QTextCharFormat()
+        self.error_format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+        self.error_format.setUnderlineColor(QColor(COLORS['error']))
+
+    def highlightBlock(self, text):
+        block = self.currentBlock()
+        data = block.userData()
+        if not isinstance(data, BlockErrors):
+            return
+        if data.revision == block.revision():
+            matches = data.matches
+        elif self.checker.matcher is not None:
+            matches = scan_paragraph(self.checker.matcher, text, self.checker.overlap)
+        else:
+            return
+        for start, end, correct, word in matches:
+            self.setFormat(start, end - start, self.error_format)
+
+
+class ErrorListModel(QAbstractListModel):
+    """نموذج قائمة الأخطاء: صف لكل كلمة يُبنى نصه عند عرضه فقط"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.summary = ErrorSummary()
+        self.rows = []
+        self.row_of = {}
+        self.sort_by_count = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.summary.get(self.rows[index.row()])
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"❌ {entry.word} → {entry.correct} (التكرار: {entry.count})"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{entry.context}\nالقاموس: {entry.layer}" if entry.layer else entry.context
+        if role == Qt.ItemDataRole.UserRole:
+            return entry.word
+        return None
+
+    def reset(self, summary):
+        """استبدال التجميع كاملاً"""
+        self.beginResetModel()
+        self.summary = summary
+        entries = summary.by_count() if self.sort_by_count else summary
+        self.rows = [entry.word for entry in entries]
+        self.row_of = {word: row for row, word in enumerate(self.rows)}
+        self.endResetModel()
+
+    def set_sort_by_count(self, enabled):
+        """الترتيب حسب التكرار أو حسب أول اكتشاف"""
+        self.sort_by_count = enabled
+        self.reset(self.summary)
+
+    def add_errors(self, errors):
+        """إضافة دفعة من الأخطاء: صفوف للكلمات الجديدة وتحديث تكرار الموجودة"""
+        old_count = len(self.rows)
+        new_words = []
+        for error in errors:
+            if self.summary.add(error).count == 1:
+                new_words.append(error['word'])
+        if old_count:
+            self.dataChanged.emit(self.index(0), self.index(old_count - 1))
+        if new_words:
+            self.beginInsertRows(QModelIndex(), old_count, old_count + len(new_words) - 1)
+            for word in new_words:
+                self.row_of[word] = len(self.rows)
+                self.rows.append(word)
+            self.endInsertRows()
+
+    def adjust(self, word, correct, delta):
+        """تعديل تكرار كلمة واحدة (للفحص أثناء الكتابة)"""
+        entry = self.summary.adjust(word, correct, delta)
+        row = self.row_of.get(word)
+        if entry is None:
+            if row is not None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                del self.row_of[word]
+                for index in range(row, len(self.rows)):
+                    self.row_of[self.rows[index]] = index
+                self.endRemoveRows()
+        elif row is None:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows))
+            self.row_of[word] = len(self.rows)
+            self.rows.append(word)
+            self.endInsertRows()
+        else:
+            self.dataChanged.emit(self.index(row), self.index(row))
+
+
+class CheckThread(QThread):
+    """فحص النص في خيط خلفي وإرسال الأخطاء على دفعات"""
+    errors_found = pyqtSignal(list)
+    progress = pyqtSignal(int)
+    check_finished = pyqtSignal(bool)
+
+    def __init__(self, matcher, text, overlap, cache=None, profile=None, parent=None):
+        super().__init__(parent)
+        self.matcher = matcher
+        self.text = text
+        self.overlap = overlap
+        self.cache = cache
+        self.profile = profile
+        self._cancelled = False
+
+    def cancel(self):
+        """طلب إيقاف الفحص (يُستدعى من الخيط الرئيسي)"""
+        self._cancelled = True
+
+    def run(self):
+        """الفحص، داخل التقاط ملف التعريف إن طُلب (cProfile يلتقط خيط الفحص وحده)"""
+        check = self.check if self.cache is None else self.check_cached
+        if self.profile is None:
+            check()
+        else:
+            with self.profile.capturing():
+                check()
+        self.progress.emit(100)
+        self.check_finished.emit(self._cancelled)
+
+    def check(self):
+        """فحص النص جزءاً جزءاً مع إرسال ما وُجد بعد كل جزء"""
+        text = self.text
+        batch = []
+
+        def chunks():
+            for start in range(0, len(text), CHECK_CHUNK_SIZE):
+                if batch:
+                    self.errors_found.emit(list(batch))
+                    batch.clear()
+                self.progress.emit(start * 100 // len(text))
+                if self._cancelled:
+                    return
+                yield text[start:start + CHECK_CHUNK_SIZE]
+
+        from style_checker.streaming import iter_errors
+        for error in iter_errors(self.matcher, chunks(), overlap=self.overlap, profile=self.profile):
+            batch.append(error)
+
+        if batch:
+            self.errors_found.emit(batch)
+
+    def check_cached(self):
+        """الفحص مع ذاكرة النتائج: المستند أو فقراته غير المعدلة لا تفحص من جديد"""
+        from style_checker.cache import iter_cached_batches
+        from style_checker.profiling import STAGE_MATCH
+        text = self.text
+        profile = self.profile
+        started = time.perf_counter()
+        for done, errors in iter_cached_batches(self.matcher, text, self.cache, self.overlap):
+            if errors:
+                self.errors_found.emit(errors)
+                if profile is not None:
+                    profile.count_matches(errors)
+            self.progress.emit(done * 100 // max(len(text), 1))
+            if self._cancelled:
+                break
+        if profile is not None:
+            # التوحيد والمطابقة والرجوع إلى الذاكرة متداخلة هنا فتحتسب معاً
+            profile.add(STAGE_MATCH, time.perf_counter() - started)
+            profile.chars += len(text)
+            profile.bytes += len(text.encode('utf-8', 'surrogatepass'))
+
+
+def find_corrections_path(directory, cached=None):
+    """مسار corrections.json: بجانب البرنامج، ثم آخر مسار محفوظ، ثم بحث محدود في المجلدات الفرعية"""
+    corrections_path = os.path.join(directory, 'corrections.json')
+    if os.path.exists(corrections_path):
+        return corrections_path
+    if cached and os.path.exists(cached):
+        return cached
+    
+    visited = 0
+    for root, dirs, files in os.walk(directory):
+        if 'corrections.json' in files:
+            return os.path.join(root, 'corrections.json')
+        visited += 1
+        if visited >= CORRECTIONS_SEARCH_MAX_DIRS:
+            break
+        if root[len(directory):].count(os.sep) >= CORRECTIONS_SEARCH_DEPTH - 1:
+            dirs.clear()
+        else:
+            dirs[:] = sorted(name for name in dirs
+                             if name not in CORRECTIONS_SEARCH_SKIP and not name.startswith('.'))
+    return None
+
+
+class DictionaryLoadThread(QThread):
+    """البحث عن ملف التصحيحات وتحميله في الخلفية بعد ظهور النافذة"""
+    loaded = pyqtSignal(object, str, float)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, directory, cached_path, normalizer, layers=(), parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.cached_path = cached_path
+        self.normalizer = normalizer
+        self.layers = layers
+
+    def run(self):
+        file_path = find_corrections_path(self.directory, self.cached_path)
+        if file_path is None:
+            self.failed.emit('', '')
+            return
+        try:
+            from style_checker.dictionary import load_dictionary
+            started = time.perf_counter()
+            matcher = load_dictionary(file_path, normalizer=self.normalizer, layers=self.layers)
+            self.loaded.emit(matcher, file_path, time.perf_counter() - started)
+        except Exception as e:
+            self.failed.emit(file_path, str(e))
+
+
+class DictionaryReloadThread(QThread):
+    """إعادة تحميل ملف التصحيحات المعدل في الخلفية؛ المحرك القائم لا يمس"""
+    reloaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, matcher, file_path, layers=(), parent=None):
+        super().__init__(parent)
+        self.matcher = matcher
+        self.file_path = file_path
+        self.layers = layers
+
+    def run(self):
+        try:
+            from style_checker.dictionary import reload_dictionary
+            self.reloaded.emit(reload_dictionary(self.matcher, self.file_path, layers=self.layers))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class ProfileDialog(QDialog):
+    """تقرير قياسات آخر فحص مع حفظه بصيغة JSON"""
+
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.profile = profile
+        self.setWindowTitle("تقرير أداء الفحص")
+        self.resize(760, 560)
+        
+        layout = QVBoxLayout(self)
+        report = QPlainTextEdit(profile.format(top=25))
+        report.setReadOnly(True)
+        report.setFont(QFont("Courier New", 10))
+        layout.addWidget(report)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        save_button = buttons.addButton("حفظ JSON", QDialogButtonBox.ButtonRole.ActionRole)
+        save_button.clicked.connect(self.save_json)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+    
+    def save_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "حفظ القياسات", "profile.json", "JSON (*.json)")
+        if file_path:
+            try:
+                self.profile.dump(file_path)
+            except OSError as e:
+                QMessageBox.critical(self, "خطأ", f"فشل في حفظ الملف:\n{str(e)}")
+
 
 class StyleCheckerApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.corrections = {}
         self.wrong_words = set()
+        self.matcher = None
+        self.normalizer = DEFAULT_NORMALIZER
+        # المداخل المتداخلة تحتسب مرة واحدة حتى تطابق الأعداد ما يطبقه التصحيح
+        self.overlap = OVERLAP_LONGEST
+        # ذاكرة النتائج مفعلة افتراضياً، وتفتح عند أول فحص لا عند البدء
+        self.use_result_cache = True
+        self.result_cache = None
+        # قياس الأداء: معطل افتراضياً، وإذا فعّل سجل كل فحص في Profile خاص به
+        self.profiling = False
+        self.profile_capture = None
+        self.profile = None
+        self.load_seconds = 0.0
         self.errors = []
+        self.jump_word = None
+        self.jump_index = 0
         self.corrections_file_path = None
-        
-        # البحث عن ملف التصحيحات تلقائياً
-        self.find_corrections_file()
+        self.check_thread = None
+        self.check_offset = 0
+        self.check_silent = False
+        self.check_revision = 0
+        self.dictionary_thread = None
+        self.check_after_load = False
+        self.settings = QSettings('aslobi', 'aslobi')
+        # قاعدة نتائج الفحص: يسجل فيها كل فحص كامل لمستند مستورد إذا فعّلت
+        self.document_path = None
+        self.result_store = None
+        if self.settings.value('store_results', False, bool):
+            self.result_store = self.open_result_store()
+        # طبقات القواميس فوق الأساسي (الدار، المشروع...)، والأخيرة أعلاها أولوية
+        self.layers = self.read_layers()
+        
+        # مراقبة ملف التصحيحات وإعادة تحميله عند تعديله
+        self.auto_reload = True
+        self.reload_thread = None
+        self.reload_pending = False
+        self.dictionary_watcher = QFileSystemWatcher(self)
+        self.dictionary_watcher.fileChanged.connect(self.on_dictionary_file_changed)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(DICTIONARY_RELOAD_DELAY)
+        self.reload_timer.timeout.connect(self.reload_dictionary)
+        
+        # حالة الفحص أثناء الكتابة
+        self.live_check = False
+        self.live_ready = False
+        self.live_total = 0
+        self.live_block_count = 0
+        self.errors_stale = False
         
         self.init_ui()
         self.setup_gray_theme()
         
+        # البحث عن ملف التصحيحات تلقائياً
+        self.find_corrections_file()
+        
     def find_corrections_file(self):
-        """البحث عن ملف التصحيحات في المجلد الحالي"""
+        """البحث عن ملف التصحيحات وتحميله في الخلفية بعد ظهور النافذة"""
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        corrections_path = os.path.join(current_dir, 'corrections.json')
-        
-        if os.path.exists(corrections_path):
-            self.corrections_file_path = corrections_path
-            self.load_corrections(corrections_path)
+        self.dictionary_thread = DictionaryLoadThread(
+            current_dir, self.settings.value('corrections_path', '', str), self.normalizer, self.layers, self)
+        self.dictionary_thread.loaded.connect(self.on_dictionary_loaded)
+        self.dictionary_thread.failed.connect(self.on_dictionary_failed)
+        self.dictionary_thread.finished.connect(self.dictionary_thread.deleteLater)
+        self.statusBar().showMessage("جارٍ تحميل القاموس...")
+        # يبدأ مع حلقة الأحداث حتى لا يزاحم البحثُ والترجمة أولَ رسم للنافذة
+        QTimer.singleShot(0, self.dictionary_thread.start)
+    
+    def on_dictionary_loaded(self, matcher, file_path, elapsed):
+        """اعتماد القاموس المحمّل في الخلفية"""
+        if self.sender() is not self.dictionary_thread:
+            return
+        self.dictionary_thread = None
+        self.corrections_file_path = file_path
+        self.settings.setValue('corrections_path', file_path)
+        self.watch_dictionary(file_path)
+        if matcher.normalizer != self.normalizer:
+            # تغير خيار التوحيد أثناء التحميل
+            self.load_corrections(file_path)
         else:
-            # البحث في المجلدات الفرعية
-            for root, dirs, files in os.walk(current_dir):
-                if 'corrections.json' in files:
-                    self.corrections_file_path = os.path.join(root, 'corrections.json')
-                    self.load_corrections(self.corrections_file_path)
-                    break
-        
+            self.set_matcher(matcher, elapsed)
+        if self.check_after_load:
+            self.check_after_load = False
+            self.check_text()
+    
+    def on_dictionary_failed(self, file_path, message):
+        """لم يوجد ملف التصحيحات أو تعذر تحميله"""
+        if self.sender() is not self.dictionary_thread:
+            return
+        self.dictionary_thread = None
+        self.check_after_load = False
+        if file_path:
+            QMessageBox.warning(self, "تحذير", f"فشل في تحميل ملف التصحيحات:\n{message}")
+        else:
+            self.statusBar().showMessage("لم يعثر على corrections.json، حمّله من قائمة الملفات", 5000)
+    
+    def set_matcher(self, matcher, elapsed):
+        """اعتماد محرك مطابقة محمّل"""
+        self.matcher = matcher
+        self.corrections = matcher.corrections
+        self.wrong_words = set(self.corrections.keys())
+        self.load_seconds = elapsed
+        enabled = sum(layer.enabled for layer in self.layers)
+        self.statusBar().showMessage(
+            f"تم تحميل {len(self.corrections)} تصحيح" + (f" من {enabled + 1} قواميس" if enabled else ''), 3000)
+        
+    def watch_dictionary(self, file_path):
+        """مراقبة ملف التصحيحات الحالي وملفات طبقاته بدل أي ملفات سابقة"""
+        watched = self.dictionary_watcher.files()
+        if watched:
+            self.dictionary_watcher.removePaths(watched)
+        paths = [file_path] + [layer.path for layer in self.layers if layer.enabled]
+        self.dictionary_watcher.addPaths([path for path in paths if os.path.exists(path)])
+    
+    def on_dictionary_file_changed(self, file_path):
+        """تنبيه بتعديل ملف التصحيحات، وتؤجل إعادة التحميل حتى تهدأ التنبيهات"""
+        if file_path != self.corrections_file_path and \
+                file_path not in [layer.path for layer in self.layers if layer.enabled]:
+            return
+        # الحفظ بإنشاء ملف جديد ثم إعادة تسميته يخرج الملف من المراقبة
+        if file_path not in self.dictionary_watcher.files() and os.path.exists(file_path):
+            self.dictionary_watcher.addPath(file_path)
+        if self.auto_reload:
+            self.reload_timer.start()
+    
+    def reload_dictionary(self):
+        """إعادة تحميل ملف التصحيحات في الخلفية، وتستمر الفحوص الجارية على القاموس القديم"""
+        if self.matcher is None or not self.corrections_file_path or not os.path.exists(self.corrections_file_path):
+            return
+        if self.reload_thread is not None:
+            self.reload_pending = True
+            return
+        self.reload_thread = DictionaryReloadThread(self.matcher, self.corrections_file_path, self.layers, self)
+        self.reload_thread.reloaded.connect(self.on_dictionary_reloaded)
+        self.reload_thread.failed.connect(self.on_dictionary_reload_failed)
+        self.reload_thread.finished.connect(self.reload_thread.deleteLater)
+        self.reload_thread.start()
+    
+    def on_dictionary_reloaded(self, result):
+        """اعتماد القاموس المعاد تحميله وإعادة الفحص أثناء الكتابة به"""
+        if self.sender() is not self.reload_thread:
+            return
+        self.reload_thread = None
+        if result.matcher.normalizer == self.normalizer:
+            self.matcher = result.matcher
+            self.corrections = result.matcher.corrections
+            self.wrong_words = set(self.corrections.keys())
+            from style_checker.watch import describe_reload
+            message = describe_reload(result)
+            if self.live_check:
+                self.invalidate_block_errors()
+            elif self.errors:
+                message += " | النتائج المعروضة من القاموس السابق، أعد الفحص لتحديثها"
+            self.statusBar().showMessage(message, 8000)
+        if self.reload_pending:
+            self.reload_pending = False
+            self.reload_dictionary()
+    
+    def on_dictionary_reload_failed(self, message):
+        """تعذر تحميل الملف المعدل (JSON غير صالح مثلاً)، فيبقى القاموس السابق"""
+        if self.sender() is not self.reload_thread:
+            return
+        self.reload_thread = None
+        self.statusBar().showMessage(f"تعذر تحديث القاموس، وبقي السابق: {message}", 8000)
+        if self.reload_pending:
+            self.reload_pending = False
+            self.reload_dictionary()
+    
+    def toggle_auto_reload(self, enabled):
+        """إعادة تحميل القاموس تلقائياً عند تعديل ملفه أو إيقافها"""
+        self.auto_reload = enabled
+        if not enabled:
+            self.reload_timer.stop()
+    
+    def read_layers(self):
+        """طبقات القواميس المحفوظة في الإعدادات"""
+        try:
+            entries = json.loads(self.settings.value('layers', '[]', str))
+        except ValueError:
+            return []
+        if not entries:
+            return []
+        from style_checker.layers import Layer
+        try:
+            return [Layer(name, path, enabled) for name, path, enabled in entries]
+        except (ValueError, TypeError):
+            return []
+    
+    def set_layers(self, layers):
+        """اعتماد طبقات جديدة وحفظها وإعادة بناء المحرك المدمج"""
+        self.layers = layers
+        self.settings.setValue('layers', json.dumps([list(layer) for layer in layers], ensure_ascii=False))
+        self.update_layers_menu()
+        if self.corrections_file_path and self.load_corrections(self.corrections_file_path):
+            self.watch_dictionary(self.corrections_file_path)
+            self.invalidate_block_errors()
+    
+    def add_layer(self):
+        """إضافة قاموس (للدار أو المشروع) فوق الطبقات الحالية"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "اختر قاموساً إضافياً", "", "ملفات JSON (*.json);;جميع الملفات (*.*)")
+        if not file_path:
+            return
+        names = {layer.name for layer in self.layers}
+        name = base = os.path.splitext(os.path.basename(file_path))[0]
+        index = 2
+        while name in names or name == 'base':
+            name = f"{base}-{index}"
+            index += 1
+        from style_checker.layers import Layer
+        self.set_layers(self.layers + [Layer(name, file_path)])
+    
+    def toggle_layer(self, index, enabled):
+        """تفعيل طبقة أو تعطيلها دون حذفها"""
+        layers = list(self.layers)
+        layers[index] = layers[index]._replace(enabled=enabled)
+        self.set_layers(layers)
+    
+    def update_layers_menu(self):
+        """قائمة الطبقات: إضافة، ثم طبقة لكل قاموس من الأعلى أولوية، ثم الإزالة"""
+        menu = self.layers_menu
+        menu.clear()
+        menu.addAction('إضافة قاموس...').triggered.connect(self.add_layer)
+        if not self.layers:
+            return
+        menu.addSeparator()
+        for index in reversed(range(len(self.layers))):
+            layer = self.layers[index]
+            action = menu.addAction(f"{layer.name} ({os.path.basename(layer.path)})")
+            action.setCheckable(True)
+            action.setChecked(layer.enabled)
+            action.setToolTip(layer.path)
+            action.toggled.connect(lambda enabled, index=index: self.toggle_layer(index, enabled))
+        menu.addSeparator()
+        menu.addAction('إزالة كل القواميس الإضافية').triggered.connect(lambda: self.set_layers([]))
+    
     def load_corrections(self, file_path):
         """تحميل ملف التصحيحات"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                self.corrections = json.load(file)
-            self.wrong_words = set(self.corrections.keys())
-            self.statusBar().showMessage(f"تم تحميل {len(self.corrections)} تصحيح", 3000)
+            from style_checker.dictionary import load_dictionary
+            # الفهرس المترجم يُحمَّل مباشرة ولا يعاد بناؤه إلا إذا تغير ملف JSON
+            started = time.perf_counter()
+            matcher = load_dictionary(file_path, normalizer=self.normalizer, layers=self.layers)
+            self.set_matcher(matcher, time.perf_counter() - started)
             return True
         except Exception as e:
             QMessageBox.warning(self, "تحذير", f"فشل في تحميل ملف التصحيحات:\n{str(e)}")
@@ -114,6 +638,13 @@ class StyleCheckerApp(QMainWindow):
         self.stats_label.setStyleSheet(f"color: {COLORS['fg_secondary']}; padding: 5px; font-size: 11px;")
         self.statusBar().addPermanentWidget(self.stats_label)
         
+        # شريط تقدم الفحص (يظهر أثناء الفحص فقط)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        
     def setup_gray_theme(self):
         """إعداد الثيم الرمادي"""
         palette = QPalette()
@@ -156,15 +687,10 @@ class StyleCheckerApp(QMainWindow):
         import_txt_action.triggered.connect(self.import_txt)
         file_menu.addAction(import_txt_action)
         
-        # استيراد DOCX
-        if DOCX_AVAILABLE:
-            import_docx_action = QAction(' word استيراد', self)
-            import_docx_action.triggered.connect(self.import_docx)
-            file_menu.addAction(import_docx_action)
-        else:
-            import_docx_action = QAction('استيراد word (غير متاح)', self)
-            import_docx_action.setEnabled(False)
-            file_menu.addAction(import_docx_action)
+        # استيراد DOCX (قراءة متدفقة لا تحتاج python-docx)
+        import_docx_action = QAction(' word استيراد', self)
+        import_docx_action.triggered.connect(self.import_docx)
+        file_menu.addAction(import_docx_action)
         
         file_menu.addSeparator()
         
@@ -196,6 +722,87 @@ class StyleCheckerApp(QMainWindow):
         check_action.triggered.connect(self.check_text)
         tools_menu.addAction(check_action)
         
+        self.cancel_action = QAction('إيقاف الفحص', self)
+        self.cancel_action.setShortcut(QKeySequence('Esc'))
+        self.cancel_action.setEnabled(False)
+        self.cancel_action.triggered.connect(self.cancel_check)
+        tools_menu.addAction(self.cancel_action)
+        
+        apply_action = QAction('تطبيق التصحيحات على النص', self)
+        apply_action.setShortcut(QKeySequence('Ctrl+Shift+Return'))
+        apply_action.triggered.connect(self.apply_corrections)
+        tools_menu.addAction(apply_action)
+        
+        live_check_action = QAction('الفحص أثناء الكتابة', self)
+        live_check_action.setCheckable(True)
+        live_check_action.toggled.connect(self.toggle_live_check)
+        tools_menu.addAction(live_check_action)
+        
+        highlight_action = QAction('تمييز الأخطاء في النص', self)
+        highlight_action.setCheckable(True)
+        highlight_action.setChecked(True)
+        highlight_action.toggled.connect(self.toggle_highlighting)
+        tools_menu.addAction(highlight_action)
+        
+        normalize_action = QAction('تجاهل التشكيل والتطويل وصور الهمزة', self)
+        normalize_action.setCheckable(True)
+        normalize_action.setChecked(self.normalizer is not None)
+        normalize_action.toggled.connect(self.toggle_normalization)
+        tools_menu.addAction(normalize_action)
+        
+        overlap_menu = tools_menu.addMenu('المطابقات المتداخلة')
+        overlap_group = QActionGroup(self)
+        for policy in OVERLAP_POLICIES:
+            overlap_action = QAction(OVERLAP_LABELS[policy], self)
+            overlap_action.setCheckable(True)
+            overlap_action.setChecked(policy == self.overlap)
+            overlap_action.triggered.connect(lambda checked, policy=policy: self.set_overlap(policy))
+            overlap_group.addAction(overlap_action)
+            overlap_menu.addAction(overlap_action)
+        
+        cache_action = QAction('حفظ نتائج الفحص لإعادة استعمالها', self)
+        cache_action.setCheckable(True)
+        cache_action.setChecked(self.use_result_cache)
+        cache_action.toggled.connect(self.toggle_result_cache)
+        tools_menu.addAction(cache_action)
+        
+        clear_cache_action = QAction('مسح ذاكرة النتائج', self)
+        clear_cache_action.triggered.connect(self.clear_result_cache)
+        tools_menu.addAction(clear_cache_action)
+        
+        store_action = QAction('تسجيل فحوص المستندات في قاعدة النتائج', self)
+        store_action.setCheckable(True)
+        store_action.setChecked(self.result_store is not None)
+        store_action.toggled.connect(self.toggle_result_store)
+        tools_menu.addAction(store_action)
+        
+        self.layers_menu = tools_menu.addMenu('القواميس الإضافية')
+        self.update_layers_menu()
+        
+        auto_reload_action = QAction('إعادة تحميل القاموس عند تعديل ملفه', self)
+        auto_reload_action.setCheckable(True)
+        auto_reload_action.setChecked(self.auto_reload)
+        auto_reload_action.toggled.connect(self.toggle_auto_reload)
+        tools_menu.addAction(auto_reload_action)
+        
+        profiling_menu = tools_menu.addMenu('قياس الأداء')
+        self.profiling_action = QAction('تسجيل أزمنة مراحل الفحص', self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.toggled.connect(self.toggle_profiling)
+        profiling_menu.addAction(self.profiling_action)
+        profiling_menu.addSeparator()
+        # خيارات الالتقاط من وحدة القياس، فتبنى عند أول فتح للقائمة
+        self.capture_separator = profiling_menu.addSeparator()
+        profile_report_action = QAction('تقرير أداء آخر فحص...', self)
+        profile_report_action.triggered.connect(self.show_profile_report)
+        profiling_menu.addAction(profile_report_action)
+        profiling_menu.aboutToShow.connect(self.build_capture_actions)
+        
+        sort_action = QAction('ترتيب الأخطاء حسب التكرار', self)
+        sort_action.setCheckable(True)
+        sort_action.toggled.connect(lambda enabled: self.errors_model.set_sort_by_count(enabled))
+        tools_menu.addAction(sort_action)
+        
         clear_action = QAction('مسح الكل', self)
         clear_action.setShortcut(QKeySequence('Ctrl+Del'))
         clear_action.triggered.connect(self.clear_all)
@@ -227,6 +834,12 @@ class StyleCheckerApp(QMainWindow):
         btn_check.clicked.connect(self.check_text)
         toolbar.addWidget(btn_check)
         
+        self.btn_cancel = QPushButton("إيقاف الفحص")
+        self.btn_cancel.setStyleSheet(self.get_button_style())
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel_check)
+        toolbar.addWidget(self.btn_cancel)
+        
         toolbar.addSeparator()
         
         # قسم الملفات
@@ -241,11 +854,10 @@ class StyleCheckerApp(QMainWindow):
         btn_export.clicked.connect(self.export_result)
         toolbar.addWidget(btn_export)
         
-        if DOCX_AVAILABLE:
-            btn_import_docx = QPushButton("استيراد word")
-            btn_import_docx.setStyleSheet(self.get_button_style())
-            btn_import_docx.clicked.connect(self.import_docx)
-            toolbar.addWidget(btn_import_docx)
+        btn_import_docx = QPushButton("استيراد word")
+        btn_import_docx.setStyleSheet(self.get_button_style())
+        btn_import_docx.clicked.connect(self.import_docx)
+        toolbar.addWidget(btn_import_docx)
         
         btn_import_txt = QPushButton("استيراد txt")
         btn_import_txt.setStyleSheet(self.get_button_style())
@@ -299,11 +911,15 @@ class StyleCheckerApp(QMainWindow):
         left_label.setStyleSheet(f"color: {COLORS['fg_primary']}; font-weight: bold; font-size: 12px; padding: 5px;")
         left_layout.addWidget(left_label)
         
-        # قائمة الأخطاء
-        self.errors_list = QListWidget()
+        # قائمة الأخطاء (نموذج/عرض: لا تُرسم إلا الصفوف الظاهرة)
+        self.errors_model = ErrorListModel(self)
+        self.errors_list = QListView()
+        self.errors_list.setModel(self.errors_model)
+        self.errors_list.setUniformItemSizes(True)
+        self.errors_list.clicked.connect(self.jump_to_error)
         self.errors_list.setLayoutDirection(Qt.LayoutDirection.RightToLeft)  # اتجاه من اليمين لليسار
         self.errors_list.setStyleSheet(f"""
-            QListWidget {{
+            QListView {{
                 background-color: {COLORS['bg_tertiary']};
                 color: {COLORS['fg_primary']};
                 border: 1px solid {COLORS['border']};
@@ -312,15 +928,15 @@ class StyleCheckerApp(QMainWindow):
                 font-size: 12px;
                 text-align: right;
             }}
-            QListWidget::item {{
+            QListView::item {{
                 padding: 5px;
                 border-bottom: 1px solid {COLORS['border']};
                 text-align: right;
             }}
-            QListWidget::item:hover {{
+            QListView::item:hover {{
                 background-color: {COLORS['hover']};
             }}
-            QListWidget::item:selected {{
+            QListView::item:selected {{
                 background-color: {COLORS['accent']};
                 color: white;
             }}
@@ -353,6 +969,15 @@ class StyleCheckerApp(QMainWindow):
         self.text_input.setFont(QFont("Sakkala Majalla", 14))
         right_layout.addWidget(self.text_input)
         
+        # مؤقت إعادة الفحص الكامل بعد التعديلات الكبيرة في وضع الفحص أثناء الكتابة
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_CHECK_DELAY)
+        self.live_timer.timeout.connect(self.start_live_check)
+        
+        # تسطير الأخطاء داخل النص
+        self.highlighter = ErrorHighlighter(self.text_input.document(), self)
+        
         splitter.addWidget(right_widget)
         
         # تقسيم متساوي
@@ -370,8 +995,14 @@ class StyleCheckerApp(QMainWindow):
         )
         
         if file_path:
+            # اختيار المستخدم يسبق أي تحميل ما زال جارياً في الخلفية
+            self.dictionary_thread = None
+            self.reload_thread = None
             if self.load_corrections(file_path):
                 self.corrections_file_path = file_path
+                self.settings.setValue('corrections_path', file_path)
+                self.watch_dictionary(file_path)
+                self.invalidate_block_errors()
                 QMessageBox.information(self, "نجح", f"تم تحميل {len(self.corrections)} تصحيح")
     
     def import_txt(self):
@@ -385,28 +1016,16 @@ class StyleCheckerApp(QMainWindow):
         
         if file_path:
             try:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                except UnicodeDecodeError:
-                    with open(file_path, 'r', encoding='windows-1256') as f:
-                        content = f.read()
-                
+                from style_checker.documents import read_txt
+                content = read_txt(file_path)
                 self.text_input.setPlainText(content)
+                self.document_path = file_path
                 self.statusBar().showMessage("تم استيراد الملف بنجاح", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "خطأ", f"فشل في قراءة الملف:\n{str(e)}")
     
     def import_docx(self):
         """استيراد ملف Word"""
-        if not DOCX_AVAILABLE:
-            QMessageBox.warning(
-                self,
-                "غير متاح",
-                "مكتبة python-docx غير مثبتة.\nقم بتثبيتها باستخدام:\npip install python-docx"
-            )
-            return
-        
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "اختر ملف Word",
@@ -416,45 +1035,27 @@ class StyleCheckerApp(QMainWindow):
         
         if file_path:
             try:
-                doc = Document(file_path)
-                content = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-                
+                from style_checker.documents import read_docx
+                content = read_docx(file_path)
                 self.text_input.setPlainText(content)
+                self.document_path = file_path
                 self.statusBar().showMessage("تم استيراد الملف بنجاح", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "خطأ", f"فشل في قراءة الملف:\n{str(e)}")
     
     def find_errors(self, text):
-        """البحث عن الأخطاء في النص"""
-        errors = []
-        
-        if not self.wrong_words:
-            return errors
-        
-        for wrong_word in self.wrong_words:
-            pattern = r'\b' + re.escape(wrong_word) + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            
-            for match in matches:
-                start_pos = match.start()
-                end_pos = match.end()
-                
-                # الحصول على السياق
-                context_start = max(0, start_pos - 30)
-                context_end = min(len(text), end_pos + 30)
-                context = text[context_start:context_end]
-                
-                errors.append({
-                    'word': match.group(),
-                    'correct': self.corrections[wrong_word],
-                    'position': start_pos,
-                    'context': context
-                })
-        
-        return errors
+        """البحث عن الأخطاء في النص بمرور واحد عبر محرك المطابقة"""
+        if not self.wrong_words or self.matcher is None:
+            return []
+        
+        return self.matcher.find_errors(text, self.overlap)
     
     def check_text(self):
         """فحص النص وإيجاد الأخطاء"""
+        if self.dictionary_thread is not None:
+            self.check_after_load = True
+            self.statusBar().showMessage("سيبدأ الفحص بعد تحميل القاموس...")
+            return
         if not self.corrections:
             QMessageBox.warning(
                 self,
@@ -463,76 +1064,496 @@ class StyleCheckerApp(QMainWindow):
             )
             return
         
-        text = self.text_input.toPlainText().strip()
+        raw_text = self.document_text()
+        text = raw_text.strip()
         
         if not text:
             QMessageBox.warning(self, "تحذير", "لا يوجد نص للفحص")
             return
         
-        # البحث عن الأخطاء
-        self.errors = self.find_errors(text)
-        
-        # عرض الأخطاء
-        self.errors_list.clear()
-        
-        if self.errors:
-            error_counts = {}
-            for error in self.errors:
-                word = error['word']
-                if word in error_counts:
-                    error_counts[word] += 1
-                else:
-                    error_counts[word] = 1
-            
-            for word, count in error_counts.items():
-                error_info = next(e for e in self.errors if e['word'] == word)
-                item_text = f"❌ {word} → {error_info['correct']} (التكرار: {count})"
-                item = QListWidgetItem(item_text)
-                self.errors_list.addItem(item)
-            
-            self.stats_label.setText(f"عدد الأخطاء: {len(self.errors)} | أنواع مختلفة: {len(error_counts)}")
+        self.start_check(text, len(raw_text) - len(raw_text.lstrip()))
+    
+    def apply_corrections(self):
+        """تطبيق الاستبدالات الصريحة على النص في مرور واحد، ويمكن التراجع عنها بخطوة واحدة"""
+        if self.matcher is None:
+            QMessageBox.warning(
+                self,
+                "تحذير",
+                "لم يتم تحميل ملف التصحيحات.\nيرجى تحميل ملف التصحيحات أولاً."
+            )
+            return
+        
+        from style_checker.autocorrect import plan_corrections
+        edits, skipped = plan_corrections(self.matcher, self.document_text())
+        if not edits:
+            QMessageBox.information(self, "التصحيح التلقائي", "لا توجد تصحيحات يمكن تطبيقها تلقائياً")
+            return
+        
+        self.cancel_check()
+        # من آخر النص إلى أوله حتى لا تتغير مواضع التعديلات التالية
+        cursor = self.text_input.textCursor()
+        cursor.beginEditBlock()
+        for edit in reversed(edits):
+            cursor.setPosition(edit.start)
+            cursor.setPosition(edit.end, cursor.MoveMode.KeepAnchor)
+            cursor.insertText(edit.new)
+        cursor.endEditBlock()
+        
+        message = f"تم تطبيق {len(edits)} تصحيح"
+        if skipped:
+            message += f"\nوتُركت {len(skipped)} مطابقة قيمتها بدائل أو إرشاد تحتاج مراجعة يدوية"
+        QMessageBox.information(self, "التصحيح التلقائي", message)
+        
+        # نتائج الفحص السابقة لم تعد مطابقة للنص
+        self.start_check(self.document_text(), silent=True)
+    
+    def document_text(self):
+        """نص المستند كما في فقراته (toPlainText يحول المسافة غير القابلة للكسر إلى مسافة عادية)"""
+        return self.text_input.document().toRawText().replace('\u2029', '\n')
+    
+    def start_check(self, text, offset=0, silent=False):
+        """بدء فحص النص في الخلفية؛ offset موضع النص داخل المستند"""
+        # إيقاف أي فحص سابق ما زال يعمل
+        self.cancel_check()
+        
+        self.check_offset = offset
+        self.check_silent = silent
+        self.check_revision = self.text_input.document().revision()
+        self.errors = []
+        self.errors_stale = False
+        self.jump_word = None
+        self.errors_model.reset(ErrorSummary())
+        self.stats_label.setText("عدد الأخطاء: 0")
+        
+        profile = None
+        if self.profiling:
+            from style_checker.profiling import STAGE_LOAD, Profile
+            profile = self.profile = Profile(self.profile_capture)
+            # زمن آخر تحميل للقاموس، للمقارنة مع زمن الفحص
+            profile.add(STAGE_LOAD, self.load_seconds)
+        
+        # الفحص في خيط خلفي حتى لا تتجمد الواجهة
+        self.check_thread = CheckThread(self.matcher, text, self.overlap, self.active_result_cache(), profile, self)
+        self.check_thread.errors_found.connect(self.on_errors_found)
+        self.check_thread.progress.connect(self.on_check_progress)
+        self.check_thread.check_finished.connect(self.on_check_finished)
+        self.check_thread.finished.connect(self.check_thread.deleteLater)
+        
+        self.set_checking(True)
+        self.statusBar().showMessage("جارٍ الفحص...")
+        self.check_thread.start()
+    
+    def set_checking(self, running):
+        """تبديل حالة أزرار الفحص وشريط التقدم"""
+        self.btn_cancel.setEnabled(running)
+        self.cancel_action.setEnabled(running)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(running)
+    
+    def cancel_check(self):
+        """إيقاف الفحص الجاري إن وجد"""
+        if self.check_thread is not None:
+            self.check_thread.cancel()
+            self.check_thread = None
+            self.set_checking(False)
+            self.statusBar().showMessage("تم إيقاف الفحص", 3000)
+    
+    def on_check_progress(self, value):
+        """تحديث شريط التقدم"""
+        if self.sender() is self.check_thread:
+            self.progress_bar.setValue(value)
+    
+    def on_errors_found(self, batch):
+        """إضافة دفعة من الأخطاء إلى القائمة وتحديث التكرارات"""
+        if self.sender() is not self.check_thread:
+            return
+        
+        started = time.perf_counter()
+        self.errors.extend(batch)
+        self.errors_model.add_errors(batch)
+        self.update_stats(len(self.errors))
+        if self.check_thread.profile is not None:
+            from style_checker.profiling import STAGE_AGGREGATE
+            self.check_thread.profile.add(STAGE_AGGREGATE, time.perf_counter() - started)
+    
+    def update_stats(self, total):
+        """تحديث عداد الأخطاء في شريط الحالة"""
+        if total:
+            self.stats_label.setText(f"عدد الأخطاء: {total} | أنواع مختلفة: {len(self.errors_model.summary)}")
+        else:
+            self.stats_label.setText("عدد الأخطاء: 0")
+    
+    def on_check_finished(self, cancelled):
+        """إنهاء الفحص وعرض النتيجة"""
+        if self.sender() is not self.check_thread:
+            return
+        
+        profile = self.check_thread.profile
+        self.check_thread = None
+        self.set_checking(False)
+        started = time.perf_counter()
+        self.errors.sort(key=lambda error: error['position'])
+        
+        # لا توزَّع النتائج على الفقرات إذا عُدل النص أثناء الفحص
+        if not cancelled and self.check_revision == self.text_input.document().revision():
+            self.distribute_block_errors()
+        if self.errors_model.sort_by_count:
+            self.errors_model.reset(self.errors_model.summary)
+        if profile is not None:
+            from style_checker.profiling import STAGE_RENDER
+            profile.add(STAGE_RENDER, time.perf_counter() - started)
+        if not cancelled and not self.check_silent:
+            self.record_check()
+        
+        if profile is not None and not self.check_silent:
+            self.statusBar().showMessage(f"تم اكتشاف {len(self.errors)} خطأ | {profile.summary()}", 10000)
+        elif self.check_silent:
+            self.statusBar().clearMessage()
+        elif self.errors:
             self.statusBar().showMessage(f"تم اكتشاف {len(self.errors)} خطأ", 3000)
         else:
             self.stats_label.setText("عدد الأخطاء: 0")
             self.statusBar().showMessage("✅ لم يتم العثور على أخطاء", 3000)
             QMessageBox.information(self, "ممتاز", "لم يتم العثور على أخطاء لغوية في النص!")
     
+    def toggle_live_check(self, enabled):
+        """تفعيل الفحص أثناء الكتابة أو إيقافه"""
+        if enabled and self.matcher is None:
+            QMessageBox.warning(self, "تحذير", "لم يتم تحميل ملف التصحيحات.\nيرجى تحميل ملف التصحيحات أولاً.")
+            self.sender().setChecked(False)
+            return
+        
+        self.live_check = enabled
+        self.live_ready = False
+        document = self.text_input.document()
+        if enabled:
+            document.contentsChange.connect(self.on_contents_change)
+            self.start_live_check()
+        else:
+            document.contentsChange.disconnect(self.on_contents_change)
+            self.live_timer.stop()
+    
+    def toggle_highlighting(self, enabled):
+        """تفعيل تسطير الأخطاء داخل النص أو إيقافه"""
+        self.highlighter.setDocument(self.text_input.document() if enabled else None)
+    
+    def toggle_normalization(self, enabled):
+        """المطابقة بعد توحيد النص أو المطابقة الحرفية، مع إعادة بناء المحرك"""
+        self.normalizer = DEFAULT_NORMALIZER if enabled else None
+        if self.corrections_file_path and self.load_corrections(self.corrections_file_path):
+            self.invalidate_block_errors()
+    
+    def open_result_cache(self):
+        """فتح ذاكرة نتائج الفحص، أو العمل دونها إذا تعذر إنشاؤها"""
+        import sqlite3
+        from style_checker.cache import ResultCache
+        try:
+            return ResultCache()
+        except (OSError, sqlite3.Error):
+            return None
+    
+    def active_result_cache(self):
+        """ذاكرة النتائج إذا كانت مفعلة، وتفتح عند أول طلب لها"""
+        if self.use_result_cache and self.result_cache is None:
+            self.result_cache = self.open_result_cache()
+            if self.result_cache is None:
+                self.use_result_cache = False
+        return self.result_cache
+    
+    def toggle_result_cache(self, enabled):
+        """استعمال ذاكرة النتائج في الفحص أو إيقافها"""
+        self.use_result_cache = enabled
+        if not enabled:
+            # قد يكون فحص ملغى ما زال يكتب فيها، فتغلق مع آخر مرجع إليها
+            self.result_cache = None
+    
+    def open_result_store(self):
+        """فتح قاعدة نتائج الفحص، أو العمل دونها إذا تعذر إنشاؤها"""
+        import sqlite3
+        from style_checker.store import ResultStore
+        try:
+            return ResultStore()
+        except (OSError, sqlite3.Error):
+            return None
+    
+    def toggle_result_store(self, enabled):
+        """تسجيل فحوص المستندات في قاعدة النتائج أو إيقافه"""
+        if enabled and self.result_store is None:
+            self.result_store = self.open_result_store()
+        elif not enabled and self.result_store is not None:
+            self.result_store.close()
+            self.result_store = None
+        self.settings.setValue('store_results', self.result_store is not None)
+    
+    def record_check(self):
+        """تسجيل نتيجة الفحص الكامل للمستند المستورد في قاعدة النتائج"""
+        if self.result_store is None or self.document_path is None:
+            return
+        import sqlite3
+        from style_checker.cache import matcher_fingerprint
+        from style_checker.documents import document_author
+        text = self.text_input.toPlainText()
+        try:
+            self.result_store.record(
+                os.path.abspath(self.document_path), self.errors,
+                author=document_author(self.document_path), chars=len(text), words=len(text.split()),
+                dictionary=matcher_fingerprint(self.matcher).hex())
+        except sqlite3.Error as e:
+            self.statusBar().showMessage(f"تعذر تسجيل الفحص في قاعدة النتائج: {e}", 5000)
+    
+    def clear_result_cache(self):
+        """حذف النتائج المحفوظة"""
+        cache = self.active_result_cache()
+        if cache is not None:
+            cache.clear()
+        self.statusBar().showMessage("تم مسح ذاكرة النتائج", 3000)
+    
+    def set_overlap(self, policy):
+        """تغيير سياسة المطابقات المتداخلة وإعادة الفحص بها"""
+        if policy == self.overlap:
+            return
+        self.overlap = policy
+        self.invalidate_block_errors()
+    
+    def toggle_profiling(self, enabled):
+        """تسجيل أزمنة مراحل الفحوص القادمة أو إيقافه"""
+        self.profiling = enabled
+        if enabled:
+            self.statusBar().showMessage("ستُسجل أزمنة الفحص القادم (الأدوات ← قياس الأداء ← تقرير أداء آخر فحص)", 5000)
+    
+    def set_profile_capture(self, capture):
+        """اختيار الالتقاط المرافق للقياس، ويفعّل القياس إن لم يكن مفعلاً"""
+        self.profile_capture = capture
+        if capture is not None:
+            self.profiling_action.setChecked(True)
+    
+    def build_capture_actions(self):
+        """خيارات الالتقاط في قائمة قياس الأداء، مرة واحدة"""
+        menu = self.sender()
+        menu.aboutToShow.disconnect(self.build_capture_actions)
+        from style_checker.profiling import CAPTURE_CPROFILE, CAPTURE_TRACEMALLOC
+        capture_group = QActionGroup(self)
+        for capture, label in ((None, 'دون التقاط'),
+                               (CAPTURE_CPROFILE, 'التقاط ملف تعريف الدوال (cProfile)'),
+                               (CAPTURE_TRACEMALLOC, 'تتبع تخصيص الذاكرة (tracemalloc)')):
+            capture_action = QAction(label, self)
+            capture_action.setCheckable(True)
+            capture_action.setChecked(capture == self.profile_capture)
+            capture_action.triggered.connect(lambda checked, capture=capture: self.set_profile_capture(capture))
+            capture_group.addAction(capture_action)
+            menu.insertAction(self.capture_separator, capture_action)
+    
+    def show_profile_report(self):
+        """عرض قياسات آخر فحص"""
+        if self.profile is None:
+            QMessageBox.information(
+                self, "قياس الأداء",
+                "لا توجد قياسات بعد.\nفعّل «تسجيل أزمنة مراحل الفحص» ثم افحص النص."
+            )
+            return
+        ProfileDialog(self.profile, self).exec()
+    
+    def record_export(self, elapsed):
+        """إضافة زمن التصدير إلى قياسات آخر فحص"""
+        if self.profiling and self.profile is not None:
+            from style_checker.profiling import STAGE_EXPORT
+            self.profile.add(STAGE_EXPORT, elapsed)
+    
+    def invalidate_block_errors(self):
+        """إسقاط مطابقات الفقرات المحفوظة بعد تغيير محرك المطابقة"""
+        self.cancel_check()
+        self.live_ready = False
+        block = self.text_input.document().begin()
+        while block.isValid():
+            block.setUserData(None)
+            block = block.next()
+        if self.highlighter.document() is not None:
+            self.highlighter.rehighlight()
+        self.start_live_check()
+    
+    def start_live_check(self):
+        """فحص كامل صامت في الخلفية تُبنى منه ذاكرة الفقرات"""
+        if self.live_check:
+            self.start_check(self.document_text(), silent=True)
+    
+    def distribute_block_errors(self):
+        """توزيع نتائج الفحص الكامل على فقرات المستند بمواضع نسبية"""
+        document = self.text_input.document()
+        errors = self.errors
+        index = 0
+        block = document.begin()
+        while block.isValid():
+            block_start = block.position()
+            block_end = block_start + block.length()
+            matches = []
+            while index < len(errors) and errors[index]['position'] + self.check_offset < block_end:
+                error = errors[index]
+                start = error['position'] + self.check_offset - block_start
+                matches.append((start, start + len(error['word']), error['correct'], error['word']))
+                index += 1
+            block.setUserData(BlockErrors(matches, block.revision()))
+            block = block.next()
+        
+        if self.live_check:
+            self.live_total = len(errors)
+            self.live_block_count = document.blockCount()
+            self.live_ready = True
+        if self.highlighter.document() is not None:
+            self.highlighter.rehighlight()
+    
+    def on_contents_change(self, position, removed, added):
+        """إعادة فحص المنطقة المعدلة فقط وتحديث القائمة والعداد في مكانهما"""
+        if not self.live_ready or added > LIVE_CHECK_MAX_SPAN:
+            # تعديل كبير أو ذاكرة الفقرات غير جاهزة: فحص كامل بعد توقف الكتابة
+            self.live_ready = False
+            self.live_timer.start()
+            return
+        
+        started = time.perf_counter()
+        document = self.text_input.document()
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        if not last.isValid():
+            last = document.lastBlock()
+        data = first.userData()
+        
+        if first == last and document.blockCount() == self.live_block_count and isinstance(data, BlockErrors):
+            # تعديل داخل فقرة واحدة: كلفة بحجم التعديل مع هامش بطول أطول مدخل
+            data.matches, dropped, found = update_matches(
+                self.matcher, first.text(), data.matches,
+                position - first.position(), removed, added, self.overlap
+            )
+            data.revision = first.revision()
+            for match in dropped:
+                self.errors_model.adjust(match[3], match[2], -1)
+            for match in found:
+                self.errors_model.adjust(match[3], match[2], 1)
+            self.live_total += len(found) - len(dropped)
+            if self.overlap == OVERLAP_ALL:
+                span = added + 2 * self.matcher.max_length
+            else:
+                span = first.length()
+        else:
+            # إضافة فقرات أو حذفها: إعادة فحص الفقرات المتأثرة كاملة
+            merged = document.blockCount() < self.live_block_count
+            span = 0
+            block = first
+            while block.isValid():
+                data = block.userData()
+                matches = scan_paragraph(self.matcher, block.text(), self.overlap)
+                if not merged:
+                    for match in data.matches if isinstance(data, BlockErrors) else ():
+                        self.errors_model.adjust(match[3], match[2], -1)
+                    for match in matches:
+                        self.errors_model.adjust(match[3], match[2], 1)
+                    self.live_total += len(matches) - (len(data.matches) if isinstance(data, BlockErrors) else 0)
+                block.setUserData(BlockErrors(matches, block.revision()))
+                self.highlighter.rehighlightBlock(block)
+                span += block.length()
+                if block == last:
+                    break
+                block = block.next()
+            self.live_block_count = document.blockCount()
+            if merged:
+                # ذاكرة الفقرات المحذوفة ضاعت مع حذفها، فنعيد العد من الفقرات الباقية
+                self.recount_live_errors()
+        
+        self.errors_stale = True
+        self.update_stats(self.live_total)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.statusBar().showMessage(f"أعيد فحص {span} حرف في {elapsed:.2f} مللي ثانية", 2000)
+    
+    def recount_live_errors(self):
+        """إعادة بناء قائمة الأخطاء من ذاكرة الفقرات دون إعادة الفحص"""
+        summary = ErrorSummary()
+        block = self.text_input.document().begin()
+        while block.isValid():
+            data = block.userData()
+            if isinstance(data, BlockErrors):
+                for match in data.matches:
+                    summary.adjust(match[3], match[2], 1)
+            block = block.next()
+        self.live_total = summary.total
+        self.errors_model.reset(summary)
+    
+    def collect_errors(self):
+        """الأخطاء الحالية؛ في وضع الفحص أثناء الكتابة تُجمع من ذاكرة الفقرات"""
+        if self.live_check and self.live_ready and self.errors_stale:
+            text = self.document_text()
+            errors = []
+            block = self.text_input.document().begin()
+            while block.isValid():
+                data = block.userData()
+                if isinstance(data, BlockErrors):
+                    offset = block.position()
+                    for start, end, correct, word in data.matches:
+                        errors.append(make_error(text, offset + start, offset + end, correct))
+                block = block.next()
+            self.errors = errors
+            self.errors_stale = False
+            self.errors_model.reset(ErrorSummary(errors))
+        return self.errors
+    
+    def error_positions(self, word):
+        """مواضع كلمة خاطئة في المستند مرتبة"""
+        if self.live_check and self.live_ready:
+            positions = []
+            block = self.text_input.document().begin()
+            while block.isValid():
+                data = block.userData()
+                if isinstance(data, BlockErrors):
+                    offset = block.position()
+                    positions.extend(offset + match[0] for match in data.matches if match[3] == word)
+                block = block.next()
+            return positions
+        entry = self.errors_model.summary.get(word)
+        return sorted(position + self.check_offset for position in entry.positions) if entry else []
+    
+    def jump_to_error(self, index):
+        """تحديد موضع الخطأ في النص؛ النقرات المتتالية تنتقل بين مواضعه"""
+        word = index.data(Qt.ItemDataRole.UserRole)
+        positions = self.error_positions(word)
+        if not positions:
+            return
+        
+        self.jump_index = self.jump_index + 1 if word == self.jump_word else 0
+        self.jump_word = word
+        position = positions[self.jump_index % len(positions)]
+        
+        cursor = self.text_input.textCursor()
+        cursor.setPosition(position)
+        cursor.setPosition(position + len(word), cursor.MoveMode.KeepAnchor)
+        self.text_input.setTextCursor(cursor)
+        self.text_input.ensureCursorVisible()
+        self.statusBar().showMessage(
+            f"{word}: الموضع {self.jump_index % len(positions) + 1} من {len(positions)}", 3000
+        )
+    
     def export_result(self):
-        """تصدير النتيجة إلى ملف نصي"""
-        if not self.errors:
+        """تصدير النتيجة إلى ملف نصي أو CSV أو JSON Lines"""
+        if not self.collect_errors():
             QMessageBox.warning(self, "تحذير", "لا توجد أخطاء للتصدير")
             return
         
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "حفظ النتيجة",
             "",
-            "ملفات نصية (*.txt);;جميع الملفات (*.*)"
+            "ملفات نصية (*.txt);;جداول CSV (*.csv);;JSON Lines (*.jsonl);;جميع الملفات (*.*)"
         )
         
         if file_path:
+            from style_checker.reports import REPORT_SUFFIXES, write_report
+            if not file_path.lower().endswith(REPORT_SUFFIXES):
+                # امتداد الصيغة المختارة إذا لم يكتب المستخدم امتداداً
+                suffix = selected_filter[selected_filter.rfind('*.') + 1:-1]
+                file_path += suffix if suffix in REPORT_SUFFIXES else '.txt'
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("تقرير الأخطاء اللغوية\n")
-                    f.write("=" * 50 + "\n\n")
-                    
-                    error_counts = {}
-                    for error in self.errors:
-                        word = error['word']
-                        if word in error_counts:
-                            error_counts[word] += 1
-                        else:
-                            error_counts[word] = 1
-                    
-                    for word, count in error_counts.items():
-                        error_info = next(e for e in self.errors if e['word'] == word)
-                        f.write(f"الكلمة الخاطئة: {word}\n")
-                        f.write(f"الصحيح: {error_info['correct']}\n")
-                        f.write(f"التكرار: {count}\n")
-                        f.write(f"السياق: {error_info['context']}\n")
-                        f.write("-" * 50 + "\n")
-                
-                self.statusBar().showMessage("تم حفظ الملف بنجاح", 3000)
+                started = time.perf_counter()
+                write_report(self.errors_model.summary, file_path)
+                elapsed = time.perf_counter() - started
+                self.record_export(elapsed)
+                self.statusBar().showMessage(f"تم حفظ الملف بنجاح ({elapsed:.2f} ث)", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "خطأ", f"فشل في حفظ الملف:\n{str(e)}")
     
@@ -546,7 +1567,7 @@ class StyleCheckerApp(QMainWindow):
             )
             return
         
-        if not self.errors:
+        if not self.collect_errors():
             QMessageBox.warning(self, "تحذير", "لا توجد أخطاء للتصدير")
             return
         
@@ -559,51 +1580,12 @@ class StyleCheckerApp(QMainWindow):
         
         if file_path:
             try:
-                doc = Document()
-                
-                # العنوان
-                title = doc.add_heading('تقرير تصحيح الأخطاء اللغوية', 0)
-                title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                
-                # معلومات
-                doc.add_paragraph(f"تاريخ المعالجة: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                doc.add_paragraph(f"عدد الأخطاء: {len(self.errors)}")
-                
-                # جدول الأخطاء
-                if self.errors:
-                    doc.add_heading('الأخطاء المكتشفة', level=1)
-                    errors_table = doc.add_table(rows=1, cols=4)
-                    errors_table.style = 'Table Grid'
-                    
-                    headers = ['التكرار', 'الأصوب', 'الكلمة الخاطئة', 'السياق']
-                    for i, header in enumerate(headers):
-                        cell = errors_table.rows[0].cells[i]
-                        cell.text = header
-                        cell.paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                        cell.paragraphs[0].runs[0].font.bold = True
-                    
-                    error_counts = {}
-                    for error in self.errors:
-                        word = error['word']
-                        if word in error_counts:
-                            error_counts[word] += 1
-                        else:
-                            error_counts[word] = 1
-                    
-                    for word, count in error_counts.items():
-                        error_info = next(e for e in self.errors if e['word'] == word)
-                        row = errors_table.add_row()
-                        
-                        row.cells[0].text = str(count)
-                        row.cells[1].text = error_info['correct']
-                        row.cells[2].text = word
-                        row.cells[3].text = error_info['context']
-                        
-                        for cell in row.cells:
-                            cell.paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                
-                doc.save(file_path)
-                self.statusBar().showMessage("تم حفظ التقرير بنجاح", 3000)
+                started = time.perf_counter()
+                from style_checker.reports import write_docx_report
+                write_docx_report(self.errors_model.summary, file_path)
+                elapsed = time.perf_counter() - started
+                self.record_export(elapsed)
+                self.statusBar().showMessage(f"تم حفظ التقرير بنجاح ({elapsed:.2f} ث)", 3000)
             except Exception as e:
                 QMessageBox.critical(self, "خطأ", f"فشل في حفظ التقرير:\n{str(e)}")
     
@@ -617,11 +1599,33 @@ class StyleCheckerApp(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            self.cancel_check()
             self.text_input.clear()
-            self.errors_list.clear()
+            self.errors_model.reset(ErrorSummary())
             self.errors = []
+            self.document_path = None
+            self.jump_word = None
+            self.live_total = 0
+            self.errors_stale = False
             self.stats_label.setText("عدد الأخطاء: 0")
             self.statusBar().showMessage("تم المسح", 2000)
+    
+    def closeEvent(self, event):
+        """إيقاف الفحص الخلفي قبل إغلاق النافذة"""
+        self.cancel_check()
+        # قد تبقى خيوط فحوص ملغاة لم تنته بعد
+        for thread in self.findChildren(CheckThread):
+            thread.cancel()
+            thread.wait()
+        for thread in self.findChildren(DictionaryLoadThread):
+            thread.wait()
+        for thread in self.findChildren(DictionaryReloadThread):
+            thread.wait()
+        if self.result_cache is not None:
+            self.result_cache.close()
+        if self.result_store is not None:
+            self.result_store.close()
+        super().closeEvent(event)
 
 
 def check_dependencies():
@@ -631,9 +1635,7 @@ def check_dependencies():
     if not PYQT6_AVAILABLE:
         missing.append("PyQt6")
     
-    if not DOCX_AVAILABLE:
-        missing.append("python-docx")
-    
+    # python-docx اختيارية: دونها يعطل تصدير تقرير Word وحده
     if missing:
         print("❌ المكتبات التالية غير مثبتة:")
         for lib in missing:
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+قياس قراءة ملفات Word: شجرة python-docx الكاملة مقابل القراءة المتدفقة لأجزاء OOXML
+يقيس الزمن وذروة الذاكرة (tracemalloc) لاستخراج النص ولفحصه حتى آخر خطأ
+
+الاستخدام:
+    python benchmarks/bench_docx.py [--pages 50 300] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from corpus import load_base_corrections, synthetic_text
+from style_checker.docx_stream import iter_docx_paragraphs
+from style_checker.matcher import Matcher
+from style_checker.streaming import check_docx_streaming
+
+# تقريب لصفحة Word: نحو 12 فقرة بطول 250 حرفاً
+PARAGRAPHS_PER_PAGE = 12
+PARAGRAPH_SIZE = 250
+
+
+def build_document(path, pages, corrections):
+    """إنشاء مستند اصطناعي بفقرات وجدول كل عشر صفحات"""
+    from docx import Document
+    document = Document()
+    text = synthetic_text(pages * PARAGRAPHS_PER_PAGE * PARAGRAPH_SIZE, corrections)
+    for page in range(pages):
+        base = page * PARAGRAPHS_PER_PAGE * PARAGRAPH_SIZE
+        for index in range(PARAGRAPHS_PER_PAGE):
+            start = base + index * PARAGRAPH_SIZE
+            document.add_paragraph(text[start:start + PARAGRAPH_SIZE])
+        if page % 10 == 0:
+            table = document.add_table(rows=3, cols=3)
+            for cell in table._cells:
+                cell.text = text[base:base + 40]
+    document.save(path)
+
+
+def read_python_docx(path):
+    """المسار القديم: تحميل المستند كاملاً ثم ضم نصوص الفقرات"""
+    from docx import Document
+    return '\n'.join(paragraph.text for paragraph in Document(path).paragraphs)
+
+
+def read_streaming(path):
+    """المسار الجديد: الفقرات تباعاً من أجزاء XML"""
+    return '\n'.join(paragraph.text for paragraph in iter_docx_paragraphs(path))
+
+
+def measure(repeat, func):
+    """أفضل زمن، وذروة الذاكرة في تشغيل منفصل"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس قراءة ملفات Word")
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 300])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corrections = load_base_corrections()
+    matcher = Matcher(corrections)
+
+    cases = [
+        ('python-docx', read_python_docx),
+        ('متدفق', read_streaming),
+        ('python-docx + فحص', lambda path: matcher.find_errors(read_python_docx(path))),
+        ('متدفق + فحص', lambda path: sum(1 for _ in check_docx_streaming(matcher, path))),
+    ]
+
+    print(f"{'الصفحات':>8} {'الحجم (م.ب)':>11} {'الطريقة':>20} {'الزمن (ث)':>10} {'الذروة (م.ب)':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            path = os.path.join(directory, f'document_{pages}.docx')
+            build_document(path, pages, corrections)
+            size = os.path.getsize(path) / 1e6
+            for name, func in cases:
+                seconds, peak = measure(args.repeat, lambda: func(path))
+                print(f"{pages:>8} {size:>11.2f} {name:>20} {seconds:>10.3f} {peak:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
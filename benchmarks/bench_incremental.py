@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+قياس كلفة ضغطة المفتاح في وضع الفحص أثناء الكتابة مقارنة بإعادة فحص المستند كاملاً
+
+الاستخدام:
+    python benchmarks/bench_incremental.py [--keystrokes 2000] [--overlap longest]
+"""
+
+import argparse
+import random
+import time
+
+from corpus import load_base_corrections, synthetic_text
+from style_checker.incremental import scan_paragraph, update_matches
+from style_checker.matcher import OVERLAP_ALL, OVERLAP_POLICIES, Matcher
+
+DOCUMENT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس كلفة إعادة الفحص الجزئي")
+    parser.add_argument('--keystrokes', type=int, default=2000)
+    parser.add_argument('--paragraph', type=int, default=600, help="متوسط طول الفقرة بالأحرف")
+    parser.add_argument('--overlap', choices=OVERLAP_POLICIES, default=OVERLAP_ALL,
+                        help="سياسة التداخل (الواجهة تستعمل longest افتراضياً)")
+    args = parser.parse_args()
+
+    corrections = load_base_corrections()
+    matcher = Matcher(corrections)
+    rng = random.Random(0)
+
+    print(f"{'المستند (حرف)':>14} {'فحص كامل (مللي ث)':>20} {'ضغطة مفتاح (ميكرو ث)':>22}")
+    for size in DOCUMENT_SIZES:
+        text = synthetic_text(size, corrections).replace('\n', ' ')
+        paragraphs = [text[i:i + args.paragraph] for i in range(0, len(text), args.paragraph)]
+
+        started = time.perf_counter()
+        matches = [scan_paragraph(matcher, paragraph, args.overlap) for paragraph in paragraphs]
+        full_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(args.keystrokes):
+            index = rng.randrange(len(paragraphs))
+            paragraph = paragraphs[index]
+            position = rng.randint(0, len(paragraph))
+            paragraph = paragraph[:position] + 'ا' + paragraph[position:]
+            paragraphs[index] = paragraph
+            matches[index], _, _ = update_matches(
+                matcher, paragraph, matches[index], position, 0, 1, args.overlap)
+        keystroke_time = (time.perf_counter() - started) / args.keystrokes
+
+        print(f"{size:>14} {full_time * 1e3:>20.1f} {keystroke_time * 1e6:>22.1f}")
+
+
+if __name__ == '__main__':
+    main()
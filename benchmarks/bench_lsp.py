@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+قياس كلفة ضغطة المفتاح في خادم LSP على مستند كبير
+يعالج إشعارات didChange مباشرة (دون النقل عبر stdio) ويقيس زمن كل منها، ثم زمن
+بناء التشخيصات الذي يحدث مرة واحدة بعد توقف الكتابة
+
+الاستخدام:
+    python benchmarks/bench_lsp.py [--size 1000000] [--keystrokes 2000]
+"""
+
+import argparse
+import io
+import random
+import time
+
+from corpus import load_base_corrections, synthetic_text
+from style_checker.lsp import LanguageServer
+from style_checker.matcher import Matcher
+
+URI = 'file:///bench.txt'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس كلفة ضغطة المفتاح في خادم LSP")
+    parser.add_argument('--size', type=int, default=1_000_000, help="طول المستند بالأحرف")
+    parser.add_argument('--keystrokes', type=int, default=2000)
+    args = parser.parse_args()
+
+    corrections = load_base_corrections()
+    server = LanguageServer(Matcher(corrections))
+    server._output = io.BytesIO()
+    text = synthetic_text(args.size, corrections)
+
+    started = time.perf_counter()
+    server.handle({'jsonrpc': '2.0', 'method': 'textDocument/didOpen', 'params': {
+        'textDocument': {'uri': URI, 'languageId': 'plaintext', 'version': 0, 'text': text}}})
+    open_time = time.perf_counter() - started
+    document = server.documents[URI]
+
+    rng = random.Random(0)
+    timings = []
+    for version in range(1, args.keystrokes + 1):
+        line = rng.randrange(len(document.lines))
+        character = rng.randint(0, len(document.lines[line]))
+        position = {'line': line, 'character': character}
+        message = {'jsonrpc': '2.0', 'method': 'textDocument/didChange', 'params': {
+            'textDocument': {'uri': URI, 'version': version},
+            'contentChanges': [{'range': {'start': position, 'end': position},
+                                'text': rng.choice(['ا', ' ', 'ل', '\n'])}]}}
+        started = time.perf_counter()
+        server.handle(message)
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    server.flush(now=float('inf'))
+    publish_time = time.perf_counter() - started
+
+    # بعد ضغطة مفتاح أخرى لا يعاد بناء إلا تشخيصات السطر المعدل
+    server.handle(message)
+    started = time.perf_counter()
+    server.flush(now=float('inf'))
+    republish_time = time.perf_counter() - started
+
+    timings.sort()
+    count = sum(len(matches) for matches in document.matches)
+    print(f"المستند: {len(text)} حرف، {len(document.lines)} سطر، {count} تشخيص")
+    print(f"فتح المستند وفحصه كاملاً: {open_time * 1000:.1f} مللي ث")
+    print(f"ضغطة المفتاح: p50 {timings[len(timings) // 2] * 1e6:.0f} ميكرو ث، "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} ميكرو ث، "
+          f"الأقصى {timings[-1] * 1e6:.0f} ميكرو ث")
+    print(f"إرسال التشخيصات بعد التوقف: {publish_time * 1000:.1f} مللي ث، "
+          f"ثم بعد تعديل سطر واحد: {republish_time * 1000:.1f} مللي ث")
+
+
+if __name__ == '__main__':
+    main()
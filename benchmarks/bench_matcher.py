@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+قياس تدرج محرك المطابقة مع حجم القاموس مقارنة بحلقة التعابير النمطية القديمة
+
+الاستخدام:
+    python benchmarks/bench_matcher.py [--text-size 200000] [--legacy-limit 2000]
+"""
+
+import argparse
+import re
+import time
+
+from corpus import synthetic_corrections, synthetic_text
+from style_checker.matcher import Matcher
+
+SIZES = [100, 763, 2000, 5000, 10000, 25000, 50000]
+
+
+def legacy_find_errors(corrections, text):
+    """الطريقة القديمة: تعبير نمطي مستقل لكل مدخل"""
+    count = 0
+    for wrong_word in corrections:
+        pattern = r'\b' + re.escape(wrong_word) + r'\b'
+        for _ in re.finditer(pattern, text, re.IGNORECASE):
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس أداء محرك المطابقة")
+    parser.add_argument('--text-size', type=int, default=200_000)
+    parser.add_argument('--legacy-limit', type=int, default=2000,
+                        help="أكبر قاموس تقاس عليه الطريقة القديمة")
+    args = parser.parse_args()
+
+    print(f"{'المداخل':>8} {'البناء (ث)':>12} {'المسح (ث)':>12} {'القديم (ث)':>12} {'الأخطاء':>9}")
+    for size in SIZES:
+        corrections = synthetic_corrections(size)
+        text = synthetic_text(args.text_size, corrections)
+
+        started = time.perf_counter()
+        matcher = Matcher(corrections)
+        build_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        errors = matcher.find_errors(text)
+        scan_time = time.perf_counter() - started
+
+        legacy = '-'
+        if size <= args.legacy_limit:
+            started = time.perf_counter()
+            legacy_find_errors(corrections, text)
+            legacy = f"{time.perf_counter() - started:.3f}"
+
+        print(f"{size:>8} {build_time:>12.3f} {scan_time:>12.3f} {legacy:>12} {len(errors):>9}")
+
+
+if __name__ == '__main__':
+    main()
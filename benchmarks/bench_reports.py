@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+قياس كتابة التقارير مع عدد كبير من الكلمات الخاطئة المختلفة
+الكتّاب المتدفقون في style_checker.reports مقابل جدول python-docx صفاً صفاً كما كان في الواجهة
+
+الاستخدام:
+    python benchmarks/bench_reports.py [--rows 1000 10000 50000] [--legacy-limit 5000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from corpus import synthetic_corrections
+from style_checker.aggregate import ErrorSummary
+from style_checker.reports import REPORT_SUFFIXES, write_report
+
+
+def synthetic_summary(rows):
+    """تجميع بعدد rows كلمة مختلفة، لكل منها عدة مواضع"""
+    corrections = synthetic_corrections(rows)
+    summary = ErrorSummary()
+    position = 0
+    for index, (word, correct) in enumerate(corrections.items()):
+        for _ in range(1 + index % 3):
+            summary.add({
+                'word': word,
+                'correct': correct,
+                'position': position,
+                'context': f"سياق قبل الكلمة {word} وسياق بعدها",
+            })
+            position += 50
+    return summary
+
+
+def legacy_docx_report(summary, file_path):
+    """الطريقة القديمة: صف وخلايا عبر python-docx لكل كلمة"""
+    from docx import Document
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    doc = Document()
+    table = doc.add_table(rows=1, cols=4)
+    table.style = 'Table Grid'
+    for entry in summary:
+        row = table.add_row()
+        row.cells[0].text = str(entry.count)
+        row.cells[1].text = entry.correct
+        row.cells[2].text = entry.word
+        row.cells[3].text = entry.context
+        for cell in row.cells:
+            cell.paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    doc.save(file_path)
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس كتابة التقارير")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--legacy-limit', type=int, default=5000,
+                        help="أكبر عدد صفوف تقاس عليه طريقة python-docx القديمة")
+    args = parser.parse_args()
+
+    columns = list(REPORT_SUFFIXES) + ['docx القديم']
+    print(f"{'الصفوف':>8} " + ' '.join(f"{name:>12}" for name in columns) + "   (ثوانٍ)")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            summary = synthetic_summary(rows)
+            results = []
+            for suffix in REPORT_SUFFIXES:
+                path = os.path.join(directory, f'report_{rows}{suffix}')
+                results.append(f"{timed(lambda: write_report(summary, path)):.3f}")
+            if rows <= args.legacy_limit:
+                path = os.path.join(directory, f'legacy_{rows}.docx')
+                results.append(f"{timed(lambda: legacy_docx_report(summary, path)):.3f}")
+            else:
+                results.append('-')
+            print(f"{rows:>8} " + ' '.join(f"{value:>12}" for value in results))
+
+
+if __name__ == '__main__':
+    main()
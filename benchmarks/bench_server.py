@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+اختبار حمل لخدمة الفحص عبر HTTP: زمن الاستجابة (p50 و p99) وعدد الطلبات في الثانية
+يشغّل نسخة محلية من الخدمة (أو يستعمل --url لخدمة تعمل مسبقاً) ثم يرسل الطلبات
+من عدة اتصالات دائمة متزامنة
+
+الاستخدام:
+    python benchmarks/bench_server.py [--concurrency 1 8 32] [--requests 2000] [--jobs 4]
+    python benchmarks/bench_server.py --url http://127.0.0.1:8750 --endpoint /correct
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from corpus import ROOT, load_base_corrections, synthetic_text
+
+
+def start_server(jobs):
+    """تشغيل الخدمة على منفذ متاح وانتظار سطر عنوانها"""
+    command = [sys.executable, '-m', 'style_checker', 'serve', '--port', '0']
+    if jobs is not None:
+        command += ['-j', str(jobs)]
+    process = subprocess.Popen(command, cwd=ROOT, stderr=subprocess.PIPE, text=True, encoding='utf-8')
+    line = process.stderr.readline()
+    if 'http://' not in line:
+        process.kill()
+        raise RuntimeError(f"تعذر تشغيل الخدمة: {line}{process.stderr.read()}")
+    return process, line[line.index('http://'):].split()[0]
+
+
+async def client(host, port, path, bodies, latencies):
+    """اتصال دائم واحد يرسل طلباته تباعاً"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            request = (f'POST {path} HTTP/1.1\r\nHost: {host}\r\n'
+                       f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n').encode() + body
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            status = int(head.split(b' ', 2)[1])
+            length = next(int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                          if line.lower().startswith(b'content-length:'))
+            await reader.readexactly(length)
+            if status != 200:
+                raise RuntimeError(f"استجابة غير متوقعة {status}")
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def run_load(url, path, bodies, concurrency):
+    """توزيع الطلبات على concurrency اتصالاً، ويرجع (الأزمنة، المدة الكلية)"""
+    address = urlsplit(url)
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(address.hostname, address.port, path, bodies[index::concurrency], latencies)
+                           for index in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="اختبار حمل لخدمة الفحص")
+    parser.add_argument('--url', help="عنوان خدمة تعمل مسبقاً (الافتراضي: تشغيل نسخة محلية)")
+    parser.add_argument('--endpoint', default='/check', choices=['/check', '/correct', '/check/batch'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--text-size', type=int, default=2000, help="طول نص كل طلب بالأحرف")
+    parser.add_argument('--jobs', type=int, default=None, help="عدد عمال الخدمة المحلية")
+    args = parser.parse_args()
+
+    corrections = load_base_corrections()
+    texts = [synthetic_text(args.text_size, corrections, seed=seed) for seed in range(50)]
+    if args.endpoint == '/check/batch':
+        payloads = [{'texts': texts[index % 50:index % 50 + 8]} for index in range(args.requests)]
+    else:
+        payloads = [{'text': texts[index % 50]} for index in range(args.requests)]
+    bodies = [json.dumps(payload, ensure_ascii=False).encode('utf-8') for payload in payloads]
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args.jobs)
+    try:
+        print(f"{url}{args.endpoint}، {args.requests} طلب بنص {args.text_size} حرف، "
+              f"{os.cpu_count()} معالج")
+        print(f"{'الاتصالات':>9} {'طلب/ث':>10} {'p50 (مللي ث)':>14} {'p99 (مللي ث)':>14}")
+        for concurrency in args.concurrency:
+            latencies, elapsed = asyncio.run(run_load(url, args.endpoint, bodies, concurrency))
+            print(f"{concurrency:>9} {len(latencies) / elapsed:>10.1f} "
+                  f"{percentile(latencies, 0.5) * 1000:>14.2f} {percentile(latencies, 0.99) * 1000:>14.2f}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
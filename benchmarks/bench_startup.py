@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن تحميل القاموس: البدء البارد (JSON + بناء + كتابة الفهرس) مقابل البدء الدافئ (mmap)
+ومع --gui: زمن ظهور نافذة الواجهة من بدء العملية، وزمن جاهزية القاموس بعده
+
+الاستخدام:
+    python benchmarks/bench_startup.py [--sizes 763 10000 50000] [--repeat 5]
+    python benchmarks/bench_startup.py --gui [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import ROOT, synthetic_corrections
+from style_checker.dictionary import artifact_path_for, load_dictionary
+from style_checker.matcher import Matcher
+
+
+def best_of(repeat, func):
+    """أفضل زمن من عدة محاولات"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+# يشغَّل في عملية جديدة: الأزمنة من بدء المفسر حتى أول رسم للنافذة ثم حتى تحميل القاموس
+GUI_SCRIPT = '''
+import importlib.util, json, sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+spec = importlib.util.spec_from_file_location('app', {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+window = module.StyleCheckerApp()
+window.show()
+window.repaint()
+shown = time.perf_counter()
+while window.matcher is None and time.perf_counter() - shown < 60:
+    app.processEvents()
+    time.sleep(0.001)
+ready = time.perf_counter()
+print(json.dumps({{'import': imported - started, 'window': shown - started, 'dictionary': ready - started}}))
+'''
+
+
+def measure_gui(repeat):
+    """أفضل أزمنة بدء الواجهة من عدة تشغيلات في عمليات جديدة"""
+    script = GUI_SCRIPT.format(path=os.path.join(ROOT, '0.1 أسلوبي.py'))
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'),
+               PYTHONPATH=ROOT)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {name: min(run[name] for run in runs) for name in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="قياس زمن البدء البارد والدافئ")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[763, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--gui', action='store_true', help="قياس زمن ظهور نافذة الواجهة بدل تحميل القاموس")
+    args = parser.parse_args()
+
+    if args.gui:
+        times = measure_gui(args.repeat)
+        print(f"استيراد الواجهة: {times['import']:.3f} ث، ظهور النافذة: {times['window']:.3f} ث، "
+              f"جاهزية القاموس: {times['dictionary']:.3f} ث")
+        return
+
+    print(f"{'المداخل':>8} {'JSON+بناء (ث)':>14} {'بارد (ث)':>10} {'دافئ (ث)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f'corrections_{size}.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(synthetic_corrections(size), file, ensure_ascii=False)
+
+            def uncached():
+                with open(path, 'r', encoding='utf-8') as file:
+                    Matcher(json.load(file))
+
+            def cold():
+                if os.path.exists(artifact_path_for(path)):
+                    os.remove(artifact_path_for(path))
+                load_dictionary(path)
+
+            uncached_time = best_of(args.repeat, uncached)
+            cold_time = best_of(args.repeat, cold)
+            warm_time = best_of(args.repeat, lambda: load_dictionary(path))
+            print(f"{size:>8} {uncached_time:>14.3f} {cold_time:>10.3f} {warm_time:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
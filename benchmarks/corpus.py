@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+توليد قواميس ونصوص عربية اصطناعية لقياس الأداء
+تعتمد على مفاتيح ملف corrections.json الحقيقي حتى تبقى توزيعات الأحرف واقعية
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+CORRECTIONS_PATH = ROOT / 'corrections.json'
+
+FILLER = (
+    "في هذا الفصل نعرض رأي الكاتب عن الموضوع الذي تناوله الباحثون من قبل "
+    "وقد ذكر المؤلف أن النص العربي يحتاج إلى مراجعة دقيقة قبل النشر "
+    "ثم انتقل إلى الحديث عن اللغة والأسلوب والمعنى في الكتاب والمقالة"
+).split()
+
+
+def load_base_corrections():
+    """تحميل القاموس الحقيقي المرفق بالمشروع"""
+    with open(CORRECTIONS_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def synthetic_corrections(size, seed=0):
+    """قاموس بحجم معين: المداخل الحقيقية ثم عبارات مركبة من مفرداتها"""
+    base = load_base_corrections()
+    corrections = dict(list(base.items())[:size])
+    vocabulary = sorted({word for key in base for word in key.split() if len(word) > 1})
+    rng = random.Random(seed)
+    while len(corrections) < size:
+        phrase = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(2, 4)))
+        corrections.setdefault(phrase, phrase.replace(' ', ' ال', 1))
+    return corrections
+
+
+def synthetic_text(size, corrections, error_rate=0.02, seed=0):
+    """نص عربي بطول size حرفاً تقريباً تتخلله مداخل من القاموس"""
+    rng = random.Random(seed)
+    keys = list(corrections)
+    words = FILLER + [word for key in keys[:2000] for word in key.split()]
+    parts = []
+    length = 0
+    while length < size:
+        token = rng.choice(keys) if rng.random() < error_rate else rng.choice(words)
+        parts.append(token)
+        length += len(token) + 1
+        if rng.random() < 0.05:
+            parts.append('.\n')
+    return ' '.join(parts)[:size]
+
+
+def write_synthetic_file(path, size, corrections, block_size=1 << 20, blocks=8):
+    """ملف نصي بطول size حرفاً تقريباً دون بنائه كاملاً في الذاكرة
+
+    يكرر عدداً محدوداً من الكتل المختلفة، فيبقى التوليد سريعاً للأحجام الكبيرة جداً.
+    """
+    pieces = [synthetic_text(block_size, corrections, seed=seed) + '\n' for seed in range(blocks)]
+    written = 0
+    index = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        while written < size:
+            piece = pieces[index % blocks][:size - written]
+            file.write(piece)
+            written += len(piece)
+            index += 1
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+مجموعة قياس موحدة للمسارات الحرجة مع تتبع التراجع بين الإيداعات
+تقيس الفحص (find_errors والمتدفق وبطبقات قواميس متعددة) وتحميل القاموس واستيراد Word وتصدير تقريره وزمن البدء
+على نصوص وقواميس اصطناعية من corrections.json، وتكتب النتائج بصيغة JSON للمقارنة لاحقاً
+
+الاستخدام:
+    python benchmarks/suite.py run [--profile quick|standard|full] [--filter find_errors] [-o results.json]
+    python benchmarks/suite.py compare الأساس.json الجديد.json [--threshold 0.2]
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import ROOT, synthetic_corrections, synthetic_text, write_synthetic_file
+from style_checker.dictionary import artifact_path_for, load_corrections, load_dictionary
+from style_checker.documents import read_docx
+from style_checker.layers import Layer
+from style_checker.matcher import Matcher
+from style_checker.streaming import check_file_streaming
+
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_THRESHOLD = 0.2
+# الحالات التي تعالج أكثر من هذا الحجم تقاس مرة واحدة
+SINGLE_RUN_BYTES = 50 << 20
+
+PROFILES = {
+    'quick': {
+        'dictionaries': [1_000, 10_000],
+        'texts': [10_000, 1_000_000],
+        'streams': [],
+        'pages': [50],
+        'rows': [10_000],
+        'layers': [1, 4],
+    },
+    'standard': {
+        'dictionaries': [1_000, 10_000, 100_000],
+        'texts': [10_000, 1_000_000, 10_000_000],
+        'streams': [100_000_000],
+        'pages': [50, 300],
+        'rows': [10_000, 50_000],
+        'layers': [1, 2, 4, 8],
+    },
+    'full': {
+        'dictionaries': [1_000, 10_000, 100_000],
+        'texts': [10_000, 1_000_000, 10_000_000],
+        'streams': [100_000_000, 500_000_000],
+        'pages': [50, 300],
+        'rows': [10_000, 50_000],
+        'layers': [1, 2, 4, 8],
+    },
+}
+
+GUI_SCRIPT = '''
+import importlib.util, sys
+from PyQt6.QtWidgets import QApplication
+spec = importlib.util.spec_from_file_location('app', {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+app = QApplication(sys.argv)
+window = module.StyleCheckerApp()
+window.show()
+# القاموس يحمّل في الخلفية بعد ظهور النافذة
+while window.matcher is None:
+    app.processEvents()
+window.close()
+'''
+
+
+def label(size):
+    """10000 ← 10k، 1000000 ← 1M"""
+    for factor, suffix in ((1_000_000_000, 'G'), (1_000_000, 'M'), (1_000, 'k')):
+        if size >= factor and size % factor == 0:
+            return f'{size // factor}{suffix}'
+    return str(size)
+
+
+class Context:
+    """المدخلات الاصطناعية المشتركة بين الحالات، تولد مرة واحدة عند أول حاجة"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = {}
+
+    def cached(self, key, factory):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def corrections(self, size):
+        return self.cached(('corrections', size), lambda: synthetic_corrections(size))
+
+    def corrections_path(self, size):
+        def write():
+            path = os.path.join(self.directory, f'corrections_{size}.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(self.corrections(size), file, ensure_ascii=False)
+            return path
+        return self.cached(('corrections_path', size), write)
+
+    def matcher(self, size):
+        return self.cached(('matcher', size), lambda: Matcher(self.corrections(size)))
+
+    def text(self, size, dictionary):
+        return self.cached(('text', size, dictionary),
+                           lambda: synthetic_text(size, self.corrections(dictionary)))
+
+    def layered_matcher(self, count, dictionary):
+        """محرك من القاموس نفسه موزعاً على count طبقة، ليقارن بالقاموس الواحد"""
+        def build():
+            items = list(self.corrections(dictionary).items())
+            paths = []
+            for index in range(count):
+                path = os.path.join(self.directory, f'layer_{dictionary}_{count}_{index}.json')
+                with open(path, 'w', encoding='utf-8') as file:
+                    json.dump(dict(items[index::count]), file, ensure_ascii=False)
+                paths.append(path)
+            layers = [Layer(f'layer{index}', path) for index, path in enumerate(paths[1:], 1)]
+            return load_dictionary(paths[0], layers=layers)
+        return self.cached(('layered', count, dictionary), build)
+
+    def text_file(self, size, dictionary):
+        def write():
+            path = os.path.join(self.directory, f'text_{size}_{dictionary}.txt')
+            write_synthetic_file(path, size, self.corrections(dictionary))
+            return path
+        return self.cached(('text_file', size, dictionary), write)
+
+    def docx(self, pages):
+        def build():
+            from bench_docx import build_document
+            path = os.path.join(self.directory, f'document_{pages}.docx')
+            build_document(path, pages, self.corrections(1_000))
+            return path
+        return self.cached(('docx', pages), build)
+
+
+def build_cases(profile):
+    """قائمة (الاسم، دالة التحضير) حيث ترجع دالة التحضير (الدالة المقاسة، حجم المدخل بالبايت)"""
+    cases = []
+    dictionaries = profile['dictionaries']
+    smallest = dictionaries[0]
+
+    for size in dictionaries:
+        def parse(ctx, size=size):
+            path = ctx.corrections_path(size)
+            return lambda: load_corrections(path), os.path.getsize(path)
+
+        def cold(ctx, size=size):
+            path = ctx.corrections_path(size)
+
+            def run():
+                if os.path.exists(artifact_path_for(path)):
+                    os.remove(artifact_path_for(path))
+                load_dictionary(path)
+            return run, os.path.getsize(path)
+
+        def warm(ctx, size=size):
+            path = ctx.corrections_path(size)
+            load_dictionary(path)
+            return lambda: load_dictionary(path), os.path.getsize(path)
+
+        cases += [
+            (f'load_corrections[dict={label(size)}]', parse),
+            (f'load_dictionary.cold[dict={label(size)}]', cold),
+            (f'load_dictionary.warm[dict={label(size)}]', warm),
+        ]
+
+    for dictionary in dictionaries:
+        for size in profile['texts']:
+            def find(ctx, size=size, dictionary=dictionary):
+                matcher = ctx.matcher(dictionary)
+                text = ctx.text(size, dictionary)
+                return lambda: matcher.find_errors(text), len(text.encode('utf-8'))
+            cases.append((f'find_errors[text={label(size)},dict={label(dictionary)}]', find))
+
+    # كلفة الفحص يجب ألا تتغير بعدد الطبقات: تدمج في آلة واحدة
+    layered_dictionary = dictionaries[min(1, len(dictionaries) - 1)]
+    layered_text = profile['texts'][min(1, len(profile['texts']) - 1)]
+    for count in profile['layers']:
+        def layered(ctx, count=count):
+            matcher = ctx.layered_matcher(count, layered_dictionary)
+            text = ctx.text(layered_text, layered_dictionary)
+            return lambda: matcher.find_errors(text), len(text.encode('utf-8'))
+        cases.append((f'find_errors.layered[layers={count},text={label(layered_text)},'
+                      f'dict={label(layered_dictionary)}]', layered))
+
+    for size in profile['streams']:
+        def stream(ctx, size=size):
+            matcher = ctx.matcher(smallest)
+            path = ctx.text_file(size, smallest)
+            return (lambda: sum(1 for _ in check_file_streaming(matcher, path, 'utf-8')),
+                    os.path.getsize(path))
+        cases.append((f'check_file_streaming[text={label(size)},dict={label(smallest)}]', stream))
+
+    for pages in profile['pages']:
+        def import_docx(ctx, pages=pages):
+            path = ctx.docx(pages)
+            return lambda: read_docx(path), os.path.getsize(path)
+        cases.append((f'import_docx[pages={pages}]', import_docx))
+
+    for rows in profile['rows']:
+        def export_docx(ctx, rows=rows):
+            from bench_reports import synthetic_summary
+            from style_checker.reports import write_docx_report
+            summary = ctx.cached(('summary', rows), lambda: synthetic_summary(rows))
+            path = os.path.join(ctx.directory, f'report_{rows}.docx')
+            return lambda: write_docx_report(summary, path), None
+        cases.append((f'export_docx_report[rows={label(rows)}]', export_docx))
+
+    def startup_cli(ctx):
+        command = [sys.executable, '-c', 'import style_checker.cli']
+        return lambda: subprocess.run(command, cwd=ROOT, check=True), None
+
+    def startup_gui(ctx):
+        # تخطي الحالة إن لم تكن المكتبة مثبتة، دون استيرادها في عملية القياس نفسها
+        if importlib.util.find_spec('PyQt6') is None:
+            raise ImportError("PyQt6 غير مثبتة")
+        script = GUI_SCRIPT.format(path=os.path.join(ROOT, '0.1 أسلوبي.py'))
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        command = [sys.executable, '-c', script]
+        return lambda: subprocess.run(command, cwd=ROOT, env=env, check=True, capture_output=True), None
+
+    cases += [('startup.cli', startup_cli), ('startup.gui', startup_gui)]
+    return cases
+
+
+def measure(func, repeat):
+    """أزمنة repeat تشغيلاً بعد تشغيل تمهيدي، أو تشغيل واحد للحالات الضخمة"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_run(args):
+    pattern = re.compile(args.filter) if args.filter else None
+    cases = [(name, prepare) for name, prepare in build_cases(PROFILES[args.profile])
+             if pattern is None or pattern.search(name)]
+    commit = git_commit()
+    meta = {
+        'commit': commit,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'profile': args.profile,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    results = {}
+
+    print(f"{'الحالة':<50} {'الوسيط (ث)':>11} {'الأدنى (ث)':>11} {'م.ب/ث':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        ctx = Context(directory)
+        for name, prepare in cases:
+            try:
+                func, size = prepare(ctx)
+            except ImportError as e:
+                print(f"{name:<50} تخطي: {e}")
+                continue
+            repeat = 1 if size and size > SINGLE_RUN_BYTES else args.repeat
+            if repeat > 1:
+                func()
+            times = measure(func, repeat)
+            result = {
+                'median': statistics.median(times),
+                'min': min(times),
+                'repeat': repeat,
+                'times': times,
+            }
+            if size:
+                result['bytes'] = size
+                result['mb_per_s'] = size / result['median'] / 1e6
+            results[name] = result
+            rate = f"{result['mb_per_s']:.2f}" if size else '-'
+            print(f"{name:<50} {result['median']:>11.4f} {result['min']:>11.4f} {rate:>8}", flush=True)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        output = os.path.join(RESULTS_DIRECTORY, f"{(commit or 'worktree')[:12]}-{args.profile}.json")
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump({'meta': meta, 'results': results}, file, ensure_ascii=False, indent=2)
+    print(f"\nكتبت النتائج في {output}")
+    return 0
+
+
+def compare(base, new, threshold):
+    """مقارنة وسيط كل حالة مشتركة، ويرجع [(الاسم، الأساس، الجديد، النسبة، تراجع؟)]"""
+    rows = []
+    for name, result in new['results'].items():
+        previous = base['results'].get(name)
+        if previous is None:
+            continue
+        ratio = result['median'] / previous['median'] if previous['median'] else float('inf')
+        rows.append((name, previous['median'], result['median'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def cmd_compare(args):
+    with open(args.base, 'r', encoding='utf-8') as file:
+        base = json.load(file)
+    with open(args.new, 'r', encoding='utf-8') as file:
+        new = json.load(file)
+    rows = compare(base, new, args.threshold)
+
+    print(f"الأساس: {base['meta'].get('commit')}  الجديد: {new['meta'].get('commit')}  "
+          f"حد التراجع: {args.threshold:.0%}")
+    print(f"{'الحالة':<50} {'الأساس (ث)':>11} {'الجديد (ث)':>11} {'النسبة':>8}")
+    for name, before, after, ratio, regressed in rows:
+        mark = '  ← تراجع' if regressed else ('  ← تحسن' if ratio < 1 / (1 + args.threshold) else '')
+        print(f"{name:<50} {before:>11.4f} {after:>11.4f} {ratio:>7.2f}x{mark}")
+    regressions = sum(row[4] for row in rows)
+    missing = sorted(set(base['results']) - set(new['results']))
+    if missing:
+        print(f"\nحالات غائبة عن النتائج الجديدة: {', '.join(missing)}")
+    print(f"\n{len(rows)} حالة مشتركة، {regressions} تراجع")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مجموعة قياس الأداء وتتبع التراجع")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="تشغيل القياسات وكتابة النتائج بصيغة JSON")
+    run_parser.add_argument('--profile', choices=sorted(PROFILES), default='quick',
+                            help="أحجام النصوص والقواميس (quick حتى 1M حرف، full حتى 500M)")
+    run_parser.add_argument('--filter', help="تعبير نمطي لاختيار الحالات بأسمائها")
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('-o', '--output', help=f"ملف النتائج (الافتراضي: {RESULTS_DIRECTORY}/<الإيداع>.json)")
+    run_parser.set_defaults(handler=cmd_run)
+
+    compare_parser = commands.add_parser('compare', help="مقارنة نتيجتين، ورمز الخروج 1 عند وجود تراجع")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help=f"نسبة التباطؤ التي تعد تراجعاً (الافتراضي: {DEFAULT_THRESHOLD})")
+    compare_parser.set_defaults(handler=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+أسلوبي - نواة الفحص
+وحدات مستقلة عن الواجهة الرسومية يمكن استخدامها من الواجهة أو من سطر الأوامر
+"""
+
+import importlib
+
+# كل اسم عام ووحدته؛ تستورد الوحدة عند أول استخدام للاسم لا عند استيراد الحزمة،
+# حتى لا يدفع من يحتاج وحدة واحدة كلفة الحزمة كلها (sqlite3 و mmap وغيرهما)
+_EXPORTS = {
+    'Matcher': 'matcher', 'CONTEXT_WIDTH': 'matcher',
+    'OVERLAP_ALL': 'matcher', 'OVERLAP_LONGEST': 'matcher', 'OVERLAP_NON_OVERLAPPING': 'matcher',
+    'compile_dictionary': 'dictionary', 'load_corrections': 'dictionary', 'load_dictionary': 'dictionary',
+    'Layer': 'layers',
+    'Normalizer': 'normalize', 'DEFAULT_NORMALIZER': 'normalize',
+    'ResultCache': 'cache', 'ResultStore': 'store', 'Profile': 'profiling',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+تجميع الأخطاء في مرور واحد
+لكل كلمة خاطئة: التصحيح، التكرار، أول ظهور، وجميع المواضع
+تستخدمه قائمة الأخطاء في الواجهة والتقارير بدل البحث الخطي عن أول ظهور لكل كلمة
+"""
+
+
+class ErrorEntry:
+    """أخطاء كلمة واحدة"""
+    __slots__ = ('word', 'correct', 'count', 'first', 'positions', 'layer')
+
+    def __init__(self, word, correct, first=None):
+        self.word = word
+        self.correct = correct
+        self.count = 0
+        self.first = first
+        self.positions = []
+        # طبقة القاموس التي جاء منها التصحيح عند استعمال قواميس متعددة
+        self.layer = first.get('layer') if first else None
+
+    @property
+    def context(self):
+        """سياق أول ظهور"""
+        return self.first['context'] if self.first else ''
+
+
+class ErrorSummary:
+    """تجميع الأخطاء حسب الكلمة بترتيب أول اكتشاف"""
+
+    def __init__(self, errors=()):
+        self.entries = {}
+        self.total = 0
+        self.add_many(errors)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def get(self, word):
+        return self.entries.get(word)
+
+    def add(self, error):
+        """إضافة خطأ واحد وإرجاع مدخل كلمته"""
+        word = error['word']
+        entry = self.entries.get(word)
+        if entry is None:
+            entry = self.entries[word] = ErrorEntry(word, error['correct'], error)
+        elif error['position'] < entry.first['position']:
+            # نتائج الفحص على دفعات لا تصل بالضرورة مرتبة حسب الموضع
+            entry.first = error
+        entry.count += 1
+        entry.positions.append(error['position'])
+        self.total += 1
+        return entry
+
+    def add_many(self, errors):
+        for error in errors:
+            self.add(error)
+
+    def adjust(self, word, correct, delta):
+        """تعديل تكرار كلمة دون مواضع (للفحص أثناء الكتابة)
+
+        يرجع المدخل بعد التعديل، أو None إذا نزل تكراره إلى الصفر فحُذف.
+        """
+        entry = self.entries.get(word)
+        if entry is None:
+            if delta <= 0:
+                return None
+            entry = self.entries[word] = ErrorEntry(word, correct)
+        entry.count += delta
+        self.total += delta
+        if entry.count <= 0:
+            self.total -= entry.count
+            del self.entries[word]
+            return None
+        return entry
+
+    def by_count(self):
+        """المداخل مرتبة تنازلياً حسب التكرار"""
+        return sorted(self.entries.values(), key=lambda entry: -entry.count)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+التصحيح التلقائي في مرور واحد من اليسار إلى اليمين
+تُختار المطابقات الأطول غير المتداخلة ثم يبنى النص المصحح قطعةً قطعة،
+فلا يفسد استبدال استبدالاً آخر وتبقى الكلفة خطية في طول النص
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+from .matcher import OVERLAP_LONGEST
+
+# أنواع قيم القاموس: لا يطبق تلقائياً إلا الاستبدال الصريح
+REPLACEMENT = 'replacement'
+ALTERNATIVE = 'alternative'   # "! أو ؟"، "أثر فيه أو به"
+HINT = 'hint'                 # "أحاله + مفعول"، "تحذف المسافة بعد الواو"
+UNCHANGED = 'unchanged'       # القيمة مطابقة للمفتاح
+
+KIND_LABELS = {
+    REPLACEMENT: "استبدال",
+    ALTERNATIVE: "بدائل",
+    HINT: "إرشاد",
+    UNCHANGED: "دون تغيير",
+}
+
+# عبارات تدل على أن القيمة شرح لا نص بديل
+_HINT_WORDS = ('تحذف', 'نحذف', 'حذف', 'نأتي', 'نستعمل', 'الصواب', 'مثل:')
+_HINT_MARKS = ('+', '(', ')', '..', '…')
+
+Edit = namedtuple('Edit', 'start end old new')
+
+
+def replacement_kind(wrong, correct):
+    """تصنيف قيمة المدخل: استبدال صريح، أو بدائل، أو إرشاد، أو دون تغيير"""
+    if correct == wrong:
+        return UNCHANGED
+    if any(mark in correct and mark not in wrong for mark in _HINT_MARKS):
+        return HINT
+    if any(word in correct for word in _HINT_WORDS):
+        return HINT
+    if ' أو ' in correct and ' أو ' not in wrong:
+        return ALTERNATIVE
+    return REPLACEMENT
+
+
+def plan_corrections(matcher, text, choices=None):
+    """تحديد التعديلات المطبقة والمطابقات المتروكة
+
+    choices قاموس {المفتاح: النص البديل} لاختيار قيمة صريحة لمداخل البدائل أو
+    الإرشاد أو لتغيير استبدال. يرجع (التعديلات، المتروكة) حيث كل متروكة
+    بالشكل (البداية، النهاية، الكلمة، القيمة، النوع).
+    """
+    choices = choices or {}
+    corrections = matcher.corrections
+    keys = matcher.keys
+    kinds = {}
+    edits = []
+    skipped = []
+    # المطابقة الأطول تحدد المقطع حتى لو كانت متروكة، فلا يطبق ما بداخلها من مداخل أقصر
+    for start, end, key_id in matcher.iter_matches(text, OVERLAP_LONGEST):
+        key = keys[key_id]
+        word = text[start:end]
+        if key in choices:
+            replacement = choices[key]
+        else:
+            correct = corrections[key]
+            kind = kinds.get(key_id)
+            if kind is None:
+                kind = kinds[key_id] = replacement_kind(key, correct)
+            if kind != REPLACEMENT:
+                skipped.append((start, end, word, correct, kind))
+                continue
+            replacement = correct
+        if replacement != word:
+            edits.append(Edit(start, end, word, replacement))
+    return edits, skipped
+
+
+def apply_edits(text, edits):
+    """بناء النص المصحح في مرور واحد من تعديلات مرتبة غير متداخلة"""
+    pieces = []
+    last = 0
+    for edit in edits:
+        pieces.append(text[last:edit.start])
+        pieces.append(edit.new)
+        last = edit.end
+    pieces.append(text[last:])
+    return ''.join(pieces)
+
+
+def correct_text(matcher, text, choices=None):
+    """تصحيح النص وإرجاع (النص المصحح، التعديلات، المتروكة)"""
+    edits, skipped = plan_corrections(matcher, text, choices)
+    return apply_edits(text, edits), edits, skipped
+
+
+def format_patch(text, edits, name='text', context=3):
+    """فرق موحد (unified diff) مبني مباشرة من التعديلات دون مقارنة النصين
+
+    لا تتجاوز المفاتيح حدود الأسطر، فيكفي تجميع الأسطر المعدلة مع context سطراً حولها.
+    """
+    if not edits:
+        return ''
+    line_starts = [0]
+    position = text.find('\n')
+    while position != -1:
+        line_starts.append(position + 1)
+        position = text.find('\n', position + 1)
+    if line_starts[-1] == len(text):
+        # سطر جديد في نهاية النص لا يبدأ سطراً آخر
+        line_starts.pop()
+    line_count = len(line_starts)
+
+    # تعديلات كل سطر
+    by_line = {}
+    for edit in edits:
+        by_line.setdefault(bisect_right(line_starts, edit.start) - 1, []).append(edit)
+
+    # دمج الأسطر المعدلة المتقاربة في مقاطع
+    hunks = []
+    for line in sorted(by_line):
+        low = max(0, line - context)
+        high = min(line_count, line + context + 1)
+        if hunks and low <= hunks[-1][1]:
+            hunks[-1][1] = high
+        else:
+            hunks.append([low, high])
+
+    output = [f'--- a/{name}\n', f'+++ b/{name}\n']
+    for low, high in hunks:
+        # لا يتغير عدد الأسطر لأن القيم لا تضيف أسطراً
+        output.append(f'@@ -{low + 1},{high - low} +{low + 1},{high - low} @@\n')
+        removed = []
+        added = []
+        for index in range(low, high):
+            end = line_starts[index + 1] if index + 1 < line_count else len(text)
+            line = text[line_starts[index]:end]
+            if index in by_line:
+                start = line_starts[index]
+                shifted = [edit._replace(start=edit.start - start, end=edit.end - start)
+                           for edit in by_line[index]]
+                removed.append('-' + line)
+                added.append('+' + apply_edits(line, shifted))
+                continue
+            # سطر سياق: يكتب قبله ما تجمع من أسطر محذوفة ومضافة
+            output.extend(_terminated(removed + added))
+            removed, added = [], []
+            output.extend(_terminated([' ' + line]))
+        output.extend(_terminated(removed + added))
+    return ''.join(output)
+
+
+def _terminated(lines):
+    """السطر الأخير من النص قد لا ينتهي بسطر جديد"""
+    return [line if line.endswith('\n') else line + '\n\\ No newline at end of file\n'
+            for line in lines]
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+الفحص الجماعي للمجلدات دون واجهة رسومية
+توزَّع الملفات على مجموعة عمليات، ويحمّل كل عامل القاموس مرة واحدة فقط
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from .cache import ResultCache, cached_file_errors, matcher_fingerprint
+from .dictionary import load_dictionary
+from .documents import SUPPORTED_SUFFIXES, document_author, read_document
+from .matcher import OVERLAP_LONGEST
+from .normalize import DEFAULT_NORMALIZER
+from .profiling import STAGE_LOAD, STAGE_READ, Profile, find_errors_profiled
+from .store import STORE_BATCH
+from .streaming import check_docx_streaming
+
+# محرك المطابقة وسياسة التداخل وذاكرة النتائج الخاصة بكل عملية عاملة
+_worker_matcher = None
+_worker_overlap = OVERLAP_LONGEST
+_worker_cache = None
+# هل يرفق العامل بكل نتيجة قياسات فحصها
+_worker_profiling = False
+
+
+def iter_paths(inputs, suffixes=SUPPORTED_SUFFIXES):
+    """توسيع المجلدات وأنماط glob إلى قائمة ملفات مرتبة دون تكرار"""
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = (
+                os.path.join(root, name)
+                for root, dirs, files in os.walk(item)
+                for name in sorted(files)
+            )
+        else:
+            candidates = sorted(glob.glob(item, recursive=True)) or [item]
+        for path in candidates:
+            if os.path.isdir(path) or not path.lower().endswith(suffixes):
+                continue
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+def _init_worker(corrections_path, normalizer, overlap, cache_path, profiling=False, layers=()):
+    """تحميل القاموس وفتح ذاكرة النتائج مرة واحدة لكل عملية عاملة"""
+    global _worker_matcher, _worker_overlap, _worker_cache, _worker_profiling
+    _worker_matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+    _worker_overlap = overlap
+    _worker_cache = ResultCache(cache_path) if cache_path else None
+    _worker_profiling = profiling
+
+
+def find_file_errors(path, matcher, overlap, profile=None, counts=None):
+    """أخطاء ملف واحد مرتبة حسب الموضع
+
+    counts قاموس اختياري يضاف إليه عدد أحرف النص 'chars' وكلماته 'words'.
+    """
+    if path.lower().endswith('.docx'):
+        # قراءة متدفقة لأجزاء المستند بدل تحميل نصه كاملاً
+        errors = list(check_docx_streaming(matcher, path, overlap=overlap, profile=profile, counts=counts))
+        errors.sort(key=lambda error: error['position'])
+        return errors
+    if profile is None:
+        text = read_document(path)
+    else:
+        with profile.stage(STAGE_READ):
+            text = read_document(path)
+    if counts is not None:
+        counts['chars'] = len(text)
+        counts['words'] = len(text.split())
+    if profile is None:
+        return matcher.find_errors(text, overlap)
+    return find_errors_profiled(matcher, text, overlap, profile)
+
+
+def check_file(path, matcher=None, overlap=None, cache=None, profile=None):
+    """فحص ملف واحد وإرجاع سجل النتيجة، من ذاكرة النتائج إن لم يتغير الملف
+
+    في العمليات العاملة مع القياس ترفق قياسات الملف بالنتيجة في 'profile'.
+    """
+    matcher = matcher or _worker_matcher
+    overlap = overlap or _worker_overlap
+    if cache is None:
+        cache = _worker_cache
+    attach = profile is None and _worker_profiling
+    if attach:
+        profile = Profile()
+    result = {'path': path, 'size': 0}
+    counts = {}
+    try:
+        result['size'] = os.path.getsize(path)
+        if cache is None:
+            errors = find_file_errors(path, matcher, overlap, profile, counts)
+        else:
+            hits = cache.hits
+            errors = cached_file_errors(
+                cache, matcher, path, overlap,
+                lambda counts: find_file_errors(path, matcher, overlap, profile, counts), counts)
+            result['cached'] = cache.hits > hits
+        result.update(counts)
+        result['count'] = len(errors)
+        result['errors'] = errors
+    except Exception as e:
+        result['error'] = str(e)
+    if attach:
+        profile.note_memory()
+        result['profile'] = profile.to_dict()
+    return result
+
+
+def run_batch(paths, corrections_path, output, jobs=None, chunksize=8,
+              normalizer=DEFAULT_NORMALIZER, overlap=OVERLAP_LONGEST, cache_path=None, profile=None,
+              layers=(), store=None, author=None):
+    """فحص الملفات وكتابة النتائج بصيغة JSON Lines، وإرجاع إحصائيات التشغيل
+
+    layers طبقات قواميس فوق الملف الأساسي (layers.py).
+    cache_path مسار ذاكرة النتائج، فلا يعاد فحص ملف لم يتغير محتواه منذ تشغيل سابق.
+    profile سجل Profile تجمع فيه قياسات الملفات من كل العمال؛ وإذا طلب فيه
+    التقاط (cProfile أو tracemalloc) جرى الفحص في العملية نفسها ليشمله الالتقاط.
+    store قاعدة ResultStore تسجل فيها الفحوص على دفعات، بالمؤلف author أو بمؤلف
+    كل ملف Word من خصائصه.
+    """
+    if profile is not None and profile.capture is not None:
+        jobs = 1
+    # ترجمة الفهرس مرة واحدة قبل تشغيل العمال حتى يحمّلوه جاهزاً
+    if profile is None:
+        matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+    else:
+        with profile.stage(STAGE_LOAD):
+            matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+    stats = {'files': 0, 'failed': 0, 'cached': 0, 'errors': 0, 'bytes': 0}
+    started = time.perf_counter()
+    pending = []
+    fingerprint = matcher_fingerprint(matcher).hex() if store is not None else None
+
+    def consume(results):
+        for result in results:
+            measured = result.pop('profile', None)
+            if measured is not None:
+                profile.merge(measured)
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            if store is not None and 'errors' in result:
+                pending.append({'path': os.path.abspath(result['path']), 'errors': result['errors'],
+                                'author': author or document_author(result['path']),
+                                'chars': result.get('chars'), 'words': result.get('words'),
+                                'dictionary': fingerprint})
+                if len(pending) >= STORE_BATCH:
+                    store.record_many(pending)
+                    pending.clear()
+            stats['files'] += 1
+            stats['bytes'] += result['size']
+            stats['errors'] += result.get('count', 0)
+            stats['failed'] += 'error' in result
+            stats['cached'] += result.get('cached', False)
+
+    if jobs == 1:
+        cache = ResultCache(cache_path) if cache_path else None
+        try:
+            if profile is None:
+                consume(check_file(path, matcher, overlap, cache) for path in paths)
+            else:
+                with profile.capturing():
+                    consume(check_file(path, matcher, overlap, cache, profile) for path in paths)
+        finally:
+            if cache is not None:
+                cache.close()
+    else:
+        initargs = (corrections_path, normalizer, overlap, cache_path, profile is not None, layers)
+        with Pool(jobs, initializer=_init_worker, initargs=initargs) as pool:
+            consume(pool.imap_unordered(check_file, paths, chunksize=chunksize))
+    if pending:
+        store.record_many(pending)
+
+    stats['seconds'] = time.perf_counter() - started
+    if profile is not None:
+        profile.note_memory()
+    return stats
+
+
+def format_throughput(stats):
+    """ملخص الإنتاجية: ملفات/ث و ميغابايت/ث"""
+    seconds = stats['seconds'] or 1e-9
+    return (
+        f"{stats['files']} ملف ({stats['failed']} فشل، {stats['cached']} من الذاكرة)، {stats['errors']} خطأ، "
+        f"{stats['seconds']:.2f} ث | {stats['files'] / seconds:.1f} ملف/ث، "
+        f"{stats['bytes'] / seconds / 1e6:.2f} ميغابايت/ث"
+    )
+
+
+def open_output(path):
+    """فتح ملف المخرجات، أو المخرج القياسي إذا لم يحدد مسار"""
+    if not path or path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8')
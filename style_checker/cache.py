@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+ذاكرة دائمة لنتائج الفحص مفهرسة ببصمة المحتوى
+تحفظ في SQLite بمفتاح من بصمة النص وبصمة القاموس وخيارات الفحص، مع حد للحجم
+يحذف الأقدم استعمالاً عند تجاوزه. تخزن النتائج للمستند كاملاً ولكل فقرة، فلا يعاد
+عند تعديل فقرة واحدة إلا فحصها هي
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+from .dictionary import ARTIFACT_VERSION
+from .matcher import OVERLAP_ALL, make_error
+
+# رقم صيغة القيم المخزنة، ويدخل في كل مفتاح؛ 2: مواضع ملفات TXT بنهايات أسطرها الأصلية،
+# 3: مفتاح القاموس في الأخطاء وعدد أحرف الملف وكلماته مع أخطائه
+CACHE_VERSION = 3
+DEFAULT_MAX_BYTES = 128 << 20
+# عدد الفقرات المستعلم عنها في استعلام واحد
+PARAGRAPH_BATCH = 256
+# لا يفحص الحجم الكلي بعد كل كتابة بل بعد هذا القدر من البايتات المضافة
+_EVICTION_CHECK = 1 << 20
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+'''
+
+# بصمات القواميس المحسوبة، تزول مع زوال محرك المطابقة
+_fingerprints = weakref.WeakKeyDictionary()
+
+
+def default_cache_path():
+    """مسار الذاكرة الافتراضي في مجلد ذاكرة المستخدم"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'aslobi', 'results.sqlite')
+
+
+def matcher_fingerprint(matcher):
+    """بصمة القاموس وخط التوحيد وإصدار المحرك، تتغير بتغير أي منها"""
+    fingerprint = _fingerprints.get(matcher)
+    if fingerprint is None:
+        digest = hashlib.sha256()
+        # ترتيب المداخل يؤثر في اختيار المفتاح عند تساوي المطابقات، فلا يرتب
+        digest.update(json.dumps(matcher.corrections, ensure_ascii=False).encode('utf-8'))
+        # النتائج المخزنة تشير إلى المفاتيح بأرقامها، والمحرك المعدل تدريجياً يرقّمها بغير
+        # ترتيب القاموس، فتدخل قائمة المفاتيح بأرقامها في البصمة
+        digest.update(json.dumps(matcher.keys, ensure_ascii=False).encode('utf-8'))
+        # والطبقة التي جاء منها كل مفتاح تظهر في كل خطأ، فتغير ترتيب الطبقات يبطل النتائج
+        digest.update(json.dumps(matcher.sources, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        features = sorted(matcher.normalizer.features) if matcher.normalizer is not None else []
+        digest.update(repr((ARTIFACT_VERSION, CACHE_VERSION, features)).encode('utf-8'))
+        fingerprint = _fingerprints[matcher] = digest.digest()
+    return fingerprint
+
+
+def _key(prefix, text):
+    """مفتاح بطول 20 بايت من البادئة (القاموس والخيارات) والنص"""
+    digest = hashlib.blake2b(prefix, digest_size=20)
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+
+class ResultCache:
+    """مخزن النتائج: قيم JSON بمفاتيح ثنائية، مع إخلاء الأقدم استعمالاً
+
+    يمكن مشاركته بين خيط الواجهة وخيط الفحص، وبين عدة عمليات على الملف نفسه.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._added = 0
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            if self.path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+
+    def get_many(self, keys):
+        """القيم الموجودة من المفاتيح المطلوبة {المفتاح: القيمة}، مع تحديث زمن استعمالها"""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for index in range(0, len(keys), PARAGRAPH_BATCH):
+                batch = keys[index:index + PARAGRAPH_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f'SELECT key, value FROM results WHERE key IN ({placeholders})', batch)
+                found.update((bytes(key), json.loads(value)) for key, value in rows)
+            if found:
+                now = time.time()
+                with self._connection:
+                    self._connection.executemany(
+                        'UPDATE results SET used = ? WHERE key = ?', ((now, key) for key in found))
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items):
+        """تخزين أزواج (المفتاح، القيمة) ثم إخلاء الأقدم إن تجاوز الحجم الحد"""
+        now = time.time()
+        rows = []
+        for key, value in items:
+            data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+            rows.append((key, data, len(key) + len(data.encode('utf-8')), now))
+        if not rows:
+            return
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)', rows)
+            self._added += sum(row[2] for row in rows)
+            if self._added >= _EVICTION_CHECK:
+                self._added = 0
+                self._evict()
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def _evict(self):
+        """حذف الأقدم استعمالاً حتى يعود الحجم إلى 90% من الحد"""
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        excess = total - self.max_bytes * 9 // 10
+        if total <= self.max_bytes or excess <= 0:
+            return
+        freed = 0
+        threshold = None
+        for used, size in self._connection.execute('SELECT used, size FROM results ORDER BY used'):
+            freed += size
+            threshold = used
+            if freed >= excess:
+                break
+        with self._connection:
+            self._connection.execute('DELETE FROM results WHERE used <= ?', (threshold,))
+
+    def size(self):
+        """الحجم المخزن بالبايت"""
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM results')
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _options_prefix(matcher, overlap, kind):
+    """بادئة المفاتيح: بصمة القاموس وسياسة التداخل ونوع المدخل"""
+    return matcher_fingerprint(matcher) + f'\0{overlap}\0{kind}\0'.encode('utf-8')
+
+
+def iter_cached_batches(matcher, text, cache, overlap=OVERLAP_ALL):
+    """فحص النص مع الرجوع إلى الذاكرة أولاً، وإرجاع (ما فُحص من النص، أخطاؤه) على دفعات
+
+    المطابقات لا تتجاوز حدود الأسطر، فتفحص الفقرات الغائبة عن الذاكرة وحدها وتضم
+    إلى المخزن منها. الأخطاء مرتبة حسب الموضع والسياق مأخوذ من النص كاملاً.
+    """
+    corrections = matcher.corrections
+    keys = matcher.keys
+
+    def errors_from(flat, offset):
+        return [make_error(text, offset + flat[index], offset + flat[index + 1],
+                           corrections[keys[flat[index + 2]]], matcher.layer_of(flat[index + 2]),
+                           keys[flat[index + 2]])
+                for index in range(0, len(flat), 3)]
+
+    document_key = _key(_options_prefix(matcher, overlap, 'text'), text)
+    document = cache.get(document_key)
+    if document is not None:
+        yield len(text), errors_from(document, 0)
+        return
+
+    prefix = _options_prefix(matcher, overlap, 'paragraph')
+    document = []
+    paragraphs = []
+    position = 0
+    while position <= len(text):
+        end = text.find('\n', position)
+        if end == -1:
+            end = len(text)
+        paragraphs.append((position, end))
+        position = end + 1
+
+    for index in range(0, len(paragraphs), PARAGRAPH_BATCH):
+        chunk = paragraphs[index:index + PARAGRAPH_BATCH]
+        batch = [(start, end, _key(prefix, text[start:end])) for start, end in chunk if end > start]
+        found = cache.get_many(key for _, _, key in batch)
+        missing = []
+        errors = []
+        for start, end, key in batch:
+            flat = found.get(key)
+            if flat is None:
+                matches = sorted(matcher.iter_matches(text[start:end], overlap))
+                flat = [value for match in matches for value in match]
+                missing.append((key, flat))
+            errors.extend(errors_from(flat, start))
+            for column in range(0, len(flat), 3):
+                document += (flat[column] + start, flat[column + 1] + start, flat[column + 2])
+        cache.put_many(missing)
+        yield chunk[-1][1], errors
+
+    cache.put(document_key, document)
+
+
+def find_errors_cached(matcher, text, cache, overlap=OVERLAP_ALL):
+    """مثل Matcher.find_errors مع الرجوع إلى الذاكرة"""
+    return [error for _, errors in iter_cached_batches(matcher, text, cache, overlap)
+            for error in errors]
+
+
+def file_digest_key(matcher, file_path, overlap=OVERLAP_ALL):
+    """مفتاح نتائج ملف كامل من بصمة محتواه بالبايت، دون قراءة نصه أو تحليله"""
+    digest = hashlib.blake2b(_options_prefix(matcher, overlap, 'file'), digest_size=20)
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def cached_file_errors(cache, matcher, file_path, overlap, check, counts=None):
+    """أخطاء ملف من الذاكرة إن لم يتغير محتواه، وإلا check(counts) ثم تخزين نتيجتها
+
+    check يضيف إلى القاموس counts عدد أحرف النص 'chars' وكلماته 'words'، فيحفظان
+    مع الأخطاء ويعادان فيه عند الرجوع إلى الذاكرة.
+    """
+    counts = {} if counts is None else counts
+    key = file_digest_key(matcher, file_path, overlap)
+    value = cache.get(key)
+    if value is None:
+        value = {'errors': check(counts), 'chars': counts.get('chars'), 'words': counts.get('words')}
+        cache.put(key, value)
+    else:
+        counts.update(chars=value['chars'], words=value['words'])
+    return value['errors']
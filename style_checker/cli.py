@@ -0,0 +1,688 @@
+# -*- coding: utf-8 -*-
+"""
+واجهة سطر الأوامر لأسلوبي (بدون واجهة رسومية)
+
+الاستخدام:
+    python -m style_checker compile [corrections.json] [-o الفهرس] [-n diacritics,tatweel]
+    python -m style_checker lint [corrections.json] [--sample مجلد_المقالات/] [-o منظف.json] [--json تحليل.json]
+    python -m style_checker batch المجلدات/الأنماط... [-d corrections.json] [-o results.jsonl] [-j 4] [--overlap all] [--cache] [--profile قياسات.json]
+    python -m style_checker stream ملف_كبير.txt|مستند.docx [-d corrections.json] [-o errors.jsonl]
+    python -m style_checker correct المجلدات/الأنماط... [-w] [-c "المفتاح=البديل"] [-o changes.diff]
+    python -m style_checker report المجلدات/الأنماط... -o تقرير.docx|csv|jsonl|txt [-d corrections.json] [-l house=دار.json]
+    python -m style_checker serve [--host 127.0.0.1] [--port 8750] [-j 4] [--watch]
+    python -m style_checker lsp [-d corrections.json] [--watch]
+    python -m style_checker diff قديم.docx جديد.docx | --patch changes.diff | --cached | -r REV [-r REV] [-d corrections.json]
+    python -m style_checker diff --install-hook
+    python -m style_checker batch المجلدات/الأنماط... --store [results.db] [--author الاسم]
+    python -m style_checker query documents "الكلمة" | entries | trend [--by author] [--period month] [--db results.db]
+    python -m style_checker stats collect المجلدات/الأنماط... -o جزء.stats [--shard 0/4] [-j 4]
+    python -m style_checker stats merge الأجزاء.stats... -o الكل.stats
+    python -m style_checker stats report الكل.stats [-d corrections.json] [--top 20] [--json تقرير.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+# الوحدات المشتركة بين الأوامر وحدها؛ ووحدة كل أمر (الخادم، LSP، الإحصاءات، قاعدة النتائج،
+# الفحص الجماعي...) تستورد في معالجه، فلا يدفع خطاف diff --cached مثلاً كلفة asyncio و sqlite3
+from .dictionary import artifact_path_for, compile_dictionary, load_corrections, load_dictionary, save_corrections
+from .layers import parse_layer
+from .lint import SHOWN
+from .matcher import OVERLAP_LABELS, OVERLAP_LONGEST, OVERLAP_POLICIES
+from .normalize import DEFAULT_FEATURES, FEATURES, parse_features
+
+DEFAULT_CORRECTIONS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'corrections.json'
+)
+
+
+def cmd_compile(args):
+    """ترجمة ملف التصحيحات إلى فهرس ثنائي"""
+    output = args.output or artifact_path_for(args.corrections)
+    started = time.perf_counter()
+    matcher = compile_dictionary(args.corrections, output, args.normalize)
+    elapsed = time.perf_counter() - started
+    print(f"تمت ترجمة {len(matcher)} تصحيح إلى {output} في {elapsed:.3f} ث")
+    return 0
+
+
+def cmd_lint(args):
+    """تحليل القاموس وكتابة نسخة منظفة منه مع فهرسها"""
+    from .batch import iter_paths
+    from .documents import read_document
+    from .lint import lint_dictionary
+    corrections = load_corrections(args.corrections)
+    samples = [read_document(path) for path in iter_paths(args.sample)] if args.sample else ()
+    lint = lint_dictionary(corrections, args.normalize, samples, args.top)
+    print(lint.format(args.top))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(lint.to_dict(), file, ensure_ascii=False, indent=2)
+    if args.output:
+        cleaned = lint.cleaned(args.drop_boundary)
+        save_corrections(args.output, cleaned)
+        matcher = compile_dictionary(args.output, normalizer=args.normalize)
+        line = (f"كتب القاموس المنظف في {args.output}: {len(cleaned)} مدخل "
+                f"(حذف {len(corrections) - len(cleaned)})، حالات الآلة {len(lint.matcher._goto)} ← {len(matcher._goto)}")
+        if samples:
+            line += f"، مسح العينة {_scan_seconds(lint.matcher, samples):.3f} ث ← {_scan_seconds(matcher, samples):.3f} ث"
+        print(line)
+        if args.normalize is not None:
+            print("القاموس المنظف مبني على خط التوحيد المستعمل؛ المكررات المحذوفة تختلف في المطابقة الحرفية")
+    return 0
+
+
+def _scan_seconds(matcher, samples, repeat=3):
+    """أفضل زمن لمسح العينة من عدة مرات"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in samples:
+            for _ in matcher.iter_matches(text, OVERLAP_LONGEST):
+                pass
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def cmd_batch(args):
+    """فحص مجلدات كاملة من ملفات TXT و DOCX"""
+    from .batch import format_throughput, iter_paths, open_output, run_batch
+    from .store import ResultStore
+    paths = list(iter_paths(args.inputs))
+    if not paths:
+        print("لم يتم العثور على ملفات للفحص", file=sys.stderr)
+        return 1
+
+    profile = open_profile(args)
+    store = ResultStore(args.store) if args.store else None
+    output = open_output(args.output)
+    try:
+        stats = run_batch(paths, args.dictionary, output, jobs=args.jobs, chunksize=args.chunksize,
+                          normalizer=args.normalize, overlap=args.overlap, cache_path=args.cache,
+                          profile=profile, layers=args.layers, store=store, author=args.author)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if store is not None:
+            store.close()
+    print(format_throughput(stats), file=sys.stderr)
+    write_profile(args, profile)
+    return 0
+
+
+def cmd_stream(args):
+    """فحص ملف نصي كبير أو ملف Word على دفعات وكتابة كل خطأ في سطر JSON"""
+    from .batch import open_output
+    from .streaming import check_docx_streaming, check_file_streaming
+    matcher = load_dictionary(args.dictionary, normalizer=args.normalize, layers=args.layers)
+    output = open_output(args.output)
+    count = 0
+    if args.file.lower().endswith('.docx'):
+        errors = check_docx_streaming(matcher, args.file, overlap=args.overlap)
+    else:
+        errors = check_file_streaming(matcher, args.file, args.encoding, args.chunk_size, args.overlap)
+    try:
+        for error in errors:
+            output.write(json.dumps(error, ensure_ascii=False) + '\n')
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"تم اكتشاف {count} خطأ", file=sys.stderr)
+    return 0
+
+
+def cmd_report(args):
+    """فحص ملفات وكتابة تقرير مجمع حسب الكلمة بصيغة امتداد ملف المخرجات"""
+    from .aggregate import ErrorSummary
+    from .batch import find_file_errors, iter_paths
+    from .cache import ResultCache, cached_file_errors
+    from .profiling import STAGE_AGGREGATE, STAGE_EXPORT, STAGE_LOAD
+    from .reports import write_report
+    from .streaming import check_docx_streaming, check_file_streaming
+    paths = list(iter_paths(args.inputs))
+    if not paths:
+        print("لم يتم العثور على ملفات للفحص", file=sys.stderr)
+        return 1
+
+    profile = open_profile(args)
+    loaded = time.perf_counter()
+    matcher = load_dictionary(args.dictionary, normalizer=args.normalize, layers=args.layers)
+    started = time.perf_counter()
+    summary = ErrorSummary()
+    cache = ResultCache(args.cache) if args.cache else None
+    if profile is None:
+        add_errors = summary.add_many
+    else:
+        profile.add(STAGE_LOAD, started - loaded)
+
+        def add_errors(errors):
+            # تجمع أخطاء الملف أولاً حتى لا يختلط زمن الفحص بزمن التجميع
+            errors = list(errors)
+            with profile.stage(STAGE_AGGREGATE):
+                summary.add_many(errors)
+    try:
+        with profile.capturing() if profile is not None else contextlib.nullcontext():
+            for path in paths:
+                if cache is not None:
+                    add_errors(cached_file_errors(
+                        cache, matcher, path, args.overlap,
+                        lambda counts: find_file_errors(path, matcher, args.overlap, profile, counts)))
+                elif path.lower().endswith('.docx'):
+                    add_errors(check_docx_streaming(matcher, path, overlap=args.overlap, profile=profile))
+                else:
+                    add_errors(check_file_streaming(matcher, path, overlap=args.overlap, profile=profile))
+    finally:
+        if cache is not None:
+            cache.close()
+    checked = time.perf_counter()
+    write_report(summary, args.output)
+    finished = time.perf_counter()
+    if profile is not None:
+        profile.add(STAGE_EXPORT, finished - checked)
+    print(f"{len(paths)} ملف، {summary.total} خطأ في {len(summary)} كلمة | "
+          f"الفحص {checked - started:.2f} ث، كتابة التقرير {finished - checked:.2f} ث",
+          file=sys.stderr)
+    write_profile(args, profile)
+    return 0
+
+
+def parse_choice(value):
+    """تحويل "المفتاح=البديل" إلى زوج"""
+    key, separator, replacement = value.partition('=')
+    if not separator or not key:
+        raise ValueError(value)
+    return key, replacement
+
+
+def cmd_correct(args):
+    """تطبيق الاستبدالات الصريحة على ملفات نصية وإخراج الفرق أو إعادة كتابة الملفات"""
+    from .autocorrect import KIND_LABELS, correct_text, format_patch
+    from .batch import iter_paths, open_output
+    from .streaming import detect_encoding
+    paths = list(iter_paths(args.inputs, suffixes=('.txt',)))
+    if not paths:
+        print("لم يتم العثور على ملفات نصية للتصحيح", file=sys.stderr)
+        return 1
+
+    matcher = load_dictionary(args.dictionary, normalizer=args.normalize, layers=args.layers)
+    choices = dict(args.choose)
+    output = None if args.write else open_output(args.output)
+    applied = 0
+    skipped_kinds = {}
+    started = time.perf_counter()
+    try:
+        for path in paths:
+            encoding = detect_encoding(path)
+            # newline='' يحفظ نهايات الأسطر الأصلية عند إعادة الكتابة
+            with open(path, 'r', encoding=encoding, newline='') as file:
+                text = file.read()
+            corrected, edits, skipped = correct_text(matcher, text, choices)
+            applied += len(edits)
+            for *_, kind in skipped:
+                skipped_kinds[kind] = skipped_kinds.get(kind, 0) + 1
+            if not edits:
+                continue
+            if args.write:
+                with open(path, 'w', encoding=encoding, newline='') as file:
+                    file.write(corrected)
+            else:
+                output.write(format_patch(text, edits, os.path.relpath(path), args.context))
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    skipped_text = '، '.join(f"{KIND_LABELS[kind]} {count}" for kind, count in skipped_kinds.items())
+    print(f"{len(paths)} ملف، {applied} تصحيح مطبق في {elapsed:.2f} ث"
+          + (f" | متروك: {skipped_text}" if skipped_text else ''), file=sys.stderr)
+    return 0
+
+
+def cmd_serve(args):
+    """تشغيل خدمة الفحص عبر HTTP حتى الإيقاف بـ Ctrl+C"""
+    import asyncio
+    from .server import CheckServer
+    server = CheckServer(args.dictionary, args.normalize, args.jobs, args.overlap, args.layers)
+    if args.watch:
+        server.watch()
+
+    def ready(address):
+        print(f"خدمة الفحص تعمل على http://{address[0]}:{address[1]} "
+              f"({len(server.matcher)} تصحيح، {server.jobs} عامل)", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+def cmd_lsp(args):
+    """خادم LSP عبر المدخل والمخرج القياسيين، يشغّله المحرر"""
+    from .lsp import LanguageServer
+    matcher = load_dictionary(args.dictionary, normalizer=args.normalize, layers=args.layers)
+    server = LanguageServer(matcher, args.overlap)
+    if args.watch:
+        server.watch(args.dictionary, args.layers)
+    return server.run()
+
+
+def cmd_diff(args):
+    """فحص التعديلات وحدها والإبلاغ عن الأخطاء التي أدخلتها، بحالة خروج 1 إن وجدت"""
+    from .diffcheck import changed_lines, git_changes, install_hook, new_errors, parse_unified_diff
+    from .documents import read_document
+    if args.install_hook:
+        options = f" --overlap {args.overlap}"
+        if args.normalize is None:
+            options += " -n none"
+        else:
+            options += f" -n {','.join(sorted(args.normalize.features))}"
+        for layer in args.layers:
+            options += f' -l "{layer.name}={os.path.abspath(layer.path)}"'
+        print(f"تم تثبيت خطاف pre-commit في {install_hook(args.dictionary, options)}")
+        return 0
+
+    started = time.perf_counter()
+    if args.patch:
+        if args.patch == '-':
+            changes = parse_unified_diff(sys.stdin.read())
+        else:
+            with open(args.patch, encoding='utf-8', errors='replace') as file:
+                changes = parse_unified_diff(file.read())
+    elif args.cached or args.revisions:
+        changes = git_changes(args.revisions, args.cached, args.files)
+    elif len(args.files) == 2:
+        old_path, new_path = args.files
+        changes = [changed_lines(new_path, read_document(old_path), read_document(new_path))]
+    else:
+        print("حدد ملفين (القديم ثم الجديد)، أو --patch، أو --cached، أو -r", file=sys.stderr)
+        return 2
+
+    matcher = load_dictionary(args.dictionary, normalizer=args.normalize, layers=args.layers)
+    count = 0
+    lines = 0
+    for change in changes:
+        lines += len(change.added)
+        for error in new_errors(matcher, change, args.overlap):
+            count += 1
+            if args.json:
+                print(json.dumps(dict(error, path=change.path), ensure_ascii=False))
+            else:
+                layer = f" [{error['layer']}]" if 'layer' in error else ''
+                print(f"{change.path}:{error['line']}:{error['position'] + 1}: "
+                      f"{error['word']} ← {error['correct']}{layer}")
+    print(f"{count} خطأ جديد في {len(changes)} ملف، {lines} سطر مضاف أو معدل، "
+          f"{time.perf_counter() - started:.2f} ث", file=sys.stderr)
+    return 1 if count else 0
+
+
+def cmd_query(args):
+    """استعلام من قاعدة نتائج الفحص دون إعادة الفحص"""
+    from .store import ResultStore
+    if not os.path.exists(args.db):
+        print(f"لا توجد قاعدة نتائج في {args.db}؛ سجّل فيها بـ batch --store", file=sys.stderr)
+        return 1
+    store = ResultStore(args.db)
+    started = time.perf_counter()
+    try:
+        if args.query == 'documents':
+            rows = store.documents_with(args.word, args.author, args.limit)
+            lines = [f"{row['count']:>8}  {row['path']}" + (f"  ({row['author']})" if row['author'] else '')
+                     for row in rows]
+        elif args.query == 'entries':
+            rows = store.top_entries(args.author, args.limit)
+            lines = [f"{row['count']:>8}  {row['documents']:>6} مستند  {row['word']} ← {row['correct']}"
+                     for row in rows]
+        else:
+            rows = store.trend(args.by, args.period, args.author)
+            lines = [f"{row['name'] or '—'}  {row['period']}  {row['documents']} مستند، {row['errors']} خطأ"
+                     + (f"، {row['density']} لكل ألف كلمة" if row['density'] is not None else '')
+                     for row in rows]
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print('\n'.join(lines))
+    print(f"{len(rows)} نتيجة في {elapsed * 1000:.1f} م.ث", file=sys.stderr)
+    return 0
+
+
+def cmd_stats_collect(args):
+    """حساب إحصاءات شريحة من الملفات وكتابتها في ملف جزء"""
+    from .batch import iter_paths
+    from .stats import collect_stats, select_shard
+    paths = list(iter_paths(args.inputs))
+    if args.shard:
+        paths = select_shard(paths, args.shard)
+    if not paths:
+        print("لم يتم العثور على ملفات للفحص", file=sys.stderr)
+        return 1
+    stats, seconds = collect_stats(paths, args.dictionary, args.normalize, args.overlap, args.jobs,
+                                   args.chunksize, args.layers)
+    stats.save(args.output)
+    totals = stats.totals
+    print(f"{totals['documents']} مستند ({totals['failed']} فشل)، {totals['words']:,} كلمة، "
+          f"{totals['errors']:,} خطأ، {seconds:.2f} ث ← {args.output} ({os.path.getsize(args.output):,} بايت)",
+          file=sys.stderr)
+    return 0
+
+
+def cmd_stats_merge(args):
+    """دمج ملفات الأجزاء في ملف واحد"""
+    from .stats import merge_shards
+    started = time.perf_counter()
+    merged = merge_shards(args.shards)
+    merged.save(args.output)
+    print(f"تم دمج {len(args.shards)} جزء ({merged.totals['documents']} مستند) في {args.output} "
+          f"في {time.perf_counter() - started:.3f} ث", file=sys.stderr)
+    return 0
+
+
+def cmd_stats_report(args):
+    """تقرير من ملف إحصاءات بأسماء المداخل من القاموس الذي حسب به"""
+    from .stats import CorpusStats, format_report
+    stats = CorpusStats.load(args.shard)
+    matcher = load_dictionary(args.dictionary, normalizer=args.normalize, layers=args.layers)
+    report = stats.report(matcher, args.top)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+def add_normalize_argument(parser):
+    """خيار خط التوحيد المشترك بين الأوامر"""
+    parser.add_argument('-n', '--normalize', type=parse_features, default=','.join(DEFAULT_FEATURES),
+                        help=f"مراحل التوحيد مفصولة بفواصل من: {', '.join(FEATURES)}، "
+                             f"أو none للمطابقة الحرفية (الافتراضي: {','.join(DEFAULT_FEATURES)})")
+
+
+def add_overlap_argument(parser):
+    """خيار سياسة التداخل بين المداخل المتداخلة"""
+    parser.add_argument('--overlap', choices=OVERLAP_POLICIES, default=OVERLAP_LONGEST,
+                        help="سياسة المطابقات المتداخلة: "
+                             + "، ".join(f"{policy} ({OVERLAP_LABELS[policy]})" for policy in OVERLAP_POLICIES)
+                             + f" (الافتراضي: {OVERLAP_LONGEST})")
+
+
+def layer_option(value):
+    """parse_layer لخيار سطر الأوامر، فتظهر رسالة خطئها للمستخدم بدل رسالة argparse العامة"""
+    try:
+        return parse_layer(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_layer_argument(parser):
+    """طبقات قواميس فوق ملف التصحيحات الأساسي، والأخيرة أعلاها أولوية"""
+    parser.add_argument('-l', '--layer', dest='layers', type=layer_option, action='append', default=[],
+                        metavar='[الاسم=]المسار',
+                        help="قاموس إضافي (للدار أو المشروع) فوق الأساسي، يمكن تكراره والأخير يغلب؛ "
+                             "القيمة null فيه تُسقط المدخل من الطبقات الأدنى، وتذكر الطبقة في كل خطأ")
+
+
+def add_watch_argument(parser):
+    """خيار إعادة تحميل القاموس عند تعديل ملفه"""
+    parser.add_argument('--watch', action='store_true',
+                        help="مراقبة ملف التصحيحات وإعادة تحميله عند تعديله دون إعادة التشغيل")
+
+
+def add_cache_argument(parser):
+    """خيار ذاكرة النتائج: لا يعاد فحص ملف لم يتغير منذ تشغيل سابق"""
+    from .cache import DEFAULT_MAX_BYTES, default_cache_path
+    parser.add_argument('--cache', nargs='?', const=default_cache_path(), default=None, metavar='PATH',
+                        help=f"استعمال ذاكرة النتائج (الافتراضي: {default_cache_path()}، "
+                             f"بحد {DEFAULT_MAX_BYTES >> 20} م.ب)")
+
+
+def add_profile_argument(parser):
+    """خيارات القياس: أزمنة المراحل بصيغة JSON، والتقاط cProfile أو tracemalloc"""
+    from .profiling import CAPTURES
+    parser.add_argument('--profile', metavar='PATH',
+                        help="كتابة قياسات التشغيل (أزمنة المراحل، الحجم، المطابقات لكل كلمة، ذروة الذاكرة) "
+                             "بصيغة JSON، و - للمخرج القياسي للأخطاء")
+    parser.add_argument('--capture', choices=CAPTURES,
+                        help="التقاط ملف تعريف للفحص وإضافة أثقل الدوال أو التخصيصات إلى القياسات "
+                             "(يجري الفحص حينها في العملية نفسها)")
+
+
+def open_profile(args):
+    """سجل القياس المطلوب بالخيارات، أو None"""
+    if args.profile is None and args.capture is None:
+        return None
+    from .profiling import Profile
+    return Profile(args.capture)
+
+
+def write_profile(args, profile):
+    """كتابة القياسات إلى الملف المطلوب، أو عرضها مقروءة على مخرج الأخطاء"""
+    if profile is None:
+        return
+    if args.profile and args.profile != '-':
+        profile.dump(args.profile)
+    else:
+        print(profile.format(), file=sys.stderr)
+
+
+def build_parser(command=None):
+    """بناء محلل الوسائط مع الأوامر الفرعية
+
+    تضاف وسائط الأمر command وحده (وكل الأوامر إذا كان None)، فلا تستورد وحدات الأوامر
+    الأخرى من أجل قيمها الافتراضية.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m style_checker',
+        description="أسلوبي - أداة تصحيح الأخطاء اللغوية من سطر الأوامر"
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = commands.add_parser('compile', help="ترجمة ملف التصحيحات إلى فهرس ثنائي")
+    compile_parser.set_defaults(handler=cmd_compile)
+    if command in (None, 'compile'):
+        compile_parser.add_argument('corrections', nargs='?', default=DEFAULT_CORRECTIONS,
+                                    help="ملف التصحيحات (JSON)")
+        compile_parser.add_argument('-o', '--output', help="مسار ملف الفهرس")
+        add_normalize_argument(compile_parser)
+
+    lint_parser = commands.add_parser('lint', help="تحليل القاموس: المداخل الميتة والمكررة والمتداخلة والمستأثرة بالمطابقات")
+    lint_parser.set_defaults(handler=cmd_lint)
+    if command in (None, 'lint'):
+        lint_parser.add_argument('corrections', nargs='?', default=DEFAULT_CORRECTIONS,
+                                 help="ملف التصحيحات (JSON)")
+        lint_parser.add_argument('--sample', nargs='+', metavar='PATH',
+                                 help="نصوص عينة (مجلدات أو ملفات أو أنماط glob) تحصى عليها المطابقات لكل مدخل")
+        lint_parser.add_argument('--top', type=int, default=SHOWN, help="عدد الأمثلة المعروضة من كل فئة")
+        lint_parser.add_argument('--json', metavar='PATH', help="كتابة التحليل كاملاً بصيغة JSON")
+        lint_parser.add_argument('-o', '--output', metavar='PATH',
+                                 help="كتابة قاموس منظف دون المداخل التي لا تطابق أبداً، مع ترجمة فهرسه")
+        lint_parser.add_argument('--drop-boundary', action='store_true',
+                                 help="حذف المداخل التي لا تطابق إلا ملتصقة بكلمة أيضاً من القاموس المنظف")
+        add_normalize_argument(lint_parser)
+
+    batch_parser = commands.add_parser('batch', help="فحص مجلدات من ملفات TXT و DOCX")
+    batch_parser.set_defaults(handler=cmd_batch)
+    if command in (None, 'batch'):
+        from .store import default_store_path
+        batch_parser.add_argument('inputs', nargs='+', help="مجلدات أو ملفات أو أنماط glob")
+        batch_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                  help="ملف التصحيحات (JSON)")
+        batch_parser.add_argument('-o', '--output', help="ملف النتائج بصيغة JSON Lines (الافتراضي: المخرج القياسي)")
+        batch_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                  help="عدد العمليات (الافتراضي: عدد المعالجات، 1 للتشغيل في العملية نفسها)")
+        batch_parser.add_argument('--chunksize', type=int, default=8, help="عدد الملفات المرسلة لكل عامل دفعة واحدة")
+        add_layer_argument(batch_parser)
+        add_normalize_argument(batch_parser)
+        add_overlap_argument(batch_parser)
+        add_cache_argument(batch_parser)
+        add_profile_argument(batch_parser)
+        batch_parser.add_argument('--store', nargs='?', const=default_store_path(), default=None, metavar='PATH',
+                                  help=f"تسجيل الفحوص وأخطائها في قاعدة نتائج SQLite للاستعلام عنها لاحقاً "
+                                       f"(الافتراضي: {default_store_path()})")
+        batch_parser.add_argument('--author', help="مؤلف الملفات في قاعدة النتائج (الافتراضي: مؤلف ملف Word من خصائصه)")
+
+    stream_parser = commands.add_parser('stream', help="فحص ملف نصي كبير أو ملف Word على دفعات بذاكرة ثابتة")
+    stream_parser.set_defaults(handler=cmd_stream)
+    if command in (None, 'stream'):
+        from .streaming import CHUNK_SIZE
+        stream_parser.add_argument('file', help="الملف النصي أو ملف Word")
+        stream_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                   help="ملف التصحيحات (JSON)")
+        stream_parser.add_argument('-o', '--output', help="ملف الأخطاء بصيغة JSON Lines (الافتراضي: المخرج القياسي)")
+        stream_parser.add_argument('--encoding', help="ترميز الملف (الافتراضي: اكتشاف تلقائي)")
+        stream_parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="حجم الدفعة بالأحرف")
+        add_layer_argument(stream_parser)
+        add_normalize_argument(stream_parser)
+        add_overlap_argument(stream_parser)
+
+    correct_parser = commands.add_parser('correct', help="تطبيق التصحيحات على ملفات نصية")
+    correct_parser.set_defaults(handler=cmd_correct)
+    if command in (None, 'correct'):
+        correct_parser.add_argument('inputs', nargs='+', help="مجلدات أو ملفات أو أنماط glob")
+        correct_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                    help="ملف التصحيحات (JSON)")
+        correct_parser.add_argument('-o', '--output', help="ملف الفرق (الافتراضي: المخرج القياسي)")
+        correct_parser.add_argument('-w', '--write', action='store_true',
+                                    help="إعادة كتابة الملفات بدل إخراج الفرق")
+        correct_parser.add_argument('-c', '--choose', type=parse_choice, action='append', default=[],
+                                    metavar='المفتاح=البديل',
+                                    help="اختيار بديل صريح لمدخل قيمته بدائل أو إرشاد (يمكن تكراره)")
+        correct_parser.add_argument('-U', '--context', type=int, default=3, help="أسطر السياق في الفرق")
+        add_layer_argument(correct_parser)
+        add_normalize_argument(correct_parser)
+
+    report_parser = commands.add_parser('report', help="فحص ملفات وكتابة تقرير مجمع حسب الكلمة")
+    report_parser.set_defaults(handler=cmd_report)
+    if command in (None, 'report'):
+        from .reports import REPORT_SUFFIXES
+        report_parser.add_argument('inputs', nargs='+', help="مجلدات أو ملفات أو أنماط glob")
+        report_parser.add_argument('-o', '--output', required=True,
+                                   help=f"ملف التقرير، وتحدد صيغته بامتداده ({', '.join(REPORT_SUFFIXES)})")
+        report_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                   help="ملف التصحيحات (JSON)")
+        add_layer_argument(report_parser)
+        add_normalize_argument(report_parser)
+        add_overlap_argument(report_parser)
+        add_cache_argument(report_parser)
+        add_profile_argument(report_parser)
+
+    serve_parser = commands.add_parser('serve', help="خدمة فحص محلية عبر HTTP بقاموس محمّل مرة واحدة")
+    serve_parser.set_defaults(handler=cmd_serve)
+    if command in (None, 'serve'):
+        from .server import DEFAULT_HOST, DEFAULT_PORT
+        serve_parser.add_argument('--host', default=DEFAULT_HOST, help=f"عنوان الاستماع (الافتراضي: {DEFAULT_HOST})")
+        serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                                  help=f"المنفذ، و0 لاختيار منفذ متاح (الافتراضي: {DEFAULT_PORT})")
+        serve_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                  help="ملف التصحيحات (JSON)")
+        serve_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                  help="عدد العمليات العاملة (الافتراضي: عدد المعالجات، 0 للفحص في العملية نفسها)")
+        add_watch_argument(serve_parser)
+        add_layer_argument(serve_parser)
+        add_normalize_argument(serve_parser)
+        add_overlap_argument(serve_parser)
+
+    lsp_parser = commands.add_parser('lsp', help="خادم Language Server Protocol للمحررات عبر stdio")
+    lsp_parser.set_defaults(handler=cmd_lsp)
+    if command in (None, 'lsp'):
+        lsp_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                help="ملف التصحيحات (JSON)")
+        add_watch_argument(lsp_parser)
+        add_layer_argument(lsp_parser)
+        add_normalize_argument(lsp_parser)
+        add_overlap_argument(lsp_parser)
+
+    diff_parser = commands.add_parser('diff', help="فحص الأسطر المضافة أو المعدلة وحدها والإبلاغ عن الأخطاء الجديدة")
+    diff_parser.set_defaults(handler=cmd_diff)
+    if command in (None, 'diff'):
+        diff_parser.add_argument('files', nargs='*',
+                                 help="النسخة القديمة ثم الجديدة من مستند، أو مسارات تحصر الفحص مع --cached و -r")
+        diff_parser.add_argument('--patch', metavar='PATH', help="فرق موحد (diff -u أو git diff)، و - للمدخل القياسي")
+        diff_parser.add_argument('--cached', action='store_true',
+                                 help="التعديلات المجهزة للإيداع في git (لخطاف pre-commit)")
+        diff_parser.add_argument('-r', '--rev', dest='revisions', action='append', default=[], metavar='REV',
+                                 help="مراجعة git: مرة للمقارنة بشجرة العمل، ومرتين للمقارنة بين مراجعتين")
+        diff_parser.add_argument('--json', action='store_true', help="إخراج كل خطأ في سطر JSON")
+        diff_parser.add_argument('--install-hook', action='store_true',
+                                 help="تثبيت خطاف pre-commit يرفض الإيداع إذا أدخل أخطاء جديدة")
+        diff_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS, help="ملف التصحيحات (JSON)")
+        add_layer_argument(diff_parser)
+        add_normalize_argument(diff_parser)
+        add_overlap_argument(diff_parser)
+
+    query_parser = commands.add_parser('query', help="استعلام من قاعدة نتائج الفحص المسجلة بـ batch --store")
+    if command in (None, 'query'):
+        from .store import PERIODS, TREND_GROUPS, default_store_path
+        query_commands = query_parser.add_subparsers(dest='query', required=True)
+        documents_parser = query_commands.add_parser('documents', help="المستندات التي تحتوي كلمة خاطئة في آخر فحص لها")
+        documents_parser.add_argument('word', help="مفتاح القاموس أو الكلمة كما ظهرت في النص")
+        entries_parser = query_commands.add_parser('entries', help="أكثر الكلمات الخاطئة تكراراً في آخر فحص لكل مستند")
+        trend_parser = query_commands.add_parser('trend', help="تطور عدد الأخطاء وكثافتها لكل مؤلف أو مستند")
+        trend_parser.add_argument('--by', choices=TREND_GROUPS, default='author', help="التجميع (الافتراضي: author)")
+        trend_parser.add_argument('--period', choices=PERIODS, default='month', help="الفترة (الافتراضي: month)")
+        for sub_parser in (documents_parser, entries_parser, trend_parser):
+            sub_parser.add_argument('--db', default=default_store_path(),
+                                    help=f"قاعدة النتائج (الافتراضي: {default_store_path()})")
+            sub_parser.add_argument('--author', help="قصر النتائج على مؤلف واحد")
+            sub_parser.add_argument('--json', action='store_true', help="إخراج النتائج بصيغة JSON")
+            sub_parser.set_defaults(handler=cmd_query)
+        documents_parser.add_argument('--limit', type=int, default=None, help="أقصى عدد من المستندات")
+        entries_parser.add_argument('--limit', type=int, default=SHOWN, help="عدد الكلمات المعروضة")
+
+    stats_parser = commands.add_parser('stats', help="إحصاءات مجموعة نصوص كاملة في أجزاء قابلة للدمج")
+    if command in (None, 'stats'):
+        from .stats import parse_shard
+        stats_commands = stats_parser.add_subparsers(dest='stats_command', required=True)
+        collect_parser = stats_commands.add_parser('collect', help="حساب إحصاءات ملفات (أو شريحة منها) في ملف جزء")
+        collect_parser.add_argument('inputs', nargs='+', help="مجلدات أو ملفات أو أنماط glob")
+        collect_parser.add_argument('-o', '--output', required=True, help="ملف الجزء")
+        collect_parser.add_argument('--shard', type=parse_shard, metavar='i/n',
+                                    help="معالجة الشريحة i من n من قائمة الملفات المرتبة فقط، لتوزيعها على عدة أجهزة")
+        collect_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                    help="عدد العمليات (الافتراضي: عدد المعالجات، 1 للتشغيل في العملية نفسها)")
+        collect_parser.add_argument('--chunksize', type=int, default=8, help="عدد الملفات المرسلة لكل عامل دفعة واحدة")
+        merge_parser = stats_commands.add_parser('merge', help="دمج ملفات الأجزاء المحسوبة بالقاموس نفسه")
+        merge_parser.add_argument('shards', nargs='+', help="ملفات الأجزاء")
+        merge_parser.add_argument('-o', '--output', required=True, help="ملف الإحصاءات المدمجة")
+        stats_report_parser = stats_commands.add_parser('report', help="عرض ملف إحصاءات")
+        stats_report_parser.add_argument('shard', help="ملف جزء أو ملف مدمج")
+        stats_report_parser.add_argument('--top', type=int, default=SHOWN, help="عدد المداخل والأزواج المعروضة")
+        stats_report_parser.add_argument('--json', metavar='PATH', help="كتابة التقرير بصيغة JSON")
+        for sub_parser in (collect_parser, stats_report_parser):
+            sub_parser.add_argument('-d', '--dictionary', default=DEFAULT_CORRECTIONS,
+                                    help="ملف التصحيحات (JSON)")
+            add_layer_argument(sub_parser)
+            add_normalize_argument(sub_parser)
+        add_overlap_argument(collect_parser)
+        collect_parser.set_defaults(handler=cmd_stats_collect)
+        merge_parser.set_defaults(handler=cmd_stats_merge)
+        stats_report_parser.set_defaults(handler=cmd_stats_report)
+
+    return parser
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    # لا خيارات قبل الأمر غير -h، فأول وسيط لا يبدأ بـ - هو اسمه
+    parser = build_parser(next((arg for arg in argv if not arg.startswith('-')), ''))
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+تحميل قاموس التصحيحات وترجمته إلى ملف فهرس ثنائي
+يُحمَّل الفهرس عبر mmap عند بدء التشغيل ويعاد بناؤه تلقائياً عند تغير ملف JSON
+
+الفهرس بيانات فقط لا تنفذ عند قراءتها: ترويسة، ثم جدول أقسام، ثم أقسام JSON
+(البيانات الوصفية والقاموس) ومصفوفات أعداد لجداول الآلة تقرأ من mmap مباشرة،
+فلا تبنى انتقالات الحالة ومخرجاتها إلا عند أول مرور للمسح بها
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+
+from .matcher import Matcher
+from .normalize import DEFAULT_NORMALIZER, Normalizer
+
+# يرفع رقم الإصدار عند كل تغيير في صيغة الفهرس أو البنية الداخلية لمحرك المطابقة
+ARTIFACT_MAGIC = b'ASLB'
+ARTIFACT_VERSION = 5
+ARTIFACT_SUFFIX = '.idx'
+
+# المعرف، الإصدار، بصمة المصدر، زمن التعديل، الحجم، طول الحمولة، CRC32 للحمولة،
+# ثم حشو حتى تبدأ الحمولة على حد _ALIGN
+_HEADER = struct.Struct('<4sH32sqqQI6x')
+# أقسام الحمولة بترتيبها في جدول الأقسام: (البداية من أول الحمولة، الطول) لكل قسم
+_SECTIONS = (
+    'meta', 'corrections', 'pattern_offsets', 'patterns', 'lengths', 'open_end',
+    'fail', 'depth', 'out_offsets', 'out_ids', 'edge_offsets', 'edge_chars', 'edge_targets',
+)
+_SECTION = struct.Struct('<QQ')
+_ALIGN = 8
+# نوع عناصر المصفوفات؛ الفهرس المكتوب بحجم أو ترتيب بايتات آخر يعاد بناؤه
+_INT = 'I' if array('I').itemsize == 4 else 'L'
+
+# إعادة التحميل: يعدَّل المحرك القائم إذا لم يتغير أكثر من هذا العدد من المفاتيح،
+# ويعاد بناؤه إذا زادت أرقام المفاتيح المحذوفة المحجوزة على ربع القاموس (وعلى هذا العدد)
+INCREMENTAL_LIMIT = 5000
+
+# نتيجة إعادة التحميل: المحرك الجديد، المفاتيح المضافة والمحذوفة والمعدلة، وهل عُدل
+# المحرك القائم أم أعيد بناؤه، والزمن بالثواني
+ReloadResult = namedtuple('ReloadResult', 'matcher added removed changed incremental seconds')
+
+
+def _parse_corrections(data):
+    corrections = json.loads(data)
+    if not isinstance(corrections, dict):
+        raise ValueError("ملف التصحيحات يجب أن يكون قاموساً من الشكل {\"الخطأ\": \"الصواب\"}")
+    return corrections
+
+
+def load_corrections(file_path):
+    """قراءة ملف التصحيحات بصيغة JSON"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return _parse_corrections(file.read())
+
+
+def save_corrections(file_path, corrections):
+    """كتابة قاموس التصحيحات بصيغة corrections.json: مدخل في كل سطر"""
+    lines = ',\n'.join(f'{json.dumps(key, ensure_ascii=False)}:{json.dumps(value, ensure_ascii=False)}'
+                       for key, value in corrections.items())
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write('{\n' + lines + '\n}\n')
+
+
+def file_digest(file_path):
+    """بصمة SHA-256 لمحتوى الملف"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def artifact_path_for(file_path):
+    """مسار ملف الفهرس المقابل لملف التصحيحات"""
+    return os.fspath(file_path) + ARTIFACT_SUFFIX
+
+
+def compile_dictionary(file_path, artifact_path=None, normalizer=DEFAULT_NORMALIZER):
+    """بناء محرك المطابقة من ملف JSON وحفظه في ملف فهرس"""
+    artifact_path = artifact_path or artifact_path_for(file_path)
+    stat = os.stat(file_path)
+    digest = file_digest(file_path)
+    matcher = Matcher(load_corrections(file_path), normalizer)
+    _write_artifact(artifact_path, matcher, digest, stat.st_mtime_ns, stat.st_size)
+    return matcher
+
+
+class _LazyStates(dict):
+    """جدول حالات يبنى كل عنصر منه من مصفوفات الفهرس عند أول طلب له
+
+    len يرجع عدد الحالات الكلي لا عدد المبني منها، كطول قائمة الحالات في المحرك المبني.
+    """
+
+    def __init__(self, count, build):
+        super().__init__()
+        self._count = count
+        self._build = build
+
+    def __missing__(self, state):
+        value = self[state] = self._build(state)
+        return value
+
+    def __len__(self):
+        return self._count
+
+
+class _StringTable(Sequence):
+    """نصوص UTF-8 متتالية في الفهرس، يفك كل منها عند طلبه"""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+
+def _features(normalizer):
+    return None if normalizer is None else sorted(normalizer.features)
+
+
+def _encode_matcher(matcher):
+    """أقسام الفهرس لمحرك مبني، بترتيب _SECTIONS"""
+    goto = matcher._goto
+    out = matcher._out
+    states = range(len(goto))
+    meta = {
+        'byteorder': sys.byteorder,
+        'itemsize': array(_INT).itemsize,
+        'normalizer': _features(matcher.normalizer),
+        'sources': matcher.sources,
+        'checks': [[key_id, _features(partial), expected]
+                   for key_id, (partial, expected) in sorted(matcher._checks.items())],
+    }
+    patterns = [pattern.encode('utf-8') for pattern in matcher.patterns]
+    pattern_offsets = array(_INT, [0])
+    for pattern in patterns:
+        pattern_offsets.append(pattern_offsets[-1] + len(pattern))
+    out_offsets = array(_INT, [0])
+    out_ids = array(_INT)
+    edge_offsets = array(_INT, [0])
+    edge_chars = array(_INT)
+    edge_targets = array(_INT)
+    for state in states:
+        out_ids.extend(out[state])
+        out_offsets.append(len(out_ids))
+        transitions = goto[state]
+        edge_chars.extend(map(ord, transitions))
+        edge_targets.extend(transitions.values())
+        edge_offsets.append(len(edge_chars))
+    return (
+        json.dumps(meta, ensure_ascii=False).encode('utf-8'),
+        json.dumps(matcher.corrections, ensure_ascii=False).encode('utf-8'),
+        pattern_offsets.tobytes(),
+        b''.join(patterns),
+        array(_INT, matcher.lengths).tobytes(),
+        array(_INT, sorted(matcher._open_end)).tobytes(),
+        array(_INT, matcher._fail).tobytes(),
+        array(_INT, matcher._depth).tobytes(),
+        out_offsets.tobytes(),
+        out_ids.tobytes(),
+        edge_offsets.tobytes(),
+        edge_chars.tobytes(),
+        edge_targets.tobytes(),
+    )
+
+
+def _pack_sections(sections):
+    """جدول الأقسام ثم الأقسام نفسها، كل قسم على حد _ALIGN حتى تقرأ مصفوفاته مباشرة"""
+    table = []
+    offset = _SECTION.size * len(sections)
+    for data in sections:
+        offset += -offset % _ALIGN
+        table.append(_SECTION.pack(offset, len(data)))
+        offset += len(data)
+    parts = table
+    position = _SECTION.size * len(sections)
+    for data in sections:
+        padding = -position % _ALIGN
+        parts.append(b'\0' * padding)
+        parts.append(data)
+        position += padding + len(data)
+    return b''.join(parts)
+
+
+def _decode_matcher(view, normalizer):
+    """محرك من حمولة الفهرس (memoryview على mmap)، أو None إن بني بخط توحيد آخر
+
+    المصفوفات تبقى على mmap، وانتقالات كل حالة ومخرجاتها تبنى عند أول مرور بها.
+    """
+    table_size = _SECTION.size * len(_SECTIONS)
+    if len(view) < table_size:
+        raise ValueError("جدول أقسام الفهرس ناقص")
+    sections = {}
+    for index, name in enumerate(_SECTIONS):
+        offset, length = _SECTION.unpack_from(view, index * _SECTION.size)
+        if offset < table_size or offset + length > len(view):
+            raise ValueError(f"قسم الفهرس {name} خارج الملف")
+        sections[name] = view[offset:offset + length]
+    meta = json.loads(str(sections['meta'], 'utf-8'))
+    if meta['byteorder'] != sys.byteorder or meta['itemsize'] != array(_INT).itemsize:
+        return None
+    # الفهرس مبني بخط توحيد آخر (مثلاً بعد تغيير الإعدادات)
+    if meta['normalizer'] != _features(normalizer):
+        return None
+    corrections = json.loads(str(sections['corrections'], 'utf-8'))
+    if not isinstance(corrections, dict):
+        raise ValueError("قاموس الفهرس تالف")
+    ints = {name: sections[name].cast(_INT) for name in _SECTIONS[2:] if name != 'patterns'}
+    fail = ints['fail']
+    count = len(fail)
+    if (len(ints['depth']) != count or len(ints['out_offsets']) != count + 1
+            or len(ints['edge_offsets']) != count + 1 or len(ints['lengths']) != len(corrections)
+            or len(ints['pattern_offsets']) != len(corrections) + 1):
+        raise ValueError("جداول الفهرس غير متسقة")
+
+    out_offsets, out_ids = ints['out_offsets'], ints['out_ids']
+    edge_offsets, edge_chars, edge_targets = ints['edge_offsets'], ints['edge_chars'], ints['edge_targets']
+
+    def transitions(state):
+        start, end = edge_offsets[state], edge_offsets[state + 1]
+        return dict(zip(map(chr, edge_chars[start:end]), edge_targets[start:end]))
+
+    def outputs(state):
+        return tuple(out_ids[out_offsets[state]:out_offsets[state + 1]])
+
+    partials = {}
+    checks = {}
+    for key_id, features, expected in meta['checks']:
+        features = tuple(features)
+        if features not in partials:
+            partials[features] = Normalizer(features)
+        checks[key_id] = (partials[features], expected)
+    return Matcher.from_tables(
+        corrections, normalizer, meta['sources'],
+        _StringTable(ints['pattern_offsets'], sections['patterns']), ints['lengths'],
+        checks, frozenset(ints['open_end']),
+        _LazyStates(count, transitions), fail, _LazyStates(count, outputs), ints['depth'],
+    )
+
+
+def _write_artifact(artifact_path, matcher, digest, mtime_ns, size):
+    """كتابة الفهرس في ملف مؤقت ثم استبداله دفعة واحدة"""
+    if matcher.keys != list(matcher.corrections):
+        # المحرك المعدل تدريجياً يحجز أرقام المفاتيح المحذوفة ويرقّم المضافة في آخره،
+        # فيبنى من جديد حتى تكون أرقام المفاتيح في الفهرس بترتيب القاموس نفسه دائماً
+        matcher = Matcher(matcher.corrections, matcher.normalizer, matcher.sources)
+    payload = _pack_sections(_encode_matcher(matcher))
+    header = _HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, digest, mtime_ns, size, len(payload),
+                          zlib.crc32(payload))
+    directory = os.path.dirname(os.path.abspath(artifact_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(header)
+            file.write(payload)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, artifact_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _read_header(mapped):
+    """قراءة ترويسة الفهرس، أو None إذا كان الملف تالفاً أو من إصدار آخر"""
+    if len(mapped) < _HEADER.size:
+        return None
+    magic, version, digest, mtime_ns, size, length, checksum = _HEADER.unpack_from(mapped)
+    if magic != ARTIFACT_MAGIC or version != ARTIFACT_VERSION:
+        return None
+    if len(mapped) != _HEADER.size + length:
+        return None
+    return digest, mtime_ns, size, checksum
+
+
+def load_artifact(file_path, artifact_path=None, normalizer=DEFAULT_NORMALIZER):
+    """تحميل الفهرس عبر mmap إن كان مطابقاً لملف المصدر وخط التوحيد، وإلا إرجاع None"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return load_artifact_checked(artifact_path or artifact_path_for(file_path), stat.st_size,
+                                 stat.st_mtime_ns, lambda: file_digest(file_path), normalizer)
+
+
+def load_artifact_checked(artifact_path, size, mtime_ns, digest, normalizer=DEFAULT_NORMALIZER):
+    """تحميل فهرس إن طابقت ترويسته حجم المصدر وزمن تعديله أو بصمته
+
+    digest دالة تحسب بصمة المصدر، ولا تستدعى إلا إذا اختلف زمن التعديل.
+    يبقى الملف مربوطاً بالذاكرة ما دام المحرك المحمل منه (أو جداوله) مستعملاً.
+    """
+    try:
+        with open(artifact_path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    matcher = None
+    try:
+        header = _read_header(mapped)
+        if header is None:
+            return None
+        stored_digest, stored_mtime_ns, stored_size, checksum = header
+        if stored_size != size:
+            return None
+        if stored_mtime_ns != mtime_ns and stored_digest != digest():
+            # تغير زمن التعديل فقط (مثلاً بعد نسخ الملف) لا يستدعي إعادة البناء
+            return None
+        payload = memoryview(mapped)[_HEADER.size:]
+        # الجداول تستعمل كما هي دون تحقق من كل رقم فيها، فالحمولة التالفة تكشف هنا
+        if zlib.crc32(payload) != checksum:
+            return None
+        matcher = _decode_matcher(payload, normalizer)
+        return matcher
+    except (OSError, ValueError, TypeError, KeyError, IndexError):
+        # ValueError يشمل JSON التالف وأخطاء فك UTF-8
+        return None
+    finally:
+        if matcher is None:
+            try:
+                mapped.close()
+            except BufferError:
+                # ما زالت شرائح منه قائمة في إطار الاستثناء، فيغلق مع آخرها
+                pass
+
+
+def load_dictionary(file_path, use_cache=True, normalizer=DEFAULT_NORMALIZER, layers=()):
+    """تحميل محرك المطابقة من الفهرس إن كان حديثاً، وإلا بناؤه وتحديث الفهرس
+
+    normalizer خط التوحيد المطبق على المفاتيح والنص، و None للمطابقة الحرفية.
+    layers طبقات قواميس (layers.Layer) تدمج فوق الملف الأساسي، وتنسب إليها الأخطاء.
+    """
+    if layers:
+        from .layers import load_layers
+        return load_layers(file_path, layers, use_cache, normalizer)
+    if use_cache:
+        matcher = load_artifact(file_path, normalizer=normalizer)
+        if matcher is not None:
+            return matcher
+        try:
+            return compile_dictionary(file_path, normalizer=normalizer)
+        except OSError:
+            # مجلد للقراءة فقط: نكتفي بالبناء في الذاكرة
+            pass
+    return Matcher(load_corrections(file_path), normalizer)
+
+
+def reload_dictionary(matcher, file_path, use_cache=True, layers=()):
+    """إعادة تحميل ملف التصحيحات (وطبقاته) بعد تعديله دون المساس بالمحرك القائم
+
+    إذا تغير عدد قليل من المفاتيح عُدلت نسخة من الآلة القائمة (Matcher.updated)،
+    وإلا أعيد بناؤها كاملة. ثم يحدَّث ملف الفهرس حتى يحمّل البدء التالي الجديد.
+    """
+    started = time.perf_counter()
+    sources = None
+    if layers:
+        from .layers import merge_layers, stack_for, write_stack_artifact
+        stack = stack_for(file_path, layers)
+        corrections, sources = merge_layers(stack)
+    else:
+        stat = os.stat(file_path)
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        corrections = _parse_corrections(data.decode('utf-8'))
+
+    old = matcher.corrections
+    changes = sum(1 for key, value in corrections.items() if old.get(key, value) != value or key not in old)
+    changes += sum(1 for key in old if key not in corrections)
+    reserved = len(matcher.keys) - len(old)
+    if changes <= INCREMENTAL_LIMIT and reserved + changes <= max(len(corrections) // 4, INCREMENTAL_LIMIT):
+        new, added, removed, changed = matcher.updated(corrections)
+        incremental = True
+    else:
+        new = Matcher(corrections, matcher.normalizer, sources)
+        added = [key for key in corrections if key not in old]
+        removed = [key for key in old if key not in corrections]
+        changed = [key for key in corrections if key in old and corrections[key] != old[key]]
+        incremental = False
+    new.sources = sources
+    seconds = time.perf_counter() - started
+
+    if use_cache and layers:
+        write_stack_artifact(stack, new)
+    elif use_cache:
+        try:
+            _write_artifact(artifact_path_for(file_path), new, hashlib.sha256(data).digest(),
+                            stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+    return ReloadResult(new, added, removed, changed, incremental, seconds)
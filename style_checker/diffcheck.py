@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+فحص التعديلات وحدها بين نسختين من مستند، للمخطوطات المحفوظة في git
+لا تتجاوز المطابقات حدود الأسطر (الفقرات)، فالسطر المضاف أو المعدل سياق كافٍ لكل
+عبارات القاموس مهما طالت، ولا يفحص غيره. وتطرح منه أخطاء الأسطر المحذوفة المقابلة
+فلا يبقى إلا ما أدخله التعديل، وتكون الكلفة بحجم الفرق لا بحجم المخطوطة
+"""
+
+import difflib
+import io
+import os
+import re
+import stat
+import subprocess
+import sys
+from collections import Counter, namedtuple
+
+from .docx_stream import iter_docx_paragraphs
+from .documents import SUPPORTED_SUFFIXES, read_document
+from .matcher import OVERLAP_LONGEST
+
+# تغييرات ملف واحد: الأسطر المضافة [(رقم السطر في النسخة الجديدة، النص)] ونصوص الأسطر المحذوفة
+FileChanges = namedtuple('FileChanges', 'path added removed')
+
+_HUNK = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+HOOK_MARKER = '# aslobi pre-commit'
+HOOK_SCRIPT = '''#!/bin/sh
+{marker}
+# يرفض الإيداع إذا أدخلت التعديلات المجهزة أخطاء جديدة؛ للتجاوز: git commit --no-verify
+PYTHONPATH="{package}${{PYTHONPATH:+:$PYTHONPATH}}" exec "{python}" -m style_checker diff --cached -d "{dictionary}"{options}
+'''
+
+
+def _decode(data):
+    """نص من بايتات بترميز utf-8، أو windows-1256 كما في read_txt"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('windows-1256')
+
+
+def changed_lines(path, old_text, new_text):
+    """الأسطر المضافة والمحذوفة بين نسختين كاملتين"""
+    old = old_text.split('\n')
+    new = new_text.split('\n')
+    added = []
+    removed = []
+    for tag, old_start, old_end, new_start, new_end in \
+            difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            continue
+        removed.extend(old[old_start:old_end])
+        added.extend((number + 1, new[number]) for number in range(new_start, new_end))
+    return FileChanges(path, added, removed)
+
+
+def parse_unified_diff(diff_text):
+    """تغييرات كل ملف من فرق موحد (diff -u أو git diff)، دون الحاجة إلى الملفات نفسها
+
+    تعد أسطر كل مقطع من ترويسته، فلا يلتبس سطر محذوف يبدأ بـ "-- " بترويسة ملف.
+    """
+    changes = []
+    current = None
+    line_number = old_left = new_left = 0
+    for line in diff_text.split('\n'):
+        if old_left or new_left:
+            if line.startswith('+'):
+                current.added.append((line_number, line[1:].rstrip('\r')))
+                line_number += 1
+                new_left -= 1
+            elif line.startswith('-'):
+                current.removed.append(line[1:].rstrip('\r'))
+                old_left -= 1
+            elif line.startswith(' ') or not line:
+                line_number += 1
+                old_left -= 1
+                new_left -= 1
+            continue
+        if line.startswith('+++ '):
+            path = line[4:].split('\t')[0]
+            if path.startswith('b/'):
+                path = path[2:]
+            current = None if path == '/dev/null' else FileChanges(path, [], [])
+            if current is not None:
+                changes.append(current)
+            continue
+        match = _HUNK.match(line)
+        if match and current is not None:
+            old_left = 1 if match.group(2) is None else int(match.group(2))
+            line_number = int(match.group(3))
+            new_left = 1 if match.group(4) is None else int(match.group(4))
+    return changes
+
+
+def new_errors(matcher, changes, overlap=OVERLAP_LONGEST):
+    """أخطاء الأسطر المضافة التي لا يقابلها الخطأ نفسه في الأسطر المحذوفة
+
+    السطر المنقول كما هو من موضع إلى آخر لا يفحص. ولكل كلمة يطرح عدد مراتها في
+    الأسطر المحذوفة من عدد مراتها في المضافة، ويعاد الزائد بترتيب الأسطر. كل خطأ
+    بصيغة make_error مع 'line' رقم السطر، و'position' موضعه في السطر.
+    """
+    moved = Counter(changes.removed)
+    added = []
+    for number, text in changes.added:
+        if moved[text]:
+            moved[text] -= 1
+        else:
+            added.append((number, text))
+    kept = Counter()
+    for text, count in moved.items():
+        if count:
+            for error in matcher.find_errors(text, overlap):
+                kept[error['word']] += count
+    errors = []
+    for number, text in added:
+        for error in matcher.find_errors(text, overlap):
+            if kept[error['word']]:
+                kept[error['word']] -= 1
+                continue
+            error['line'] = number
+            errors.append(error)
+    return errors
+
+
+def _git(args, cwd=None):
+    """مخرجات أمر git بالبايت، أو ValueError برسالته"""
+    try:
+        completed = subprocess.run(['git', *args], cwd=cwd, capture_output=True, check=False)
+    except OSError as e:
+        raise RuntimeError(f"تعذر تشغيل git: {e}") from e
+    if completed.returncode != 0:
+        raise ValueError(_decode(completed.stderr).strip() or f"فشل git {' '.join(args)}")
+    return completed.stdout
+
+
+def _document_text(path, data):
+    """نص نسخة مستند من بايتاتها كما يقرؤه read_document"""
+    if path.lower().endswith('.docx'):
+        return '\n'.join(paragraph.text for paragraph in iter_docx_paragraphs(io.BytesIO(data)))
+    return _decode(data).replace('\r\n', '\n')
+
+
+def git_changes(revisions=(), cached=False, paths=(), cwd=None):
+    """تغييرات ملفات TXT و DOCX في git: المجهزة للإيداع (cached)، أو بين مراجعتين، أو بين
+    مراجعة وشجرة العمل
+
+    ملفات TXT من git diff مباشرة فلا يقرأ منها إلا الفرق، وملفات DOCX ثنائية فتستخرج
+    فقرات نسختيها وتقارن.
+    """
+    if len(revisions) > 2:
+        raise ValueError("مراجعتان على الأكثر")
+    if cached and len(revisions) > 1:
+        raise ValueError("لا تجمع --cached مع مراجعتين")
+    root = _decode(_git(['rev-parse', '--show-toplevel'], cwd)).strip()
+    options = ['--cached'] if cached else []
+    options.extend(revisions)
+    if paths:
+        pathspec = [os.path.abspath(os.path.join(cwd or os.curdir, path)) for path in paths]
+    else:
+        pathspec = [f'*{suffix}' for suffix in SUPPORTED_SUFFIXES]
+
+    # الأسماء نسبية إلى جذر المستودع، والحذف لا يدخل أخطاء جديدة
+    output = _git(['diff', '--name-only', '--no-renames', '--diff-filter=d', '-z', *options, '--', *pathspec], root)
+    names = [name for name in _decode(output).split('\0') if name]
+    documents = [name for name in names if name.lower().endswith('.docx')]
+    texts = [name for name in names if name.lower().endswith('.txt')]
+
+    changes = []
+    if texts:
+        diff = _git(['diff', '--no-color', '--no-ext-diff', '--no-renames', '-U0', *options, '--', *texts], root)
+        # يفك كل سطر وحده لأن ملفات الفرق قد تختلف ترميزاتها
+        changes.extend(parse_unified_diff('\n'.join(_decode(line) for line in diff.split(b'\n'))))
+
+    old_revision = revisions[0] if revisions else ('HEAD' if cached else '')
+    for name in documents:
+        try:
+            old = _document_text(name, _git(['show', f'{old_revision}:{name}'], root))
+        except ValueError:
+            # ملف جديد لا وجود له في المراجعة السابقة
+            old = ''
+        if len(revisions) == 2:
+            new = _document_text(name, _git(['show', f'{revisions[1]}:{name}'], root))
+        elif cached:
+            new = _document_text(name, _git(['show', f':{name}'], root))
+        else:
+            new = read_document(os.path.join(root, name))
+        changes.append(changed_lines(name, old, new))
+    return changes
+
+
+def install_hook(dictionary, options='', cwd=None):
+    """تثبيت خطاف pre-commit في المستودع، دون الكتابة فوق خطاف آخر، وإرجاع مساره"""
+    hooks = _decode(_git(['rev-parse', '--git-path', 'hooks'], cwd)).strip()
+    if cwd and not os.path.isabs(hooks):
+        hooks = os.path.join(cwd, hooks)
+    hook_path = os.path.join(hooks, 'pre-commit')
+    if os.path.exists(hook_path):
+        with open(hook_path, encoding='utf-8', errors='replace') as file:
+            if HOOK_MARKER not in file.read():
+                raise ValueError(f"يوجد خطاف آخر في {hook_path}؛ أضف إليه الأمر يدوياً")
+    os.makedirs(hooks, exist_ok=True)
+    with open(hook_path, 'w', encoding='utf-8') as file:
+        file.write(HOOK_SCRIPT.format(marker=HOOK_MARKER, python=sys.executable,
+                                      package=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      dictionary=os.path.abspath(dictionary), options=options))
+    mode = os.stat(hook_path).st_mode
+    os.chmod(hook_path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return hook_path
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+قراءة المستندات النصية وملفات Word
+مشتركة بين الواجهة الرسومية وسطر الأوامر
+"""
+
+import os
+import zipfile
+from xml.etree import ElementTree
+
+from .docx_stream import iter_docx_paragraphs
+
+SUPPORTED_SUFFIXES = ('.txt', '.docx')
+DC_CREATOR = '{http://purl.org/dc/elements/1.1/}creator'
+
+
+def read_txt(file_path):
+    """قراءة ملف نصي مع الرجوع إلى ترميز windows-1256 عند فشل utf-8
+
+    newline='' يبقي نهايات الأسطر كما هي (CRLF) كما في الفحص المتدفق والتصحيح، فتتطابق
+    مواضع الأخطاء في كل مسارات الفحص.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        with open(file_path, 'r', encoding='windows-1256', newline='') as f:
+            return f.read()
+
+
+def read_docx(file_path):
+    """استخراج نص ملف Word فقرةً فقرة، بما فيه الجداول والترويسات والحواشي"""
+    return '\n'.join(paragraph.text for paragraph in iter_docx_paragraphs(file_path))
+
+
+def read_document(file_path):
+    """قراءة مستند حسب امتداده"""
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix == '.docx':
+        return read_docx(file_path)
+    return read_txt(file_path)
+
+
+def document_author(file_path):
+    """مؤلف ملف Word من خصائصه (docProps/core.xml)، أو None للملفات النصية أو إن لم يذكر"""
+    if not file_path.lower().endswith('.docx'):
+        return None
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            root = ElementTree.fromstring(archive.read('docProps/core.xml'))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return None
+    creator = root.findtext(DC_CREATOR)
+    return creator.strip() or None if creator else None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+استخراج نص ملفات Word بالقراءة المتدفقة لأجزاء OOXML
+تقرأ الفقرات واحدة تلو الأخرى عبر zipfile و iterparse دون بناء شجرة المستند كاملة،
+وتشمل الجداول ومربعات النص والترويسات والتذييلات والحواشي
+"""
+
+import re
+import zipfile
+from collections import namedtuple
+from xml.etree.ElementTree import ParseError, iterparse
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+MAIN_PART = 'word/document.xml'
+# ترتيب الأجزاء بعد المتن، وكل نوع مرتب برقمه (header1، header2...)
+_EXTRA_PARTS = re.compile(r'word/(header|footer|footnotes|endnotes)(\d*)\.xml$')
+_PART_ORDER = {'header': 0, 'footer': 1, 'footnotes': 2, 'endnotes': 3}
+
+_PARAGRAPH = W_NS + 'p'
+_TEXT = W_NS + 't'
+_TAB = W_NS + 'tab'
+_BREAKS = (W_NS + 'br', W_NS + 'cr')
+_HYPHEN = W_NS + 'noBreakHyphen'
+_TYPE = W_NS + 'type'
+_NOTES = (W_NS + 'footnote', W_NS + 'endnote')
+_SEPARATORS = ('separator', 'continuationSeparator', 'continuationNotice')
+# البديل القديم لمربعات النص يكرر محتوى mc:Choice
+_FALLBACK = MC_NS + 'Fallback'
+
+# حجم الدفعة النصية المرسلة إلى الفاحص بالأحرف
+CHUNK_SIZE = 1 << 16
+
+Paragraph = namedtuple('Paragraph', 'part index text')
+
+
+def text_parts(archive):
+    """أجزاء المستند التي تحتوي نصاً: المتن أولاً ثم الترويسات والتذييلات والحواشي"""
+    names = set(archive.namelist())
+    if MAIN_PART not in names:
+        raise ValueError("الملف ليس مستند Word صالحاً (لا يحتوي word/document.xml)")
+    extra = []
+    for name in names:
+        match = _EXTRA_PARTS.match(name)
+        if match:
+            extra.append((_PART_ORDER[match.group(1)], int(match.group(2) or 0), name))
+    return [MAIN_PART] + [name for _, _, name in sorted(extra)]
+
+
+def _paragraph_text(paragraph):
+    """نص الفقرة كما تعرضه python-docx: النصوص والجدولة وفواصل الأسطر"""
+    pieces = []
+    for element in paragraph.iter():
+        tag = element.tag
+        if tag == _TEXT:
+            if element.text:
+                pieces.append(element.text)
+        elif tag == _TAB:
+            pieces.append('\t')
+        elif tag in _BREAKS:
+            pieces.append('\n')
+        elif tag == _HYPHEN:
+            pieces.append('-')
+    return ''.join(pieces)
+
+
+def _iter_part(stream):
+    """فقرات جزء XML واحد بترتيب انتهائها، مع تحرير كل عنصر بعد معالجته"""
+    stack = []
+    skipped = 0
+    open_paragraphs = 0
+    for event, element in iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        ignored = tag == _FALLBACK or (tag in _NOTES and element.get(_TYPE) in _SEPARATORS)
+        if event == 'start':
+            stack.append(element)
+            skipped += ignored
+            open_paragraphs += tag == _PARAGRAPH
+            continue
+
+        stack.pop()
+        if tag == _PARAGRAPH:
+            open_paragraphs -= 1
+            if not skipped:
+                yield _paragraph_text(element)
+        skipped -= ignored
+        # عناصر الفقرة تبقى حتى تنتهي الفقرة، وما عداها يحذف فوراً لتبقى الذاكرة ثابتة
+        if stack and (tag == _PARAGRAPH or not open_paragraphs):
+            element.clear()
+            stack[-1].remove(element)
+
+
+def iter_docx_paragraphs(file_path, parts=None):
+    """إرجاع فقرات المستند تباعاً بالشكل (الجزء، رقم الفقرة في الجزء، النص)
+
+    parts قائمة بأسماء الأجزاء المطلوبة، والافتراضي كل أجزاء النص بترتيب text_parts.
+    الفقرات المتداخلة (مربعات النص) ترجع قبل الفقرة التي تحتويها.
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            for part in parts or text_parts(archive):
+                with archive.open(part) as stream:
+                    for index, text in enumerate(_iter_part(stream)):
+                        yield Paragraph(part, index, text)
+    except (zipfile.BadZipFile, KeyError, ParseError) as e:
+        raise ValueError(f"تعذرت قراءة مستند Word: {e}") from e
+
+
+def iter_docx_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """نص المستند على دفعات تقارب chunk_size حرفاً، مطابقاً لنص read_docx"""
+    pieces = []
+    size = 0
+    first = True
+    for paragraph in iter_docx_paragraphs(file_path):
+        if not first:
+            pieces.append('\n')
+            size += 1
+        first = False
+        pieces.append(paragraph.text)
+        size += len(paragraph.text)
+        if size >= chunk_size:
+            yield ''.join(pieces)
+            pieces = []
+            size = 0
+    if pieces:
+        yield ''.join(pieces)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+إعادة الفحص الجزئي بعد تعديل النص
+تحفظ المطابقات لكل فقرة بمواضع نسبية، ويعاد فحص المنطقة المعدلة فقط
+مع هامش بطول أطول مدخل في القاموس، فتكون كلفة ضغطة المفتاح بحجم التعديل لا بحجم المستند
+"""
+
+from bisect import bisect_left
+
+from .matcher import OVERLAP_ALL
+
+
+def scan_range(matcher, text, start, end, overlap=OVERLAP_ALL):
+    """المطابقات الواقعة كلياً داخل [start, end) مع مراعاة الحرف المجاور خارجها لحدود الكلمات
+
+    كل مطابقة بالشكل (البداية، النهاية، الصواب، الكلمة).
+    """
+    corrections = matcher.corrections
+    keys = matcher.keys
+    low, high = _widen(matcher, text, start, end, 1)
+    segment = text[low:high]
+    matches = []
+    for match_start, match_end, key_id in matcher.iter_matches(segment, overlap):
+        match_start += low
+        match_end += low
+        if match_start >= start and match_end <= end:
+            matches.append((match_start, match_end, corrections[keys[key_id]],
+                            segment[match_start - low:match_end - low]))
+    matches.sort()
+    return matches
+
+
+def _widen(matcher, text, start, end, count):
+    """توسيع [start, end) بـ count حرفاً من كل جهة، بأحرف النص الموحد إن وجد خط توحيد"""
+    if matcher.normalizer is None:
+        return max(0, start - count), min(len(text), end + count)
+    # الحرف المجاور هو أول حرف يبقى بعد التوحيد لا أول حرف في النص
+    return matcher.normalizer.widen(text, start, end, count)
+
+
+def _select_range(matcher, text, start, end, overlap):
+    """مطابقات سياسة التداخل من بين المطابقات الواقعة كلياً داخل [start, end) وحدها
+
+    بخلاف scan_range لا تدخل مطابقة تتجاوز طرفي النطاق في الاختيار أصلاً، فلا تحجب
+    ما داخله. الشكل كما في scan_range.
+    """
+    corrections = matcher.corrections
+    keys = matcher.keys
+    low, high = _widen(matcher, text, start, end, 1)
+    segment = text[low:high]
+    folded, offsets = matcher.prepare(segment)
+    matches = [
+        (match_start + low, match_end + low, corrections[keys[key_id]], segment[match_start:match_end])
+        for match_start, match_end, key_id in matcher.scan(
+            segment, folded, offsets, overlap, (start - low, end - low))
+    ]
+    matches.sort()
+    return matches
+
+
+def scan_paragraph(matcher, text, overlap=OVERLAP_ALL):
+    """فحص فقرة كاملة"""
+    return scan_range(matcher, text, 0, len(text), overlap)
+
+
+def update_matches(matcher, text, matches, position, removed, added, overlap=OVERLAP_ALL):
+    """تحديث مطابقات فقرة بعد حذف removed حرفاً وإضافة added حرفاً عند position
+
+    text هو نص الفقرة بعد التعديل و matches مطابقاتها السابقة مرتبة حسب البداية.
+    يرجع (المطابقات الجديدة، المطابقات المحذوفة، المطابقات المضافة)، ويعاد
+    فحص [position - أطول مدخل، position + added + أطول مدخل) فقط.
+    مع سياسات عدم التداخل قد يغير التعديل اختيار المطابقات في سلسلة متداخلة تمتد
+    أبعد من الهامش، فيتسع الفحص إلى حدود تلك السلسلة (انظر _update_selected).
+    """
+    delta = added - removed
+    edit_end = position + removed
+    # أطوال المفاتيح بأحرف النص الموحد، فيتسع الهامش بقدر ما يحذف منه
+    low, high = _widen(matcher, text, position, position + added, matcher.max_length)
+    if overlap != OVERLAP_ALL:
+        return _update_selected(matcher, text, matches, position, removed, delta, overlap, low, high)
+
+    kept = []
+    dropped = []
+    # مطابقات لم يمسها التعديل لكنها داخل منطقة إعادة الفحص: الموضع الجديد ← الأصلية
+    rescanned = {}
+    for match in matches:
+        start, end = match[0], match[1]
+        if end <= position:
+            shifted = match
+        elif start >= edit_end:
+            shifted = (start + delta, end + delta) + match[2:]
+        else:
+            dropped.append(match)
+            continue
+        if shifted[0] >= low and shifted[1] <= high:
+            rescanned[shifted] = match
+        else:
+            kept.append(shifted)
+
+    found = scan_range(matcher, text, low, high, overlap)
+
+    # ما اكتُشف من جديد في موضعه نفسه لا يحتسب محذوفاً ثم مضافاً
+    new_matches = [match for match in found if rescanned.pop(match, None) is None]
+    dropped.extend(rescanned.values())
+
+    kept.extend(found)
+    kept.sort()
+    return kept, dropped, new_matches
+
+
+def _clear_of(position, matches, step):
+    """أقرب موضع إلى position لا يقع داخل مطابقة؛ step موجبة يميناً وسالبة يساراً
+
+    المطابقات مرتبة لا تتداخل، فلا يحتوي الموضع إلا آخر مطابقة تبدأ قبله.
+    """
+    index = bisect_left(matches, (position,))
+    if index and matches[index - 1][1] > position:
+        return matches[index - 1][1] if step > 0 else matches[index - 1][0]
+    return position
+
+
+def _update_selected(matcher, text, matches, position, removed, delta, overlap, low, high):
+    """update_matches لسياستي الأطول والأسبق انتهاءً
+
+    كل مطابقة مرشحة لا تقع كلياً داخل [low, high) لم يغيرها التعديل، والاختيار بين
+    المرشحين جشع من اليسار، فيكفي فحص ما بين موضعين لا تمتد عبرهما مطابقة مختارة:
+    يساراً قبل low بطول أطول مدخل حتى لا يبلغ المنطقة مرشح يبدأ قبله، ويميناً بعد high
+    لا تعبره مطابقة قبل التعديل ولا بعده. ولا يعتد بما قرب من نهاية الفحص، فقد يحجبه
+    مرشح لم يدخل فيه بعد، فيتسع الفحص حتى يستقر.
+    """
+    edit_end = position + removed
+    margin = matcher.max_length
+    # المطابقات السابقة التي لم يمسها التعديل بمواضعها الجديدة، وأصولها في originals
+    previous = []
+    originals = []
+    dropped = []
+    for match in matches:
+        start, end = match[0], match[1]
+        if end <= position:
+            previous.append(match)
+        elif start >= edit_end:
+            previous.append((start + delta, end + delta) + match[2:])
+        else:
+            dropped.append(match)
+            continue
+        originals.append(match)
+
+    begin = _clear_of(_widen(matcher, text, low, low, margin)[0], previous, -1)
+    step = max(margin, 1)
+    limit = high
+    while True:
+        limit = _widen(matcher, text, limit, limit, step)[1]
+        found = _select_range(matcher, text, begin, limit, overlap)
+        if limit >= len(text):
+            cut = len(text)
+            break
+        cut = high
+        while True:
+            moved = _clear_of(_clear_of(cut, previous, 1), found, 1)
+            if moved == cut:
+                break
+            cut = moved
+        if _widen(matcher, text, cut, cut, margin)[1] <= limit:
+            break
+        step *= 2
+
+    found = [match for match in found if match[0] < cut]
+    first = bisect_left(previous, (begin,))
+    last = bisect_left(previous, (cut,))
+    before = set(previous[first:last])
+    # ما اكتُشف من جديد في موضعه نفسه لا يحتسب محذوفاً ثم مضافاً
+    new_matches = [match for match in found if match not in before]
+    kept_found = set(found)
+    dropped.extend(original for match, original in zip(previous[first:last], originals[first:last])
+                   if match not in kept_found)
+    kept = previous[:first] + found + previous[last:]
+    return kept, dropped, new_matches
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+قواميس متعددة بطبقات: القاموس الأساسي ثم قواميس الدار والمشروع فوقه
+تدمج الطبقات المفعلة في قاموس واحد تبنى منه آلة مطابقة واحدة، فلا تزيد كلفة الفحص
+بزيادة الطبقات، ويحفظ لكل مفتاح اسم الطبقة التي جاء منها فيظهر في كل خطأ (layer)
+
+الطبقة الأعلى تغلب: إن عرّفت مفتاحاً موجوداً في طبقة أدنى استبدلت تصحيحه، وإن
+جعلت قيمته null أسقطته من القاموس المدمج.
+"""
+
+import hashlib
+import os
+from collections import namedtuple
+
+from .dictionary import (
+    ARTIFACT_SUFFIX, _write_artifact, file_digest, load_artifact_checked, load_corrections,
+)
+from .matcher import Matcher
+from .normalize import DEFAULT_NORMALIZER
+
+# اسم طبقة ملف التصحيحات الأساسي
+BASE_LAYER = 'base'
+
+Layer = namedtuple('Layer', 'name path enabled', defaults=(True,))
+
+
+def parse_layer(value):
+    """طبقة من خيار سطر الأوامر: NAME=PATH، أو PATH فيكون اسمها اسم الملف دون امتداده"""
+    name, separator, path = value.partition('=')
+    if not separator or not name or os.path.exists(value):
+        path = value
+        name = os.path.splitext(os.path.basename(value))[0]
+    if name == BASE_LAYER:
+        raise ValueError(f"اسم الطبقة {BASE_LAYER} محجوز لملف التصحيحات الأساسي؛ "
+                         f"سمّ الطبقة صراحة: NAME={path}")
+    return Layer(name, path)
+
+
+def stack_for(file_path, layers=()):
+    """الطبقات المفعلة من الأدنى إلى الأعلى، وأولها ملف التصحيحات الأساسي"""
+    return [Layer(BASE_LAYER, file_path)] + [layer for layer in layers if layer.enabled]
+
+
+def merge_layers(stack):
+    """دمج الطبقات في (القاموس، طبقة كل مفتاح)
+
+    تمر الطبقات من الأعلى إلى الأدنى فتتقدم مفاتيح الطبقة الأعلى في القاموس المدمج،
+    وبذلك تغلب أيضاً حين يتوحد مفتاحان من طبقتين إلى الصيغة نفسها.
+    """
+    names = [layer.name for layer in stack]
+    if len(set(names)) != len(names):
+        raise ValueError(f"أسماء الطبقات مكررة: {', '.join(names)}")
+    corrections = {}
+    sources = {}
+    hidden = set()
+    for layer in reversed(stack):
+        for key, correct in load_corrections(layer.path).items():
+            if key in sources or key in hidden:
+                continue
+            if correct is None:
+                hidden.add(key)
+                continue
+            corrections[key] = correct
+            sources[key] = layer.name
+    return corrections, sources
+
+
+def stack_artifact_path(stack):
+    """ملف الفهرس المدمج بجانب القاموس الأساسي، باسم يميز الطبقات المفعلة وترتيبها"""
+    identity = hashlib.blake2b(digest_size=6)
+    for layer in stack:
+        identity.update(f'{layer.name}\0{os.path.abspath(layer.path)}\0'.encode('utf-8'))
+    return f'{os.fspath(stack[0].path)}.{identity.hexdigest()}{ARTIFACT_SUFFIX}'
+
+
+def stack_state(stack):
+    """(الحجم الكلي، أحدث زمن تعديل، دالة البصمة) لملفات الطبقات، كما في ترويسة الفهرس"""
+    stats = [os.stat(layer.path) for layer in stack]
+
+    def digest():
+        combined = hashlib.sha256()
+        for layer in stack:
+            combined.update(layer.name.encode('utf-8') + b'\0' + file_digest(layer.path))
+        return combined.digest()
+
+    return sum(stat.st_size for stat in stats), max(stat.st_mtime_ns for stat in stats), digest
+
+
+def build_layers(stack, normalizer=DEFAULT_NORMALIZER):
+    """بناء محرك المطابقة من الطبقات دون فهرس"""
+    corrections, sources = merge_layers(stack)
+    return Matcher(corrections, normalizer, sources)
+
+
+def write_stack_artifact(stack, matcher):
+    """كتابة الفهرس المدمج، وتتجاهل الفشل (مجلد للقراءة فقط)"""
+    size, mtime_ns, digest = stack_state(stack)
+    try:
+        _write_artifact(stack_artifact_path(stack), matcher, digest(), mtime_ns, size)
+    except OSError:
+        pass
+
+
+def load_layers(file_path, layers=(), use_cache=True, normalizer=DEFAULT_NORMALIZER):
+    """تحميل القاموس الأساسي والطبقات المفعلة فوقه في محرك مطابقة واحد
+
+    يحفظ الفهرس المدمج مثل فهرس القاموس الواحد، ويعاد بناؤه إذا تغيرت إحدى الطبقات.
+    """
+    stack = stack_for(file_path, layers)
+    if use_cache:
+        size, mtime_ns, digest = stack_state(stack)
+        matcher = load_artifact_checked(stack_artifact_path(stack), size, mtime_ns, digest, normalizer)
+        if matcher is not None:
+            return matcher
+    matcher = build_layers(stack, normalizer)
+    if use_cache:
+        write_stack_artifact(stack, matcher)
+    return matcher
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+تحليل قاموس التصحيحات عند ترجمته: مداخل لا تطابق أبداً أو نادراً، ومكررة بعد التوحيد،
+ومتداخلة، والمداخل التي تستأثر بالمطابقات في عينة من النصوص
+يبنى الفهرس مرة واحدة ويستعمل في كل الفحوص، ويخرج منه قاموس منظف أصغر آلة وأسرع مسحاً
+"""
+
+import time
+from collections import Counter
+
+from .matcher import OVERLAP_ALL, Matcher, is_word_char
+
+# عدد الأمثلة المعروضة من كل فئة في التقرير النصي
+SHOWN = 20
+
+
+class DictionaryLint:
+    """نتيجة تحليل قاموس واحد
+
+    unmatchable مفاتيح فارغة بعد التوحيد. boundary مفاتيح يبدأ طرفها أو ينتهي بغير
+    حرف كلمة، فلا تطابق إلا ملتصقة بكلمة من تلك الجهة (مثل "!!" في "رائع!!جداً").
+    duplicates مجموعات مفاتيح تتوحد إلى الصيغة نفسها: الأول يطابق والبقية لا تظهر أبداً،
+    و conflicts منها ما اختلفت تصحيحاته. overlaps أزواج (الداخلي، الخارجي) حيث يطابق
+    مفتاح داخل مفتاح أطول فيحجبه الأطول في سياسة longest. dominant أكثر المفاتيح مطابقة
+    في العينة.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.unmatchable = []
+        self.boundary = []
+        self.duplicates = []
+        self.conflicts = []
+        self.overlaps = []
+        self.dominant = []
+        self.sample_matches = 0
+        self.sample_chars = 0
+        self.seconds = 0.0
+
+    @property
+    def dead(self):
+        """مفاتيح لا تطابق أبداً ويمكن حذفها دون تغيير أي نتيجة"""
+        dead = list(self.unmatchable)
+        for group in self.duplicates:
+            dead.extend(group[1:])
+        return dead
+
+    def cleaned(self, drop_boundary=False):
+        """القاموس دون المفاتيح الميتة (ودون مفاتيح الحدود إن طلب)، بترتيبه الأصلي"""
+        dropped = set(self.dead)
+        if drop_boundary:
+            dropped.update(key for key, _ in self.boundary)
+        return {key: value for key, value in self.matcher.corrections.items() if key not in dropped}
+
+    def issues(self):
+        return len(self.unmatchable) + len(self.boundary) + len(self.duplicates) + len(self.overlaps)
+
+    def to_dict(self):
+        corrections = self.matcher.corrections
+        return {
+            'entries': len(self.matcher),
+            'states': len(self.matcher._goto),
+            'unmatchable': self.unmatchable,
+            'boundary': [{'key': key, 'side': side} for key, side in self.boundary],
+            'duplicates': [
+                {'keys': group, 'corrections': [corrections[key] for key in group],
+                 'conflict': group in self.conflicts}
+                for group in self.duplicates
+            ],
+            'overlaps': [{'inner': inner, 'outer': outer} for inner, outer in self.overlaps],
+            'dominant': [
+                {'key': key, 'matches': count,
+                 'share': round(count / self.sample_matches, 4) if self.sample_matches else 0}
+                for key, count in self.dominant
+            ],
+            'sample': {'chars': self.sample_chars, 'matches': self.sample_matches},
+            'seconds': round(self.seconds, 3),
+        }
+
+    def format(self, shown=SHOWN):
+        """تقرير نصي لسطر الأوامر"""
+        corrections = self.matcher.corrections
+        lines = [f"المداخل: {len(self.matcher)}، حالات الآلة: {len(self.matcher._goto)}، "
+                 f"زمن التحليل: {self.seconds:.2f} ث"]
+
+        def section(title, items, describe):
+            lines.append(f"{title}: {len(items)}")
+            for item in items[:shown]:
+                lines.append(f"  {describe(item)}")
+            if len(items) > shown:
+                lines.append(f"  ... و{len(items) - shown} غيرها")
+
+        section("مفاتيح لا تطابق أبداً (فارغة بعد التوحيد)", self.unmatchable, repr)
+        sides = {'start': 'أوله', 'end': 'آخره', 'both': 'طرفاه'}
+        section("مفاتيح لا تطابق إلا ملتصقة بكلمة (طرفها ليس حرف كلمة)", self.boundary,
+                lambda item: f"{item[0]!r}: {sides[item[1]]}")
+        section("مكررة بعد التوحيد (يطابق الأول وحده)", self.duplicates,
+                lambda group: ' = '.join(repr(key) for key in group)
+                + (f"  ⚠ تصحيحات مختلفة: {' / '.join(str(corrections[key]) for key in group)}"
+                   if group in self.conflicts else ''))
+        section("متداخلة (الداخلي ← الخارجي الذي يحجبه في سياسة الأطول)", self.overlaps,
+                lambda pair: f"{pair[0]!r} ← {pair[1]!r}")
+        if self.sample_chars:
+            lines.append(f"العينة: {self.sample_chars:,} حرف، {self.sample_matches} مطابقة")
+            for key, count in self.dominant:
+                share = count / self.sample_matches if self.sample_matches else 0
+                lines.append(f"  {count:>8}  {share:>6.1%}  {key}")
+        dead = self.dead
+        lines.append(f"يمكن حذف {len(dead)} مفتاح دون تغيير أي نتيجة")
+        return '\n'.join(lines)
+
+
+def _boundary_side(pattern):
+    start = not is_word_char(pattern[0])
+    end = not is_word_char(pattern[-1])
+    if start and end:
+        return 'both'
+    return 'start' if start else 'end' if end else None
+
+
+def lint_dictionary(corrections, normalizer=None, samples=(), top=SHOWN, matcher=None):
+    """تحليل القاموس؛ samples نصوص عينة تحصى عليها المطابقات لكل مفتاح"""
+    started = time.perf_counter()
+    matcher = matcher or Matcher(corrections, normalizer)
+    lint = DictionaryLint(matcher)
+    keys = matcher.keys
+    checks = matcher._checks
+
+    # المفاتيح التي تتوحد إلى الصيغة نفسها، والمقيدة بشرط صارم تتميز بصيغتها الدقيقة
+    groups = {}
+    for key_id, pattern in enumerate(matcher.patterns):
+        if keys[key_id] not in matcher.corrections:
+            continue
+        if not pattern:
+            lint.unmatchable.append(keys[key_id])
+            continue
+        side = _boundary_side(pattern)
+        if side is not None:
+            lint.boundary.append((keys[key_id], side))
+        check = checks.get(key_id)
+        groups.setdefault((pattern, check[1] if check else None), []).append(key_id)
+    dead = set()
+    for ids in groups.values():
+        if len(ids) > 1:
+            group = [keys[key_id] for key_id in ids]
+            lint.duplicates.append(group)
+            if len({repr(matcher.corrections[key]) for key in group}) > 1:
+                lint.conflicts.append(group)
+            dead.update(ids[1:])
+
+    # مسح كل مفتاح بالآلة نفسها يكشف المفاتيح التي تطابق داخله
+    for key_id, key in enumerate(keys):
+        if key_id in dead or key not in matcher.corrections or not matcher.patterns[key_id]:
+            continue
+        for start, end, inner in matcher.iter_matches(key, OVERLAP_ALL):
+            if inner != key_id and inner not in dead and (start, end) != (0, len(key)):
+                lint.overlaps.append((keys[inner], key))
+
+    if samples:
+        counts = Counter()
+        for text in samples:
+            lint.sample_chars += len(text)
+            counts.update(key_id for _, _, key_id in matcher.iter_matches(text, OVERLAP_ALL))
+        lint.sample_matches = sum(counts.values())
+        lint.dominant = [(keys[key_id], count) for key_id, count in counts.most_common(top)]
+
+    lint.seconds = time.perf_counter() - started
+    return lint
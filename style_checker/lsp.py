@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+خادم Language Server Protocol لعرض أخطاء القاموس في المحررات (VS Code و Neovim وغيرهما)
+يتواصل عبر المدخل والمخرج القياسيين، ويحفظ مطابقات كل سطر من المستندات المفتوحة
+فلا يعاد عند التعديل إلا فحص الأسطر المعدلة، وترسل التشخيصات بعد توقف الكتابة
+"""
+
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from .autocorrect import REPLACEMENT, replacement_kind
+from .incremental import scan_paragraph, update_matches
+from .matcher import OVERLAP_LONGEST
+from .watch import LiveDictionary, describe_reload
+
+SERVER_NAME = 'aslobi'
+# مهلة إرسال التشخيصات بعد آخر تعديل بالثواني
+DEBOUNCE = 0.15
+
+# DiagnosticSeverity.Information و TextDocumentSyncKind.Incremental و MessageType.Info/Error
+SEVERITY_INFORMATION = 3
+MESSAGE_INFO = 3
+MESSAGE_ERROR = 1
+SYNC_INCREMENTAL = 2
+
+# رموز أخطاء JSON-RPC
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+
+# أحرف خارج المستوى الأساسي تشغل وحدتين في UTF-16
+_ASTRAL = re.compile('[\U00010000-\U0010ffff]')
+# موضع رقم السطر في تشخيصات السطر المحفوظة بصيغة JSON
+_LINE = '\x00'
+_LINE_JSON = json.dumps(_LINE)
+
+
+def utf16_to_index(line, character):
+    """تحويل موضع بوحدات UTF-16 (ترميز LSP الافتراضي) إلى فهرس في نص بايثون"""
+    if not _ASTRAL.search(line):
+        return min(character, len(line))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xffff else 1
+    return len(line)
+
+
+def index_to_utf16(line, index):
+    """تحويل فهرس في نص بايثون إلى موضع بوحدات UTF-16"""
+    return index + len(_ASTRAL.findall(line, 0, index))
+
+
+class Document:
+    """مستند مفتوح: أسطره ومطابقات كل سطر بمواضع نسبية كما في incremental"""
+
+    def __init__(self, server, text, version):
+        self.server = server
+        self.version = version
+        self.lines = text.split('\n')
+        self.matches = [server.scan(line) for line in self.lines]
+        # تشخيصات كل سطر بصيغة JSON مقسومة عند رقم السطر، وNone لما تغير بعد آخر إرسال
+        self.fragments = [None] * len(self.lines)
+
+    def to_index(self, position):
+        """(السطر، الفهرس) من موضع LSP مع حصره داخل المستند"""
+        line = min(position['line'], len(self.lines) - 1)
+        if position['line'] >= len(self.lines):
+            return line, len(self.lines[line])
+        character = position['character']
+        if self.server.utf16:
+            return line, utf16_to_index(self.lines[line], character)
+        return line, min(character, len(self.lines[line]))
+
+    def to_position(self, line, index):
+        character = index_to_utf16(self.lines[line], index) if self.server.utf16 else index
+        return {'line': line, 'character': character}
+
+    def apply_change(self, change):
+        """تطبيق تعديل didChange وإعادة فحص الأسطر التي يمسها وحدها"""
+        if 'range' not in change:
+            self.__init__(self.server, change['text'], self.version)
+            return
+        start_line, start = self.to_index(change['range']['start'])
+        end_line, end = self.to_index(change['range']['end'])
+        text = change['text']
+        if start_line == end_line and '\n' not in text:
+            # تعديل داخل سطر واحد: كلفة بحجم التعديل مع هامش بطول أطول مدخل
+            old = self.lines[start_line]
+            line = old[:start] + text + old[end:]
+            self.lines[start_line] = line
+            self.matches[start_line], _, _ = update_matches(
+                self.server.matcher, line, self.matches[start_line],
+                start, end - start, len(text), self.server.overlap)
+            self.fragments[start_line] = None
+            return
+        new_lines = (self.lines[start_line][:start] + text + self.lines[end_line][end:]).split('\n')
+        self.lines[start_line:end_line + 1] = new_lines
+        self.matches[start_line:end_line + 1] = [self.server.scan(line) for line in new_lines]
+        self.fragments[start_line:end_line + 1] = [None] * len(new_lines)
+
+    def line_diagnostics(self, line):
+        """تشخيص لكل مطابقة في السطر، ورقم السطر فيه _LINE"""
+        text = self.lines[line]
+        utf16 = self.server.utf16 and _ASTRAL.search(text)
+        result = []
+        for start, end, correct, word in self.matches[line]:
+            if utf16:
+                start, end = index_to_utf16(text, start), index_to_utf16(text, end)
+            result.append({
+                'range': {'start': {'line': _LINE, 'character': start},
+                          'end': {'line': _LINE, 'character': end}},
+                'severity': SEVERITY_INFORMATION,
+                'source': SERVER_NAME,
+                'message': f"{word} ← {correct}",
+                'data': {'word': word, 'correct': correct},
+            })
+        return result
+
+    def diagnostics_json(self):
+        """مصفوفة تشخيصات المستند بصيغة JSON
+
+        تبنى تشخيصات السطر مرة واحدة وتحفظ، فلا يكلف الإرسال بعد كل توقف إلا
+        الأسطر المعدلة وإدراج أرقام الأسطر (التي تتغير بإضافة أسطر قبلها).
+        """
+        fragments = self.fragments
+        pieces = []
+        for line, matches in enumerate(self.matches):
+            if not matches:
+                continue
+            parts = fragments[line]
+            if parts is None:
+                parts = fragments[line] = json.dumps(
+                    self.line_diagnostics(line), ensure_ascii=False)[1:-1].split(_LINE_JSON)
+            pieces.append(str(line).join(parts))
+        return '[' + ','.join(pieces) + ']'
+
+    def diagnostics(self):
+        """تشخيص لكل مطابقة في المستند"""
+        return json.loads(self.diagnostics_json())
+
+    def code_actions(self, uri, range_):
+        """إصلاح سريع لكل مطابقة استبدالها صريح داخل المدى المطلوب"""
+        first_line, first = self.to_index(range_['start'])
+        last_line, last = self.to_index(range_['end'])
+        actions = []
+        for line in range(first_line, last_line + 1):
+            for start, end, correct, word in self.matches[line]:
+                if (line == first_line and end < first) or (line == last_line and start > last):
+                    continue
+                if replacement_kind(word, correct) != REPLACEMENT:
+                    continue
+                edit_range = {'start': self.to_position(line, start), 'end': self.to_position(line, end)}
+                actions.append({
+                    'title': f"استبدال «{word}» بـ «{correct}»",
+                    'kind': 'quickfix',
+                    'diagnostics': [{'range': edit_range, 'source': SERVER_NAME,
+                                     'message': f"{word} ← {correct}"}],
+                    'edit': {'changes': {uri: [{'range': edit_range, 'newText': correct}]}},
+                })
+        return actions
+
+
+class LanguageServer:
+    """معالجة رسائل LSP؛ run يقرأ من المدخل القياسي ويكتب إلى المخرج القياسي"""
+
+    def __init__(self, matcher, overlap=OVERLAP_LONGEST, debounce=DEBOUNCE):
+        self.matcher = matcher
+        self.overlap = overlap
+        self.debounce = debounce
+        self.documents = {}
+        self.utf16 = True
+        self.shutdown_requested = False
+        self.exit_code = None
+        # المستندات التي تنتظر إرسال تشخيصاتها: المعرف ← زمن آخر تعديل
+        self._dirty = {}
+        self._output = None
+        # رسائل المحرر من خيط القراءة، ودوال تنفذ في حلقة الخادم (كاستبدال القاموس)
+        self._messages = queue.Queue()
+        self._live = None
+        self.notifications = {
+            'initialized': lambda params: None,
+            'exit': self.on_exit,
+            'textDocument/didOpen': self.did_open,
+            'textDocument/didChange': self.did_change,
+            'textDocument/didClose': self.did_close,
+            'textDocument/didSave': lambda params: None,
+        }
+        self.requests = {
+            'initialize': self.initialize,
+            'shutdown': self.shutdown,
+            'textDocument/codeAction': self.code_action,
+        }
+
+    def scan(self, line):
+        return scan_paragraph(self.matcher, line, self.overlap)
+
+    def watch(self, file_path, layers=()):
+        """إعادة تحميل القاموس عند تعديل ملفه؛ يبنى في خيط المراقبة ويستبدل في حلقة الخادم"""
+        self._live = LiveDictionary(self.matcher, file_path,
+                                    lambda result: self._messages.put(lambda: self.set_matcher(result)),
+                                    layers=layers)
+        self._live.start()
+
+    def set_matcher(self, result):
+        """استبدال المحرك بنتيجة reload_dictionary وإعادة فحص المستندات المفتوحة وإرسال تشخيصاتها"""
+        self.matcher = result.matcher
+        for uri, document in self.documents.items():
+            document.matches = [self.scan(line) for line in document.lines]
+            document.fragments = [None] * len(document.lines)
+            self._dirty.pop(uri, None)
+            self.publish(uri)
+        self.notify('window/logMessage', {'type': MESSAGE_INFO, 'message': describe_reload(result)})
+
+    # الطلبات
+
+    def initialize(self, params):
+        encodings = (params.get('capabilities', {}).get('general', {}).get('positionEncodings') or [])
+        # مواضع بايثون هي مواضع utf-32، فلا يلزم تحويل إن قبلها المحرر
+        self.utf16 = 'utf-32' not in encodings
+        return {
+            'capabilities': {
+                'positionEncoding': 'utf-16' if self.utf16 else 'utf-32',
+                'textDocumentSync': {'openClose': True, 'change': SYNC_INCREMENTAL},
+                'codeActionProvider': {'codeActionKinds': ['quickfix']},
+            },
+            'serverInfo': {'name': SERVER_NAME},
+        }
+
+    def shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    def code_action(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return []
+        return document.code_actions(params['textDocument']['uri'], params['range'])
+
+    # الإشعارات
+
+    def on_exit(self, params):
+        self.exit_code = 0 if self.shutdown_requested else 1
+
+    def did_open(self, params):
+        item = params['textDocument']
+        self.documents[item['uri']] = Document(self, item['text'], item.get('version'))
+        self.publish(item['uri'])
+
+    def did_change(self, params):
+        uri = params['textDocument']['uri']
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        try:
+            for change in params['contentChanges']:
+                document.apply_change(change)
+        except Exception:
+            # لم يعد النص المحفوظ مطابقاً لما في المحرر، فيسقط المستند وتشخيصاته حتى يعاد فتحه
+            self.did_close(params)
+            raise
+        document.version = params['textDocument'].get('version')
+        self._dirty[uri] = time.monotonic()
+
+    def did_close(self, params):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self._dirty.pop(uri, None)
+        self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+
+    def publish(self, uri):
+        document = self.documents[uri]
+        version = '' if document.version is None else f',"version":{int(document.version)}'
+        self.send_json('{"jsonrpc":"2.0","method":"textDocument/publishDiagnostics","params":{"uri":'
+                       + json.dumps(uri, ensure_ascii=False) + version
+                       + ',"diagnostics":' + document.diagnostics_json() + '}}')
+
+    def flush(self, now=None):
+        """إرسال تشخيصات المستندات التي مرت على آخر تعديل فيها مهلة الانتظار
+
+        يرجع الزمن المتبقي حتى موعد الإرسال التالي، أو None إذا لم يبق شيء.
+        """
+        now = time.monotonic() if now is None else now
+        remaining = None
+        for uri, changed in list(self._dirty.items()):
+            wait = changed + self.debounce - now
+            if wait <= 0:
+                del self._dirty[uri]
+                self.publish(uri)
+            elif remaining is None or wait < remaining:
+                remaining = wait
+        return remaining
+
+    # النقل
+
+    def handle(self, message):
+        """معالجة رسالة واحدة: طلب يرد عليه أو إشعار"""
+        method = message.get('method')
+        if 'id' in message and method is None:
+            return  # رد من المحرر على طلب لم نرسله
+        if 'id' not in message:
+            handler = self.notifications.get(method)
+            if handler is None:
+                return
+            try:
+                handler(message.get('params') or {})
+            except Exception as e:
+                # لا رد على الإشعارات، فيسجل الخطأ في سجل المحرر ويستمر الخادم
+                self.notify('window/logMessage',
+                            {'type': MESSAGE_ERROR, 'message': f"تعذرت معالجة {method}: {e!r}"})
+            return
+        handler = self.requests.get(method)
+        if handler is None:
+            self.send({'jsonrpc': '2.0', 'id': message['id'],
+                       'error': {'code': METHOD_NOT_FOUND, 'message': f"طريقة غير مدعومة: {method}"}})
+            return
+        try:
+            result = handler(message.get('params') or {})
+        except (LookupError, TypeError, ValueError) as e:
+            self.send({'jsonrpc': '2.0', 'id': message['id'],
+                       'error': {'code': INVALID_REQUEST, 'message': str(e)}})
+            return
+        self.send({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
+
+    def notify(self, method, params):
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def send(self, message):
+        self.send_json(json.dumps(message, ensure_ascii=False))
+
+    def send_json(self, text):
+        body = text.encode('utf-8')
+        self._output.write(b'Content-Length: %d\r\n\r\n' % len(body) + body)
+        self._output.flush()
+
+    def run(self, stdin=None, stdout=None):
+        """حلقة الخادم حتى رسالة exit أو انتهاء المدخل، ويرجع رمز الخروج"""
+        if stdin is None:
+            # نسخة مستقلة من المدخل القياسي، فلا يتعطل إغلاق المفسر بخيط القراءة المنتظر
+            stdin = open(os.dup(sys.stdin.fileno()), 'rb')
+        self._output = stdout or sys.stdout.buffer
+        messages = self._messages
+        threading.Thread(target=_read_messages, args=(stdin, messages), daemon=True).start()
+        timeout = None
+        try:
+            while self.exit_code is None:
+                try:
+                    message = messages.get(timeout=timeout)
+                except queue.Empty:
+                    message = None
+                else:
+                    if message is None:
+                        break
+                    if callable(message):
+                        message()
+                    else:
+                        self.handle(message)
+                timeout = self.flush()
+        finally:
+            if self._live is not None:
+                self._live.stop()
+        return 1 if self.exit_code is None else self.exit_code
+
+
+def _read_messages(stream, messages):
+    """قراءة رسائل JSON-RPC بترويسة Content-Length ووضعها في الطابور"""
+    try:
+        while True:
+            length = None
+            while True:
+                line = stream.readline()
+                if not line:
+                    return
+                line = line.strip()
+                if not line:
+                    break
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'content-length':
+                    length = int(value)
+            if length is None:
+                continue
+            try:
+                messages.put(json.loads(stream.read(length).decode('utf-8')))
+            except ValueError:
+                continue  # رسالة تالفة لا توقف الخادم
+    finally:
+        messages.put(None)
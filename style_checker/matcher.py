@@ -0,0 +1,572 @@
+# -*- coding: utf-8 -*-
+"""
+محرك المطابقة متعدد الأنماط (Aho–Corasick)
+يبني آلة واحدة من مفاتيح ملف التصحيحات ويجد جميع المداخل في مرور واحد على النص
+ويمكن أن يسبق المسحَ خطُّ توحيد (normalize.py) تعاد مواضعه إلى النص الأصلي
+"""
+
+import copy
+from collections import deque
+
+from .normalize import LOSSY_FEATURES
+
+# عدد الأحرف المعروضة قبل الخطأ وبعده في السياق
+CONTEXT_WIDTH = 30
+
+# سياسات التداخل بين المداخل المتداخلة ("!!" داخل "!!!!"، "أثر عليه" داخل "أثر عليه الأمر")
+OVERLAP_ALL = 'all'                     # كل مدخل على حدة كما في حلقة re.finditer القديمة
+OVERLAP_LONGEST = 'longest'             # الأطول بدءاً من اليسار دون تداخل
+OVERLAP_NON_OVERLAPPING = 'non-overlapping'  # أول ما ينتهي (والأطول عند التساوي) دون تداخل
+OVERLAP_POLICIES = (OVERLAP_ALL, OVERLAP_LONGEST, OVERLAP_NON_OVERLAPPING)
+
+OVERLAP_LABELS = {
+    OVERLAP_ALL: "كل المداخل ولو تداخلت",
+    OVERLAP_LONGEST: "الأطول من اليسار دون تداخل",
+    OVERLAP_NON_OVERLAPPING: "الأسبق انتهاءً دون تداخل",
+}
+
+
+def is_word_char(char):
+    """هل الحرف من أحرف الكلمات بمفهوم \\w في وحدة re"""
+    return char.isalnum() or char == '_'
+
+
+def fold_case(text):
+    """توحيد حالة الأحرف مع الحفاظ على طول النص (بديل re.IGNORECASE)"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    # بعض الأحرف يتغير طولها عند التصغير، فنبقيها كما هي لتبقى المواضع صحيحة
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def at_boundary(text, start, end):
+    """التحقق من حدود الكلمة عند طرفي المطابقة كما يفعل \\b"""
+    before = is_word_char(text[start - 1]) if start > 0 else False
+    if before == is_word_char(text[start]):
+        return False
+    after = is_word_char(text[end]) if end < len(text) else False
+    return is_word_char(text[end - 1]) != after
+
+
+def make_error(text, start, end, correct, layer=None, key=None):
+    """بناء سجل الخطأ بالصيغة المعتمدة في الواجهة والتقارير، مع طبقة القاموس إن وجدت
+
+    key مفتاح القاموس المطابق، ويضاف إلى السجل إذا اختلف عن الكلمة كما وردت في النص
+    (صيغة موحدة أو حالة أحرف أخرى).
+    """
+    error = {
+        'word': text[start:end],
+        'correct': correct,
+        'position': start,
+        'context': text[max(0, start - CONTEXT_WIDTH):min(len(text), end + CONTEXT_WIDTH)]
+    }
+    if layer is not None:
+        error['layer'] = layer
+    if key is not None and key != error['word']:
+        error['key'] = key
+    return error
+
+
+class OverlapSelector:
+    """تطبيق سياسة التداخل على المطابقات الصالحة أثناء المسح نفسه
+
+    تُمرَّر المطابقات بترتيب موضع النهاية عبر feed ثم close_hit بعد كل موضع نهاية،
+    وتتجمع المقبولة في ready. سياسة الأطول تؤجل القرار حتى لا يبقى مرشح
+    يبدأ قبل الموضع الآمن (flush)، فتعمل على دفعات كما تعمل على نص كامل.
+    """
+
+    def __init__(self, overlap=OVERLAP_ALL):
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"سياسة تداخل غير معروفة: {overlap}")
+        self.overlap = overlap
+        self.ready = []
+        self._last_end = {}
+        self._selected_end = 0
+        self._best = None
+        self._candidates = []
+
+    def feed(self, start, end, key_id, item):
+        overlap = self.overlap
+        if overlap == OVERLAP_ALL:
+            # لا تتداخل مطابقات المفتاح الواحد مع بعضها
+            if start >= self._last_end.get(key_id, 0):
+                self._last_end[key_id] = end
+                self.ready.append(item)
+        elif overlap == OVERLAP_LONGEST:
+            self._candidates.append((start, end, item))
+        elif start >= self._selected_end and (self._best is None or start < self._best[0]):
+            self._best = (start, end, item)
+
+    def close_hit(self):
+        """انتهاء مرشحي موضع نهاية واحد"""
+        if self._best is not None:
+            start, end, item = self._best
+            self._best = None
+            self._selected_end = end
+            self.ready.append(item)
+
+    def flush(self, safe=None):
+        """حسم مرشحي سياسة الأطول الذين يبدؤون قبل safe (أو جميعهم)"""
+        if not self._candidates:
+            return
+        self._candidates.sort(key=lambda candidate: (candidate[0], candidate[0] - candidate[1]))
+        pending = []
+        for candidate in self._candidates:
+            start, end, item = candidate
+            if safe is not None and start >= safe:
+                pending.append(candidate)
+            elif start >= self._selected_end:
+                self._selected_end = end
+                self.ready.append(item)
+        self._candidates = pending
+
+
+class Matcher:
+    """آلة Aho–Corasick مبنية مرة واحدة من قاموس التصحيحات
+
+    إذا مرر normalizer توحَّد المفاتيح والنص بالخط نفسه، وتكون الأطوال ومواضع
+    walk بأحرف النص الموحد، بينما ترجع iter_matches و find_errors مواضع النص الأصلي.
+    """
+
+    def __init__(self, corrections, normalizer=None, sources=None):
+        self.corrections = corrections
+        self.normalizer = normalizer
+        # اسم طبقة القاموس التي جاء منها كل مفتاح (layers.py)، أو None لقاموس واحد
+        self.sources = sources
+        self.keys = list(corrections.keys())
+        self.patterns = [self.prepare(key)[0] for key in self.keys]
+        self.lengths = [len(pattern) for pattern in self.patterns]
+        self.max_length = max(self.lengths, default=0)
+        self._checks = self._strict_checks()
+        # مفاتيح تنتهي بحرف يحذفه التوحيد (حركة الإعراب مثلاً) فتمتد مطابقتها لتشمله
+        self._open_end = frozenset(
+            key_id for key_id, key in enumerate(self.keys)
+            if key and normalizer is not None and normalizer.removes(key[-1])
+        )
+        self._build()
+
+    def __len__(self):
+        return len(self.corrections)
+
+    def layer_of(self, key_id):
+        """طبقة القاموس التي جاء منها المفتاح، أو None"""
+        return None if self.sources is None else self.sources.get(self.keys[key_id])
+
+    @classmethod
+    def from_tables(cls, corrections, normalizer, sources, patterns, lengths, checks, open_end,
+                    goto, fail, out, depth):
+        """محرك من جداول آلة مبنية مسبقاً (ملف الفهرس) دون إعادة بنائها
+
+        الجداول تسلسلات تقرأ بالفهرس، وقد تكون مقروءة عند الطلب من ملف الفهرس
+        (dictionary.py)؛ وتحول إلى قوائم عند أول تعديل للآلة (_materialize).
+        """
+        matcher = cls.__new__(cls)
+        matcher.corrections = corrections
+        matcher.normalizer = normalizer
+        matcher.sources = sources
+        matcher.keys = list(corrections)
+        matcher.patterns = patterns
+        matcher.lengths = lengths
+        matcher.max_length = max(lengths, default=0)
+        matcher._checks = checks
+        matcher._open_end = open_end
+        matcher._goto = goto
+        matcher._fail = fail
+        matcher._out = out
+        matcher._depth = depth
+        return matcher
+
+    def _materialize(self):
+        """تحويل جداول الآلة المقروءة من ملف الفهرس إلى قوائم قابلة للتعديل"""
+        if isinstance(self._goto, list):
+            return
+        states = range(len(self._goto))
+        goto, out = self._goto, self._out
+        self._goto = [goto[state] for state in states]
+        self._out = [out[state] for state in states]
+        self._fail = list(self._fail)
+        self._depth = list(self._depth)
+        self.patterns = list(self.patterns)
+        self.lengths = list(self.lengths)
+
+    def __getstate__(self):
+        # فهرس روابط الفشل العكسي يعاد بناؤه عند الحاجة، وجداول ملف الفهرس لا تنقل
+        self._materialize()
+        state = self.__dict__.copy()
+        state.pop('_fail_children', None)
+        return state
+
+    def prepare(self, text):
+        """توحيد النص للمسح: يرجع النص الموحد وخريطة مواضعه (None إن لم يحذف شيء)"""
+        if self.normalizer is None:
+            return fold_case(text), None
+        normalized, offsets = self.normalizer.normalize(text)
+        return fold_case(normalized), offsets
+
+    def _strict_checks(self):
+        """شروط المفاتيح التي لا يفرق بينها وبين صوابها إلا ما يمحوه التوحيد
+
+        مثل بِطالة/بَطالة أو آذان/أذان: تبقى المطابقة مرنة في بقية المراحل، ثم يتحقق
+        من النص الأصلي بخط لا يحذف المراحل المميزة. يرجع {رقم المفتاح: (الخط، الصيغة)}.
+        """
+        checks = {}
+        if self.normalizer is None:
+            return checks
+        for key_id in range(len(self.keys)):
+            check = self._strict_check(key_id)
+            if check is not None:
+                checks[key_id] = check
+        return checks
+
+    def _strict_check(self, key_id):
+        """شرط مفتاح واحد (انظر _strict_checks)، أو None"""
+        normalizer = self.normalizer
+        key = self.keys[key_id]
+        correct = self.corrections[key]
+        if not isinstance(correct, str) or self.patterns[key_id] != self.prepare(correct)[0]:
+            return None
+        strict = (normalizer.affected(key) | normalizer.affected(correct)) & set(LOSSY_FEATURES)
+        if not strict:
+            return None
+        partial = normalizer.without(strict)
+        return partial, fold_case(partial.normalize(key)[0])
+
+    def _build(self):
+        """بناء شجرة المفاتيح ثم روابط الفشل بالعرض أولاً"""
+        goto = [{}]
+        fail = [0]
+        out = [()]
+        depth = [0]
+
+        for key_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    out.append(())
+                    depth.append(depth[state] + 1)
+                    goto[state][char] = nxt
+                state = nxt
+            out[state] = out[state] + (key_id,)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in goto[state].items():
+                queue.append(target)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                link_target = goto[link].get(char, 0)
+                fail[target] = link_target if link_target != target else 0
+                # دمج مخرجات حالة الفشل حتى لا نتبع السلسلة أثناء المسح
+                out[target] = out[target] + out[fail[target]]
+
+        if self._checks:
+            # عند تطابق المفاتيح بعد التوحيد تُجرَّب المفاتيح المشروطة أولاً لأنها أدق
+            checks = self._checks
+            out = [ids if len(ids) < 2 else tuple(sorted(ids, key=lambda k: k not in checks))
+                   for ids in out]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._depth = depth
+
+    def _ordered(self, ids):
+        """ترتيب مخرجات حالة كما يرتبها _build: المشروطة أولاً، ثم الأطول، ثم الأقدم"""
+        checks = self._checks
+        lengths = self.lengths
+        return tuple(sorted(ids, key=lambda key_id: (key_id not in checks, -lengths[key_id], key_id)))
+
+    def updated(self, corrections):
+        """نسخة من المحرك بقاموس جديد تعدَّل فيها الآلة بقدر ما تغير من المفاتيح
+
+        لا يمس المحرك الحالي، فالفحص الجاري به ينتهي على نسخته: تنسخ الحالات التي
+        تتغير وحدها ويشترك الباقي بين النسختين. المفتاح المضاف تضاف حالاته وتصحح روابط
+        الفشل للحالات التي تنتهي ببادئة منه فقط، والمحذوف تزال مخرجاته ويبقى رقمه
+        محجوزاً. يرجع (المحرك الجديد، المضاف، المحذوف، المعدل).
+        """
+        self._materialize()
+        old = self.corrections
+        added = [key for key in corrections if key not in old]
+        removed = [key for key in old if key not in corrections]
+        changed = [key for key in corrections if key in old and corrections[key] != old[key]]
+
+        if getattr(self, '_fail_children', None) is None:
+            children = {}
+            for state, link in enumerate(self._fail):
+                if state:
+                    children.setdefault(link, []).append(state)
+            self._fail_children = children
+
+        matcher = copy.copy(self)
+        matcher.corrections = corrections
+        matcher.keys = list(self.keys)
+        matcher.patterns = list(self.patterns)
+        matcher.lengths = list(self.lengths)
+        matcher._checks = dict(self._checks)
+        matcher._goto = list(self._goto)
+        matcher._fail = list(self._fail)
+        matcher._out = list(self._out)
+        matcher._depth = list(self._depth)
+        matcher._fail_children = dict(self._fail_children)
+        # الحالات والقوائم التي نسخت في هذا التحديث فيجوز تعديلها
+        matcher._written = set()
+
+        # المفاتيح المحذوفة ثم المعاد إضافتها تأخذ رقماً جديداً، فالأحدث يغلب
+        ids = {key: key_id for key_id, key in enumerate(self.keys)}
+        for key in removed:
+            matcher._remove_key(ids[key])
+        for key in changed:
+            matcher._recheck_key(ids[key])
+        open_end = set(self._open_end)
+        for key in added:
+            key_id = len(matcher.keys)
+            pattern = matcher.prepare(key)[0]
+            matcher.keys.append(key)
+            matcher.patterns.append(pattern)
+            matcher.lengths.append(len(pattern))
+            if key and matcher.normalizer is not None and matcher.normalizer.removes(key[-1]):
+                open_end.add(key_id)
+            if matcher.normalizer is not None:
+                check = matcher._strict_check(key_id)
+                if check is not None:
+                    matcher._checks[key_id] = check
+            if pattern:
+                matcher._insert(key_id)
+        matcher._open_end = frozenset(open_end)
+        matcher.max_length = max(matcher.lengths, default=0)
+        del matcher._written
+        return matcher, added, removed, changed
+
+    def _writable(self, container, index):
+        """نسخ عنصر مشترك مع المحرك السابق قبل أول تعديل له"""
+        tag = (id(container), index)
+        if tag not in self._written:
+            self._written.add(tag)
+            container[index] = type(container[index])(container[index])
+        return container[index]
+
+    def _state_of(self, pattern):
+        state = 0
+        for char in pattern:
+            state = self._goto[state][char]
+        return state
+
+    def _ending_with(self, state):
+        """الحالات التي تنتهي سلسلتها بسلسلة state (شجرتها في روابط الفشل)"""
+        fail = self._fail
+        children = self._fail_children
+        found = [state]
+        stack = [state]
+        while stack:
+            parent = stack.pop()
+            # القوائم لا يحذف منها عند تغير رابط الفشل، فيتحقق منه هنا
+            for child in children.get(parent, ()):
+                if fail[child] == parent:
+                    found.append(child)
+                    stack.append(child)
+        return found
+
+    def _remove_key(self, key_id):
+        pattern = self.patterns[key_id]
+        self._checks.pop(key_id, None)
+        if not pattern:
+            return
+        out = self._out
+        for state in self._ending_with(self._state_of(pattern)):
+            out[state] = tuple(other for other in out[state] if other != key_id)
+
+    def _recheck_key(self, key_id):
+        """إعادة حساب شرط مفتاح تغير صوابه، وإعادة ترتيب مخرجاته إن تغير"""
+        if self.normalizer is None:
+            return
+        check = self._strict_check(key_id)
+        had = key_id in self._checks
+        if check is None:
+            self._checks.pop(key_id, None)
+        else:
+            self._checks[key_id] = check
+        if had != (check is not None) and self.patterns[key_id]:
+            out = self._out
+            for state in self._ending_with(self._state_of(self.patterns[key_id])):
+                if len(out[state]) > 1:
+                    out[state] = self._ordered(out[state])
+
+    def _insert(self, key_id):
+        """إضافة مفتاح إلى آلة مبنية مع تصحيح روابط الفشل والمخرجات المتأثرة به وحده"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        depth = self._depth
+        children = self._fail_children
+        pattern = self.patterns[key_id]
+
+        state = 0
+        known = 0
+        while known < len(pattern) and pattern[known] in goto[state]:
+            state = goto[state][pattern[known]]
+            known += 1
+        # الحالات التي تنتهي بالجزء الموجود من المفتاح، تحسب قبل إضافة حالاته الجديدة
+        level = self._ending_with(state)
+
+        new_states = []
+        parent = state
+        for index in range(known, len(pattern)):
+            char = pattern[index]
+            target = len(goto)
+            goto.append({})
+            self._written.add((id(goto), target))
+            self._writable(goto, parent)[char] = target
+            link = 0
+            if parent:
+                link = fail[parent]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                link = goto[link].get(char, 0)
+                if link == target:
+                    link = 0
+            fail.append(link)
+            out.append(out[link])
+            depth.append(index + 1)
+            if link in children:
+                self._writable(children, link).append(target)
+            else:
+                children[link] = [target]
+                self._written.add((id(children), link))
+            new_states.append(target)
+            parent = target
+
+        # الحالات القديمة التي صار أطول لاحقة لها حالة جديدة: تنتقل روابط فشلها إليها
+        for index in range(known, len(pattern)):
+            char = pattern[index]
+            new_state = new_states[index - known]
+            next_level = []
+            for state in level:
+                target = goto[state].get(char)
+                if target is None:
+                    continue
+                next_level.append(target)
+                if target != new_state and depth[fail[target]] <= index:
+                    fail[target] = new_state
+                    if new_state in children:
+                        self._writable(children, new_state).append(target)
+                    else:
+                        children[new_state] = [target]
+                        self._written.add((id(children), new_state))
+            level = next_level
+
+        # كل حالة تنتهي بالمفتاح تخرجه
+        for state in level:
+            out[state] = self._ordered(out[state] + (key_id,))
+
+    def walk(self, folded, state=0):
+        """تمرير نص موحد الحالة على الآلة
+
+        يرجع قائمة (موضع النهاية، أرقام المفاتيح) والحالة الأخيرة، ليمكن
+        استئناف المسح على الجزء التالي من النص عند القراءة على دفعات.
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        hits = []
+
+        for index, char in enumerate(folded):
+            while True:
+                target = goto[state].get(char)
+                if target is not None:
+                    state = target
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+
+            if out[state]:
+                hits.append((index + 1, out[state]))
+
+        return hits, state
+
+    def original_span(self, offsets, start, end, key_id, text_end):
+        """تحويل مطابقة في النص الموحد إلى (البداية، النهاية) في النص الأصلي
+
+        text_end نهاية النص الأصلي، وتلزم للمفاتيح التي تمتد إلى ما بعد آخر حرف.
+        """
+        if offsets is None:
+            return start, end
+        if key_id in self._open_end:
+            return offsets[start], offsets[end] if end < len(offsets) else text_end
+        return offsets[start], offsets[end - 1] + 1
+
+    def accepts(self, key_id, text, start, end):
+        """التحقق من المفاتيح المشروطة على النص الأصلي"""
+        check = self._checks.get(key_id)
+        if check is None:
+            return True
+        partial, expected = check
+        return fold_case(partial.normalize(text[start:end])[0]) == expected
+
+    def iter_matches(self, text, overlap=OVERLAP_ALL):
+        """إرجاع المطابقات (البداية، النهاية، رقم المفتاح) بترتيب موضع النهاية
+
+        مع OVERLAP_ALL تطابق النتائج سلوك re.finditer مع \\b لكل مفتاح على حدة:
+        لا تتداخل مطابقات المفتاح الواحد مع بعضها. السياستان الأخريان لا تُرجعان
+        مطابقتين متداخلتين أبداً. المواضع في النص الأصلي، وإذا توحد أكثر من مفتاح
+        إلى الصيغة نفسها أرجعت المطابقة مرة واحدة.
+        """
+        folded, offsets = self.prepare(text)
+        return self.scan(text, folded, offsets, overlap)
+
+    def scan(self, text, folded, offsets, overlap=OVERLAP_ALL, bounds=None):
+        """مسح نص سبق توحيده بـ prepare، وهو iter_matches دون خطوة التوحيد
+
+        bounds (البداية، النهاية) في النص الأصلي: لا تعرض على سياسة التداخل إلا المطابقات
+        الواقعة كلياً داخلها، وتفحص الحدود بما حولها من النص.
+        """
+        hits, _ = self.walk(folded)
+        # الحدود تفحص في النص الموحد حتى لا يفصل التشكيل بين حروف الكلمة
+        scanned = text if self.normalizer is None else folded
+        lengths = self.lengths
+        selector = OverlapSelector(overlap)
+        ready = selector.ready
+
+        for end, key_ids in hits:
+            taken = ()
+            for key_id in key_ids:
+                length = lengths[key_id]
+                if length in taken:
+                    continue
+                start = end - length
+                if not at_boundary(scanned, start, end):
+                    continue
+                span_start, span_end = self.original_span(offsets, start, end, key_id, len(text))
+                if bounds is not None and (span_start < bounds[0] or span_end > bounds[1]):
+                    continue
+                if not self.accepts(key_id, text, span_start, span_end):
+                    continue
+                taken += (length,)
+                selector.feed(start, end, key_id, (span_start, span_end, key_id))
+            selector.close_hit()
+            if ready:
+                yield from ready
+                ready.clear()
+
+        selector.flush()
+        yield from ready
+
+    def find_errors(self, text, overlap=OVERLAP_ALL):
+        """البحث عن الأخطاء في النص مرتبة حسب الموضع"""
+        corrections = self.corrections
+        keys = self.keys
+        errors = [
+            make_error(text, start, end, corrections[keys[key_id]], self.layer_of(key_id), keys[key_id])
+            for start, end, key_id in self.iter_matches(text, overlap)
+        ]
+        errors.sort(key=lambda error: error['position'])
+        return errors
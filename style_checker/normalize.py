@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+توحيد النص العربي قبل المطابقة
+حذف التشكيل والتطويل والمحارف الخفية وتوحيد صور الألف في مرور واحد،
+مع خريطة مواضع تعيد كل حرف في النص الموحد إلى موضعه في النص الأصلي
+"""
+
+import re
+
+# علامات التشكيل وما يلحق بها من علامات قرآنية
+ARABIC_MARKS = '\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06dc\u06df-\u06e4\u06e7\u06e8\u06ea-\u06ed'
+TATWEEL = '\u0640'
+# محارف العرض غير المرئية: الوصل والفصل الصفريان وعلامات الاتجاه
+ZERO_WIDTH = '\u061c\u200b-\u200f\u202a-\u202e\u2060\u2066-\u2069\ufeff'
+
+# مراحل الحذف والاستبدال بحرف واحد، فلا يتغير طول ما يبقى من النص
+_REMOVALS = {
+    'diacritics': ARABIC_MARKS,
+    'tatweel': TATWEEL,
+    'zero_width': ZERO_WIDTH,
+}
+_REPLACEMENTS = {
+    'alef': {'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا'},
+    'yeh': {'ى': 'ي'},
+    'teh_marbuta': {'ة': 'ه'},
+}
+
+FEATURES = tuple(_REMOVALS) + tuple(_REPLACEMENTS)
+# المراحل التي قد تمحو الفرق بين الخطأ وصوابه (بِطالة/بَطالة، آذان/أذان)
+LOSSY_FEATURES = ('diacritics', 'alef', 'yeh', 'teh_marbuta')
+DEFAULT_FEATURES = ('diacritics', 'tatweel', 'zero_width', 'alef')
+
+FEATURE_LABELS = {
+    'diacritics': "التشكيل",
+    'tatweel': "التطويل",
+    'zero_width': "المحارف الخفية",
+    'alef': "صور الألف والهمزة",
+    'yeh': "الألف المقصورة والياء",
+    'teh_marbuta': "التاء المربوطة والهاء",
+}
+
+
+class Normalizer:
+    """خط توحيد قابل للضبط يطبق على مفاتيح القاموس والنص المفحوص معاً"""
+
+    def __init__(self, features=DEFAULT_FEATURES):
+        unknown = set(features) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"مراحل توحيد غير معروفة: {', '.join(sorted(unknown))}")
+        self.features = frozenset(features)
+
+        removed = ''.join(chars for name, chars in _REMOVALS.items() if name in self.features)
+        self._removed = re.compile(f'[{removed}]+') if removed else None
+        table = {}
+        for name, mapping in _REPLACEMENTS.items():
+            if name in self.features:
+                table.update(mapping)
+        self._table = str.maketrans(table) if table else None
+
+        # لمعرفة المراحل التي تغير نصاً بعينه
+        self._detectors = {name: re.compile(f'[{chars}]') for name, chars in _REMOVALS.items()}
+        self._detectors.update({
+            name: re.compile(f"[{''.join(mapping)}]") for name, mapping in _REPLACEMENTS.items()
+        })
+
+    def __eq__(self, other):
+        return isinstance(other, Normalizer) and self.features == other.features
+
+    def __hash__(self):
+        return hash(self.features)
+
+    def __reduce__(self):
+        # تكفي أسماء المراحل عند نقله إلى عمليات الفحص المتوازي، وتبنى التعابير عند الاستقبال
+        return Normalizer, (tuple(sorted(self.features)),)
+
+    def __repr__(self):
+        return f"Normalizer({sorted(self.features)!r})"
+
+    def describe(self):
+        """وصف المراحل المفعلة للعرض"""
+        return "، ".join(FEATURE_LABELS[name] for name in FEATURES if name in self.features)
+
+    def without(self, features):
+        """نسخة من الخط دون المراحل المذكورة"""
+        return Normalizer(self.features - set(features))
+
+    def removes(self, char):
+        """هل يحذف الخط هذا الحرف"""
+        return self._removed is not None and self._removed.match(char) is not None
+
+    def affected(self, text):
+        """المراحل المفعلة التي تغير هذا النص"""
+        return frozenset(name for name in self.features if self._detectors[name].search(text))
+
+    def normalize(self, text):
+        """توحيد النص في مرور واحد
+
+        يرجع (النص الموحد، المواضع) حيث المواضع[i] موضع الحرف i من النص الموحد
+        في النص الأصلي، أو None إذا لم يحذف شيء فكانت المواضع متطابقة.
+        """
+        offsets = None
+        if self._removed is not None:
+            offsets = []
+            last = 0
+            for match in self._removed.finditer(text):
+                offsets.extend(range(last, match.start()))
+                last = match.end()
+            if last:
+                offsets.extend(range(last, len(text)))
+                text = self._removed.sub('', text)
+            else:
+                offsets = None
+        if self._table is not None:
+            text = text.translate(self._table)
+        return text, offsets
+
+    def widen(self, text, start, end, count):
+        """توسيع [start, end) ليضم count حرفاً باقياً بعد التوحيد من كل جهة"""
+        low = start
+        kept = 0
+        while low > 0 and kept < count:
+            low -= 1
+            if not self.removes(text[low]):
+                kept += 1
+        high = end
+        kept = 0
+        while high < len(text) and kept < count:
+            if not self.removes(text[high]):
+                kept += 1
+            high += 1
+        # الحروف المحذوفة الملاصقة تتبع الحرف الذي قبلها
+        while high < len(text) and self.removes(text[high]):
+            high += 1
+        return low, high
+
+
+DEFAULT_NORMALIZER = Normalizer()
+
+
+def parse_features(value):
+    """تحويل قائمة مراحل مفصولة بفواصل إلى خط توحيد، و none للمطابقة الحرفية"""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if names in ([], ['none']):
+        return None
+    return Normalizer(names)
+
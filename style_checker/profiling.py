@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+قياس أداء الفحص: أزمنة المراحل والحجم المعالج والمطابقات لكل مدخل وذروة الذاكرة
+يمرر سجل Profile اختيارياً إلى دوال الفحص، وحين لا يمرر (None) لا تكلف القياسات شيئاً
+ويمكن أن يلتقط السجل ملف تعريف cProfile أو تتبع ذاكرة tracemalloc لمرحلة الفحص
+"""
+
+import io
+import json
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+from .matcher import make_error
+
+try:
+    import resource
+except ImportError:  # غير متوفرة على ويندوز
+    resource = None
+
+STAGE_LOAD = 'load'
+STAGE_READ = 'read'
+STAGE_NORMALIZE = 'normalize'
+STAGE_MATCH = 'match'
+STAGE_AGGREGATE = 'aggregate'
+STAGE_RENDER = 'render'
+STAGE_EXPORT = 'export'
+STAGES = (STAGE_LOAD, STAGE_READ, STAGE_NORMALIZE, STAGE_MATCH, STAGE_AGGREGATE, STAGE_RENDER, STAGE_EXPORT)
+STAGE_LABELS = {
+    STAGE_LOAD: 'تحميل القاموس',
+    STAGE_READ: 'قراءة الملفات',
+    STAGE_NORMALIZE: 'التوحيد',
+    STAGE_MATCH: 'المطابقة',
+    STAGE_AGGREGATE: 'التجميع',
+    STAGE_RENDER: 'العرض',
+    STAGE_EXPORT: 'التصدير',
+}
+
+CAPTURE_CPROFILE = 'cprofile'
+CAPTURE_TRACEMALLOC = 'tracemalloc'
+CAPTURES = (CAPTURE_CPROFILE, CAPTURE_TRACEMALLOC)
+
+# عدد الدوال أو أسطر التخصيص المحفوظة من الالتقاط
+HOTSPOTS = 25
+
+
+def peak_rss():
+    """ذروة الذاكرة المقيمة للعملية بالبايت، أو None إن تعذر قياسها"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # لينكس يقيسها بالكيلوبايت وماك بالبايت
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profile:
+    """سجل قياسات تشغيل واحد (فحص في الواجهة، أو تشغيل جماعي كامل)
+
+    stages لكل مرحلة [الثواني، عدد المرات]. يجوز التسجيل من أكثر من خيط.
+    """
+
+    def __init__(self, capture=None):
+        if capture is not None and capture not in CAPTURES:
+            raise ValueError(f"نوع التقاط غير معروف: {capture} (المتاح: {', '.join(CAPTURES)})")
+        self.capture = capture
+        self.stages = {}
+        self.bytes = 0
+        self.chars = 0
+        self.matches = Counter()
+        self.peak_rss = None
+        self.peak_traced = None
+        self.hotspots = []
+        self.allocations = []
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, calls=1):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [seconds, calls]
+            else:
+                entry[0] += seconds
+                entry[1] += calls
+
+    @contextmanager
+    def stage(self, stage):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, perf_counter() - started)
+
+    def seconds(self, stage):
+        entry = self.stages.get(stage)
+        return entry[0] if entry else 0.0
+
+    def count_matches(self, errors):
+        """إضافة أخطاء إلى عداد المطابقات لكل كلمة"""
+        with self._lock:
+            self.matches.update(error['word'] for error in errors)
+
+    @contextmanager
+    def capturing(self):
+        """التقاط cProfile (للخيط الحالي) أو tracemalloc حول الكتلة، وتسجيل ذروة الذاكرة"""
+        profiler = None
+        started_tracing = False
+        if self.capture == CAPTURE_CPROFILE:
+            # يستورد عند الحاجة: pstats يجر inspect و dataclasses ويبطئ بدء الواجهة
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif self.capture == CAPTURE_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.hotspots = _hotspots(profiler)
+            if started_tracing:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.peak_traced = max(self.peak_traced or 0, peak)
+                self.allocations = [
+                    {'line': str(statistic.traceback[0]), 'bytes': statistic.size, 'count': statistic.count}
+                    for statistic in snapshot.statistics('lineno')[:HOTSPOTS]
+                ]
+            self.note_memory()
+
+    def note_memory(self):
+        """تحديث ذروة الذاكرة المقيمة من قياس العملية الحالية"""
+        rss = peak_rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def to_dict(self):
+        """صيغة JSON للسجل، وتدمج السجلات منها عبر merge"""
+        total = sum(self.matches.values())
+        matched = self.seconds(STAGE_NORMALIZE) + self.seconds(STAGE_MATCH)
+        data = {
+            'stages': {
+                stage: {'seconds': round(seconds, 6), 'calls': calls}
+                for stage, (seconds, calls) in sorted(self.stages.items(), key=lambda item: _stage_order(item[0]))
+            },
+            'bytes': self.bytes,
+            'chars': self.chars,
+            'mb_per_s': round(self.bytes / matched / 1e6, 3) if matched and self.bytes else None,
+            'matches': {
+                'total': total,
+                'entries': len(self.matches),
+                'per_entry': dict(self.matches.most_common()),
+            },
+            'peak_memory': {'rss': self.peak_rss, 'traced': self.peak_traced},
+            'capture': self.capture,
+        }
+        if self.hotspots:
+            data['hotspots'] = self.hotspots
+        if self.allocations:
+            data['allocations'] = self.allocations
+        return data
+
+    def merge(self, data):
+        """ضم سجل بصيغة to_dict (من عملية عاملة مثلاً)"""
+        for stage, entry in data['stages'].items():
+            self.add(stage, entry['seconds'], entry['calls'])
+        with self._lock:
+            self.bytes += data['bytes']
+            self.chars += data['chars']
+            self.matches.update(data['matches']['per_entry'])
+            for name in ('rss', 'traced'):
+                value = data['peak_memory'][name]
+                if value is not None:
+                    current = getattr(self, f'peak_{name}')
+                    setattr(self, f'peak_{name}', max(current or 0, value))
+
+    def dump(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        """سطر قصير لشريط الحالة"""
+        parts = [f"{STAGE_LABELS.get(stage, stage)} {seconds:.3f}"
+                 for stage, (seconds, _) in sorted(self.stages.items(), key=lambda item: _stage_order(item[0]))]
+        return f"الأزمنة (ث): {'، '.join(parts)}" if parts else "لا توجد قياسات"
+
+    def format(self, top=10):
+        """تقرير نصي مفصل لنافذة التشخيص أو سطر الأوامر"""
+        data = self.to_dict()
+        lines = ["المراحل:"]
+        for stage, entry in data['stages'].items():
+            lines.append(f"  {STAGE_LABELS.get(stage, stage):<16} {entry['seconds']:>10.4f} ث  ({entry['calls']} مرة)")
+        lines.append(f"الحجم المعالج: {self.bytes:,} بايت، {self.chars:,} حرف")
+        if data['mb_per_s'] is not None:
+            lines.append(f"سرعة الفحص: {data['mb_per_s']:.2f} ميغابايت/ث")
+        lines.append(f"المطابقات: {data['matches']['total']} في {data['matches']['entries']} كلمة")
+        for word, count in self.matches.most_common(top):
+            lines.append(f"  {word}: {count}")
+        if self.peak_rss is not None:
+            lines.append(f"ذروة الذاكرة المقيمة: {self.peak_rss / (1 << 20):.1f} م.ب")
+        if self.peak_traced is not None:
+            lines.append(f"ذروة الذاكرة المتتبعة (tracemalloc): {self.peak_traced / (1 << 20):.1f} م.ب")
+        if self.hotspots:
+            lines.append("أثقل الدوال (cProfile، حسب الزمن التراكمي):")
+            for hotspot in self.hotspots[:top]:
+                lines.append(f"  {hotspot['cumtime']:>9.4f} ث  {hotspot['calls']:>8}  {hotspot['function']}")
+        if self.allocations:
+            lines.append("أكبر التخصيصات الباقية (tracemalloc):")
+            for allocation in self.allocations[:top]:
+                lines.append(f"  {allocation['bytes'] / 1024:>9.1f} ك.ب  {allocation['line']}")
+        return '\n'.join(lines)
+
+
+def _stage_order(stage):
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
+
+
+def _hotspots(profiler):
+    """أثقل الدوال في ملف تعريف cProfile حسب الزمن التراكمي"""
+    import pstats
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (file_name, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f'{function} ({file_name}:{line})' if line else function,
+            'calls': calls,
+            'tottime': round(tottime, 6),
+            'cumtime': round(cumtime, 6),
+        })
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return rows[:HOTSPOTS]
+
+
+def find_errors_profiled(matcher, text, overlap, profile):
+    """Matcher.find_errors مع تسجيل زمني التوحيد والمطابقة والحجم والمطابقات"""
+    profile.chars += len(text)
+    profile.bytes += len(text.encode('utf-8', 'surrogatepass'))
+    with profile.stage(STAGE_NORMALIZE):
+        folded, offsets = matcher.prepare(text)
+    with profile.stage(STAGE_MATCH):
+        corrections = matcher.corrections
+        keys = matcher.keys
+        errors = [
+            make_error(text, start, end, corrections[keys[key_id]], matcher.layer_of(key_id), keys[key_id])
+            for start, end, key_id in matcher.scan(text, folded, offsets, overlap)
+        ]
+        errors.sort(key=lambda error: error['position'])
+    profile.count_matches(errors)
+    return errors
+
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+كتابة تقارير الأخطاء من التجميع الجاهز (ErrorSummary) في مرور واحد
+TXT و CSV و JSON Lines تكتب سطراً سطراً، وتقرير Word يكتب جدوله كنص XML مباشرة
+داخل الملف المضغوط بدل إنشاء كائن لكل خلية عبر python-docx
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import zipfile
+from datetime import datetime
+
+REPORT_TITLE = 'تقرير تصحيح الأخطاء اللغوية'
+DOCX_HEADERS = ['التكرار', 'الأصوب', 'الكلمة الخاطئة', 'السياق']
+CSV_HEADERS = ['word', 'correct', 'count', 'position', 'context']
+# عمود إضافي حين تأتي التصحيحات من طبقات قواميس متعددة
+CSV_LAYER_HEADER = 'layer'
+
+# محارف التحكم غير المسموحة في XML
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+# علامات مؤقتة في صف القالب تستبدل بقيم كل صف
+_PLACEHOLDERS = ['@@{}@@'.format(index) for index in range(len(DOCX_HEADERS))]
+# Word يطوي المسافات والأسطر داخل <w:t>، فتحفظ المسافات بـ xml:space وتصبح فواصل
+# الأسطر والجدولة في السياق عناصر <w:br/> و <w:tab/> بين أجزاء النص
+_TEXT_OPEN = '<w:t xml:space="preserve">'
+_BREAK = '</w:t><w:br/>' + _TEXT_OPEN
+_TAB = '</w:t><w:tab/>' + _TEXT_OPEN
+_LINE_BREAKS = re.compile('\r\n?|\n')
+
+
+def write_txt_report(summary, file):
+    """التقرير النصي المعتاد: مقطع لكل كلمة خاطئة"""
+    file.write("تقرير الأخطاء اللغوية\n")
+    file.write("=" * 50 + "\n\n")
+    for entry in summary:
+        file.write(f"الكلمة الخاطئة: {entry.word}\n"
+                   f"الصحيح: {entry.correct}\n"
+                   f"التكرار: {entry.count}\n"
+                   + (f"القاموس: {entry.layer}\n" if entry.layer else '')
+                   + f"السياق: {entry.context}\n"
+                   + "-" * 50 + "\n")
+
+
+def write_csv_report(summary, file):
+    """صف لكل كلمة خاطئة مع موضع أول ظهور"""
+    writer = csv.writer(file)
+    layered = any(entry.layer for entry in summary)
+    writer.writerow(CSV_HEADERS + [CSV_LAYER_HEADER] if layered else CSV_HEADERS)
+    for entry in summary:
+        first = entry.first['position'] if entry.first else ''
+        row = [entry.word, entry.correct, entry.count, first, entry.context]
+        writer.writerow(row + [entry.layer or ''] if layered else row)
+
+
+def write_jsonl_report(summary, file):
+    """سجل JSON لكل كلمة خاطئة مع جميع مواضعها"""
+    for entry in summary:
+        record = {
+            'word': entry.word,
+            'correct': entry.correct,
+            'count': entry.count,
+            'positions': entry.positions,
+            'context': entry.context,
+        }
+        if entry.layer:
+            record['layer'] = entry.layer
+        file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _xml_text(value):
+    # ما يفعله xml.sax.saxutils.escape، دون استيرادها الذي يجر urllib و http عند بدء الواجهة
+    text = _INVALID_XML.sub('', str(value)).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    if '\t' in text:
+        text = text.replace('\t', _TAB)
+    if '\n' in text or '\r' in text:
+        text = _LINE_BREAKS.sub(_BREAK, text)
+    return text
+
+
+def _docx_template(total, title):
+    """إنشاء هيكل التقرير عبر python-docx مع صف قالب واحد في الجدول
+
+    يرجع (الملف المضغوط في الذاكرة، ما قبل صف القالب، أجزاء صف القالب، ما بعده).
+    """
+    try:
+        from docx import Document
+        from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    except ImportError:
+        raise RuntimeError("مكتبة python-docx غير مثبتة.\nقم بتثبيتها باستخدام:\npip install python-docx")
+
+    doc = Document()
+    heading = doc.add_heading(title, 0)
+    heading.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    doc.add_paragraph(f"تاريخ المعالجة: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    doc.add_paragraph(f"عدد الأخطاء: {total}")
+    doc.add_heading('الأخطاء المكتشفة', level=1)
+
+    table = doc.add_table(rows=2, cols=len(DOCX_HEADERS))
+    table.style = 'Table Grid'
+    for row, texts in zip(table.rows, (DOCX_HEADERS, _PLACEHOLDERS)):
+        for cell, text in zip(row.cells, texts):
+            cell.text = text
+            cell.paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    for run in (cell.paragraphs[0].runs[0] for cell in table.rows[0].cells):
+        run.font.bold = True
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        document = archive.read('word/document.xml').decode('utf-8')
+
+    # صف القالب هو آخر <w:tr> قبل علامة الخلية الأولى
+    marker = document.index(_PLACEHOLDERS[0])
+    row_start = document.rindex('<w:tr', 0, marker)
+    row_end = document.index('</w:tr>', marker) + len('</w:tr>')
+    row = document[row_start:row_end]
+    pieces = []
+    for placeholder in _PLACEHOLDERS:
+        before, row = row.split(placeholder, 1)
+        if before.endswith('<w:t>'):
+            before = before[:-len('<w:t>')] + _TEXT_OPEN
+        pieces.append(before)
+    pieces.append(row)
+    return buffer, document[:row_start], pieces, document[row_end:]
+
+
+def write_docx_report(summary, file_path, title=REPORT_TITLE):
+    """تقرير Word بجدول من صف لكل كلمة، تكتب صفوفه مباشرة في word/document.xml"""
+    buffer, prefix, pieces, suffix = _docx_template(summary.total, title)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+
+    with zipfile.ZipFile(buffer) as template, \
+            zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for item in template.infolist():
+            if item.filename != 'word/document.xml':
+                archive.writestr(item, template.read(item.filename))
+                continue
+            with archive.open('word/document.xml', 'w') as stream:
+                writer = io.TextIOWrapper(stream, encoding='utf-8')
+                writer.write(prefix)
+                first, second, third, fourth, last = pieces
+                for entry in summary:
+                    writer.write(first + str(entry.count) + second + _xml_text(entry.correct)
+                                 + third + _xml_text(entry.word) + fourth + _xml_text(entry.context)
+                                 + last)
+                writer.write(suffix)
+                writer.flush()
+                writer.detach()
+
+
+TEXT_WRITERS = {
+    '.txt': write_txt_report,
+    '.csv': write_csv_report,
+    '.jsonl': write_jsonl_report,
+}
+REPORT_SUFFIXES = tuple(TEXT_WRITERS) + ('.docx',)
+
+
+def write_report(summary, file_path):
+    """كتابة التقرير بالصيغة المناسبة لامتداد الملف"""
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix == '.docx':
+        write_docx_report(summary, file_path)
+        return
+    writer = TEXT_WRITERS.get(suffix)
+    if writer is None:
+        raise ValueError(f"صيغة تقرير غير مدعومة: {suffix or file_path} "
+                         f"(المدعوم: {', '.join(REPORT_SUFFIXES)})")
+    # newline='' يترك لوحدة csv التحكم بنهايات الأسطر
+    with open(file_path, 'w', encoding='utf-8', newline='' if suffix == '.csv' else None) as file:
+        writer(summary, file)
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+خدمة فحص محلية عبر HTTP بقاموس محمّل مرة واحدة
+خادم asyncio من المكتبة القياسية يستقبل الطلبات ويجمع المتزامن منها في دفعات،
+وترسل الدفعات إلى مجموعة عمليات يحمّل كل منها الفهرس مرة واحدة عند بدئه
+
+    POST /check         {"text": "...", "overlap": "longest"}
+    POST /check/batch   {"texts": ["...", "..."], "overlap": "longest"}
+    POST /correct       {"text": "...", "choices": {"المفتاح": "البديل"}}
+    GET  /health
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+from .autocorrect import KIND_LABELS, correct_text
+from .dictionary import load_dictionary
+from .matcher import OVERLAP_LONGEST, OVERLAP_POLICIES
+from .normalize import DEFAULT_NORMALIZER
+from .watch import LiveDictionary, describe_reload
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8750
+# أكبر حجم لجسم الطلب بالبايت
+MAX_BODY = 32 << 20
+# أكبر عدد من النصوص في مهمة واحدة للعمال، وأطول انتظار لتجميعها بالثواني
+BATCH_SIZE = 32
+BATCH_DELAY = 0.002
+
+CHECK = 'check'
+CORRECT = 'correct'
+
+# محرك المطابقة الخاص بكل عملية عاملة، ومصدره ورقم نسخته لإعادة تحميله بعد تعديل الملف
+_worker_matcher = None
+_worker_source = None
+_worker_generation = 0
+
+
+class HTTPError(Exception):
+    """خطأ يعاد إلى العميل برمز الحالة ورسالته"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _init_worker(corrections_path, normalizer, layers=()):
+    """تحميل القاموس مرة واحدة لكل عملية عاملة"""
+    global _worker_matcher, _worker_source
+    _worker_source = (corrections_path, normalizer, layers)
+    _worker_matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+
+
+def _run_jobs(kind, overlap, items, generation=0):
+    """تنفيذ دفعة من الطلبات المتشابهة داخل العامل
+
+    generation رقم نسخة القاموس عند إرسال الدفعة؛ إن كان أحدث من نسخة العامل أعاد
+    تحميل الفهرس الذي كتبه الخادم للتو (تحميل mmap دون ترجمة).
+    """
+    global _worker_matcher, _worker_generation
+    if generation > _worker_generation and _worker_source is not None:
+        corrections_path, normalizer, layers = _worker_source
+        _worker_matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+        _worker_generation = generation
+    matcher = _worker_matcher
+    if kind == CHECK:
+        return [matcher.find_errors(text, overlap) for text in items]
+    results = []
+    for text, choices in items:
+        corrected, edits, skipped = correct_text(matcher, text, choices)
+        results.append({
+            'text': corrected,
+            'edits': [edit._asdict() for edit in edits],
+            'skipped': [
+                {'start': start, 'end': end, 'word': word, 'correct': correct,
+                 'kind': kind, 'label': KIND_LABELS[kind]}
+                for start, end, word, correct, kind in skipped
+            ],
+        })
+    return results
+
+
+class Batcher:
+    """تجميع الطلبات المتزامنة من النوع نفسه في مهمة واحدة للعمال
+
+    تُرسل الدفعة حين تبلغ BATCH_SIZE أو بعد BATCH_DELAY من أول طلب فيها،
+    فتقل كلفة التنقل بين العمليات دون تأخير ملحوظ للطلب المنفرد.
+    """
+
+    def __init__(self, executor, batch_size=BATCH_SIZE, delay=BATCH_DELAY):
+        self.executor = executor
+        self.batch_size = batch_size
+        self.delay = delay
+        self.batches = 0
+        # رقم نسخة القاموس المرسل مع كل دفعة
+        self.generation = 0
+        self._pending = {}
+
+    def submit(self, kind, overlap, item):
+        """إضافة عنصر وإرجاع مستقبل (Future) بنتيجته"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = (kind, overlap)
+        pending = self._pending.get(group)
+        if pending is None:
+            pending = self._pending[group] = []
+            loop.call_later(self.delay, self._flush, group)
+        pending.append((item, future))
+        if len(pending) >= self.batch_size:
+            self._flush(group)
+        return future
+
+    def _flush(self, group):
+        pending = self._pending.pop(group, None)
+        if not pending:
+            return
+        self.batches += 1
+        kind, overlap = group
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, _run_jobs, kind, overlap,
+                                    [item for item, _ in pending], self.generation)
+        task.add_done_callback(lambda task: self._resolve(task, pending))
+
+    @staticmethod
+    def _resolve(task, pending):
+        if task.cancelled():
+            for _, future in pending:
+                future.cancel()
+            return
+        error = task.exception()
+        for index, (_, future) in enumerate(pending):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(task.result()[index])
+
+
+class CheckServer:
+    """خادم HTTP/1.1 مصغر: جسم JSON بطول محدد واتصالات دائمة"""
+
+    def __init__(self, corrections_path, normalizer=DEFAULT_NORMALIZER, jobs=None,
+                 overlap=OVERLAP_LONGEST, layers=()):
+        self.corrections_path = corrections_path
+        self.normalizer = normalizer
+        self.overlap = overlap
+        self.layers = layers
+        # ترجمة الفهرس مرة واحدة قبل تشغيل العمال حتى يحمّلوه جاهزاً
+        self.matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+        self.jobs = os.cpu_count() if jobs is None else jobs
+        if self.jobs == 0:
+            # الفحص في العملية نفسها (خيط واحد يحمل المحرك المحمّل)
+            global _worker_matcher
+            _worker_matcher = self.matcher
+            self.executor = ThreadPoolExecutor(1)
+        else:
+            self.executor = ProcessPoolExecutor(
+                self.jobs, initializer=_init_worker, initargs=(corrections_path, normalizer, layers))
+        self.batcher = Batcher(self.executor)
+        self.live = None
+        self.requests = 0
+        self.started = time.monotonic()
+        self.routes = {
+            ('POST', '/check'): self.handle_check,
+            ('POST', '/check/batch'): self.handle_check_batch,
+            ('POST', '/correct'): self.handle_correct,
+            ('GET', '/health'): self.handle_health,
+        }
+
+    def watch(self):
+        """إعادة تحميل القاموس عند تعديل ملفه دون إيقاف الخدمة
+
+        يبني الخادم المحرك الجديد ويكتب فهرسه ثم يرفع رقم النسخة، فتعيد العمليات العاملة
+        تحميله مع أول دفعة تحمل الرقم الجديد. الدفعات الجارية تكمل على القاموس الذي بدأت به،
+        ولا تفحص أي دفعة بقاموس نصف محدث.
+        """
+        self.live = LiveDictionary(self.matcher, self.corrections_path, self._reloaded,
+                                   layers=self.layers).start()
+
+    def _reloaded(self, result):
+        global _worker_matcher
+        self.matcher = result.matcher
+        if self.jobs == 0:
+            _worker_matcher = result.matcher
+        self.batcher.generation = self.live.generation
+        print(describe_reload(result), file=sys.stderr, flush=True)
+
+    def close(self):
+        if self.live is not None:
+            self.live.stop()
+        self.executor.shutdown(cancel_futures=True)
+
+    def _overlap(self, body):
+        overlap = body.get('overlap', self.overlap)
+        if overlap not in OVERLAP_POLICIES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            f"سياسة تداخل غير معروفة: {overlap} (المتاح: {', '.join(OVERLAP_POLICIES)})")
+        return overlap
+
+    @staticmethod
+    def _text(value, name='text'):
+        if not isinstance(value, str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"الحقل {name} يجب أن يكون نصاً")
+        return value
+
+    async def handle_check(self, body):
+        overlap = self._overlap(body)
+        errors = await self.batcher.submit(CHECK, overlap, self._text(body.get('text')))
+        return {'count': len(errors), 'errors': errors}
+
+    async def handle_check_batch(self, body):
+        overlap = self._overlap(body)
+        texts = body.get('texts')
+        if not isinstance(texts, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "الحقل texts يجب أن يكون قائمة نصوص")
+        texts = [self._text(text, 'texts') for text in texts]
+        futures = [self.batcher.submit(CHECK, overlap, text) for text in texts]
+        results = await asyncio.gather(*futures)
+        return {'results': [{'count': len(errors), 'errors': errors} for errors in results]}
+
+    async def handle_correct(self, body):
+        choices = body.get('choices') or {}
+        if not isinstance(choices, dict) or not all(isinstance(value, str) for value in choices.values()):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "الحقل choices يجب أن يكون قاموساً {المفتاح: البديل}")
+        return await self.batcher.submit(CORRECT, None, (self._text(body.get('text')), choices))
+
+    async def handle_health(self, body):
+        return {
+            'entries': len(self.matcher),
+            'layers': [layer.name for layer in self.layers if layer.enabled],
+            'normalizer': self.normalizer.describe() if self.normalizer is not None else None,
+            'overlap': self.overlap,
+            'workers': self.jobs,
+            'requests': self.requests,
+            'batches': self.batcher.batches,
+            'uptime': round(time.monotonic() - self.started, 3),
+            'generation': self.batcher.generation,
+            'reload': None if self.live is None or self.live.last is None else {
+                'added': len(self.live.last.added),
+                'removed': len(self.live.last.removed),
+                'changed': len(self.live.last.changed),
+                'incremental': self.live.last.incremental,
+                'seconds': round(self.live.last.seconds, 4),
+            },
+        }
+
+    async def dispatch(self, method, path, data):
+        """تنفيذ الطلب وإرجاع (رمز الحالة، الجسم)"""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"الطريقة {method} غير مدعومة على {path}")
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"المسار غير موجود: {path}")
+        body = {}
+        if data:
+            try:
+                body = json.loads(data)
+            except (UnicodeDecodeError, ValueError) as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"جسم الطلب ليس JSON صالحاً: {e}")
+            if not isinstance(body, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "جسم الطلب يجب أن يكون كائن JSON")
+        return HTTPStatus.OK, await handler(body)
+
+    async def handle_connection(self, reader, writer):
+        """قراءة الطلبات المتتالية على اتصال واحد حتى يغلقه العميل"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                keep_alive = await self.handle_request(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, head, reader, writer):
+        """معالجة طلب واحد، ويرجع هل يبقى الاتصال مفتوحاً"""
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            self.respond(writer, HTTPStatus.BAD_REQUEST, {'error': "سطر الطلب غير صالح"}, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+        self.requests += 1
+        try:
+            if 'chunked' in headers.get('transfer-encoding', '').lower():
+                raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "يجب تحديد Content-Length")
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                # لا يعرف أين ينتهي الجسم، فلا يقرأ ما بعده على أنه طلب جديد
+                keep_alive = False
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "قيمة Content-Length غير صالحة")
+            if length > MAX_BODY:
+                keep_alive = False
+                raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                f"جسم الطلب أكبر من الحد ({MAX_BODY >> 20} م.ب)")
+            data = await reader.readexactly(length) if length else b''
+            status, body = await self.dispatch(method, target.split('?', 1)[0], data)
+        except HTTPError as e:
+            status, body = e.status, {'error': e.message}
+        except asyncio.IncompleteReadError:
+            return False
+        except Exception as e:
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        self.respond(writer, status, body, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    def respond(writer, status, body, keep_alive):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json; charset=utf-8\r\n'
+            f'Content-Length: {len(payload)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1')
+            + payload
+        )
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        """تشغيل الخادم حتى إلغائه؛ ready دالة تستدعى بالعنوان الفعلي بعد بدء الاستماع"""
+        # تشغيل العمال وتحميل القاموس فيهم قبل أول طلب
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _run_jobs, CHECK, self.overlap, [])
+                               for _ in range(max(self.jobs, 1))))
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=1 << 16)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
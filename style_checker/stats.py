@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""
+إحصاءات مجموعة نصوص كاملة في ملفات أجزاء (shards) قابلة للدمج
+كل عامل أو جهاز يعالج شريحة من الملفات ويكتب جزءاً، ثم تدمج الأجزاء في خطوة أخيرة.
+العدادات مصفوفات مفهرسة بترتيب المدخل في ملف القاموس (لا قواميس نصية)، فالجزء صغير ودمجه جمع
+عناصر: تكرار كل مدخل، وعدد المستندات التي ظهر فيها، وتوزيع كثافة الأخطاء في المستندات،
+وعدد مرات اجتماع كل مدخلين في مستند واحد
+"""
+
+import hashlib
+import json
+import math
+import struct
+import sys
+import time
+import weakref
+import zlib
+from array import array
+from collections import Counter
+from multiprocessing import Pool
+
+from .dictionary import load_dictionary
+from .documents import read_document
+from .matcher import OVERLAP_LONGEST
+
+STATS_MAGIC = b'ASTS'
+STATS_VERSION = 2
+STATS_SUFFIX = '.stats'
+# المعرف، الإصدار، طول الترويسة JSON
+_HEADER = struct.Struct('<4sHI')
+
+# حدود فئات الكثافة: أخطاء لكل ألف كلمة
+DENSITY_EDGES = (0, 0.5, 1, 2, 5, 10, 20, 50, 100)
+# أكثر المداخل المختلفة في مستند واحد التي تحصى أزواجها (أكثرها تكراراً)
+COOCCURRENCE_LIMIT = 64
+
+# ترتيب كل مفتاح في القاموس حسب رقمه في المحرك، لكل محرك مطابقة
+_entry_indexes = weakref.WeakKeyDictionary()
+
+# محرك المطابقة الخاص بكل عملية عاملة
+_worker_matcher = None
+_worker_overlap = OVERLAP_LONGEST
+
+
+def dictionary_fingerprint(matcher):
+    """بصمة القاموس وخط التوحيد، لا تتأثر بأرقام المفاتيح في المحرك"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(matcher.corrections, ensure_ascii=False).encode('utf-8'))
+    features = sorted(matcher.normalizer.features) if matcher.normalizer is not None else []
+    digest.update(repr((STATS_VERSION, features)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def keys_digest(keys):
+    """بصمة قائمة المداخل التي تفهرس بها العدادات"""
+    return hashlib.sha256(json.dumps(list(keys), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def entry_index(matcher):
+    """ترتيب كل مفتاح في القاموس مفهرساً برقمه في المحرك، و -1 للأرقام المحجوزة
+
+    المحرك المعاد تحميله تدريجياً يرقّم مفاتيحه بغير ترتيب القاموس، فتحصى المطابقات
+    بترتيب القاموس حتى تتطابق أجزاء محسوبة بمحركات مختلفة الأرقام.
+    """
+    index = _entry_indexes.get(matcher)
+    if index is None:
+        positions = {key: position for position, key in enumerate(matcher.corrections)}
+        index = _entry_indexes[matcher] = [positions.get(key, -1) for key in matcher.keys]
+    return index
+
+
+def density_bucket(density):
+    """رقم فئة الكثافة في DENSITY_EDGES"""
+    bucket = 0
+    while bucket + 1 < len(DENSITY_EDGES) and density >= DENSITY_EDGES[bucket + 1]:
+        bucket += 1
+    return bucket
+
+
+class CorpusStats:
+    """إحصاءات جزء من مجموعة النصوص، أو مجموعها بعد الدمج
+
+    المدخل i هو المفتاح i في ترتيب ملف القاموس، و keys بصمة قائمة المفاتيح بهذا الترتيب.
+    frequency[i] عدد مطابقات المدخل i، و documents[i] عدد المستندات التي ظهر فيها،
+    و density توزيع المستندات على فئات DENSITY_EDGES، و cooccurrence أزواج المداخل
+    (i * entries + j مع i < j) ← عدد المستندات التي اجتمعا فيها.
+    """
+
+    def __init__(self, fingerprint, keys, entries, overlap=OVERLAP_LONGEST):
+        self.fingerprint = fingerprint
+        self.keys = keys
+        self.entries = entries
+        self.overlap = overlap
+        self.frequency = array('Q', bytes(8 * entries))
+        self.documents = array('Q', bytes(8 * entries))
+        self.density = array('Q', bytes(8 * len(DENSITY_EDGES)))
+        self.cooccurrence = {}
+        self.totals = {'documents': 0, 'words': 0, 'chars': 0, 'errors': 0, 'failed': 0}
+        # مجموع الكثافات ومربعاتها للمتوسط والانحراف المعياري
+        self.density_sum = 0.0
+        self.density_squares = 0.0
+
+    @classmethod
+    def for_matcher(cls, matcher, overlap=OVERLAP_LONGEST):
+        return cls(dictionary_fingerprint(matcher), keys_digest(matcher.corrections),
+                   len(matcher.corrections), overlap)
+
+    def add_document(self, words, chars, counts):
+        """إضافة مستند: عدد كلماته وأحرفه و Counter مطابقاته حسب ترتيب المدخل (entry_index)"""
+        totals = self.totals
+        errors = sum(counts.values())
+        totals['documents'] += 1
+        totals['words'] += words
+        totals['chars'] += chars
+        totals['errors'] += errors
+        density = errors * 1000 / words if words else 0.0
+        self.density[density_bucket(density)] += 1
+        self.density_sum += density
+        self.density_squares += density * density
+
+        frequency = self.frequency
+        documents = self.documents
+        for key_id, count in counts.items():
+            frequency[key_id] += count
+            documents[key_id] += 1
+        ids = sorted(key_id for key_id, _ in counts.most_common(COOCCURRENCE_LIMIT))
+        entries = self.entries
+        cooccurrence = self.cooccurrence
+        for index, first in enumerate(ids):
+            base = first * entries
+            for second in ids[index + 1:]:
+                pair = base + second
+                cooccurrence[pair] = cooccurrence.get(pair, 0) + 1
+
+    def merge(self, other):
+        """ضم جزء آخر محسوب بالقاموس نفسه وسياسة التداخل نفسها"""
+        if (other.fingerprint, other.keys, other.entries, other.overlap) != \
+                (self.fingerprint, self.keys, self.entries, self.overlap):
+            raise ValueError("لا يمكن دمج أجزاء محسوبة بقواميس أو خيارات مختلفة")
+        for target, source in ((self.frequency, other.frequency), (self.documents, other.documents),
+                               (self.density, other.density)):
+            for index, value in enumerate(source):
+                if value:
+                    target[index] += value
+        cooccurrence = self.cooccurrence
+        for pair, count in other.cooccurrence.items():
+            cooccurrence[pair] = cooccurrence.get(pair, 0) + count
+        for name, value in other.totals.items():
+            self.totals[name] += value
+        self.density_sum += other.density_sum
+        self.density_squares += other.density_squares
+        return self
+
+    def save(self, file_path):
+        """كتابة الجزء: ترويسة JSON ثم المصفوفات مضغوطة بترتيب بايتات ثابت"""
+        pairs = sorted(self.cooccurrence.items())
+        arrays = [self.frequency, self.documents, self.density,
+                  array('Q', (pair for pair, _ in pairs)), array('Q', (count for _, count in pairs))]
+        header = json.dumps({
+            'fingerprint': self.fingerprint,
+            'keys': self.keys,
+            'entries': self.entries,
+            'overlap': self.overlap,
+            'totals': self.totals,
+            'density_edges': DENSITY_EDGES,
+            'density_sum': self.density_sum,
+            'density_squares': self.density_squares,
+            'pairs': len(pairs),
+        }).encode('utf-8')
+        body = zlib.compress(b''.join(_little_endian(values) for values in arrays))
+        with open(file_path, 'wb') as file:
+            file.write(_HEADER.pack(STATS_MAGIC, STATS_VERSION, len(header)) + header + body)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"ملف إحصاءات تالف: {file_path}")
+        magic, version, length = _HEADER.unpack_from(data)
+        if magic != STATS_MAGIC or version != STATS_VERSION:
+            raise ValueError(f"ليس ملف إحصاءات بهذه الصيغة: {file_path}")
+        header = json.loads(data[_HEADER.size:_HEADER.size + length])
+        if tuple(header['density_edges']) != DENSITY_EDGES:
+            raise ValueError(f"فئات الكثافة في {file_path} مختلفة")
+        body = zlib.decompress(data[_HEADER.size + length:])
+        stats = cls(header['fingerprint'], header['keys'], header['entries'], header['overlap'])
+        stats.totals = header['totals']
+        stats.density_sum = header['density_sum']
+        stats.density_squares = header['density_squares']
+        entries, pairs = header['entries'], header['pairs']
+        offset = 0
+        values = []
+        for count in (entries, entries, len(DENSITY_EDGES), pairs, pairs):
+            values.append(_from_little_endian(body[offset:offset + 8 * count]))
+            offset += 8 * count
+        stats.frequency, stats.documents, stats.density, pair_ids, pair_counts = values
+        stats.cooccurrence = dict(zip(pair_ids, pair_counts))
+        return stats
+
+    def report(self, matcher, top=20):
+        """ملخص بصيغة JSON بأسماء المداخل من القاموس الذي حسبت به الأجزاء"""
+        keys = list(matcher.corrections)
+        if (dictionary_fingerprint(matcher), keys_digest(keys), len(keys)) != \
+                (self.fingerprint, self.keys, self.entries):
+            raise ValueError("القاموس لا يطابق القاموس الذي حسبت به الإحصاءات")
+        totals = self.totals
+        documents = totals['documents']
+        mean = self.density_sum / documents if documents else 0.0
+        variance = self.density_squares / documents - mean * mean if documents else 0.0
+        ranked = sorted((key_id for key_id, count in enumerate(self.frequency) if count),
+                        key=lambda key_id: -self.frequency[key_id])
+        pairs = sorted(self.cooccurrence.items(), key=lambda item: (-item[1], item[0]))[:top]
+        return {
+            'totals': dict(totals),
+            'overlap': self.overlap,
+            'entries_matched': len(ranked),
+            'entries': len(matcher),
+            'density': {
+                'mean': round(mean, 3),
+                'stdev': round(math.sqrt(max(variance, 0.0)), 3),
+                'histogram': [
+                    {'from': low, 'to': high, 'documents': count}
+                    for low, high, count in zip(DENSITY_EDGES, DENSITY_EDGES[1:] + (None,), self.density)
+                ],
+            },
+            'top': [
+                {'key': keys[key_id], 'correct': matcher.corrections.get(keys[key_id]),
+                 'matches': self.frequency[key_id], 'documents': self.documents[key_id],
+                 'share': round(self.frequency[key_id] / totals['errors'], 4) if totals['errors'] else 0}
+                for key_id in ranked[:top]
+            ],
+            'cooccurrence': [
+                {'keys': [keys[pair // self.entries], keys[pair % self.entries]], 'documents': count}
+                for pair, count in pairs
+            ],
+        }
+
+
+def format_report(report):
+    """التقرير النصي لسطر الأوامر"""
+    totals = report['totals']
+    lines = [
+        f"المستندات: {totals['documents']:,} ({totals['failed']} فشل)، الكلمات: {totals['words']:,}، "
+        f"الأخطاء: {totals['errors']:,}",
+        f"المداخل التي طابقت: {report['entries_matched']} من {report['entries']}",
+        f"كثافة الأخطاء لكل ألف كلمة: المتوسط {report['density']['mean']}، "
+        f"الانحراف المعياري {report['density']['stdev']}",
+    ]
+    for bucket in report['density']['histogram']:
+        upper = '∞' if bucket['to'] is None else bucket['to']
+        lines.append(f"  [{bucket['from']}, {upper}): {bucket['documents']:,}")
+    lines.append("أكثر التصحيحات مطابقة:")
+    for entry in report['top']:
+        lines.append(f"  {entry['matches']:>10,}  {entry['share']:>6.1%}  {entry['documents']:>9,} مستند  "
+                     f"{entry['key']} ← {entry['correct']}")
+    if report['cooccurrence']:
+        lines.append("أكثر المداخل اجتماعاً في مستند واحد:")
+        for pair in report['cooccurrence']:
+            lines.append(f"  {pair['documents']:>9,}  {pair['keys'][0]} + {pair['keys'][1]}")
+    return '\n'.join(lines)
+
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(data):
+    values = array('Q')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def select_shard(paths, shard):
+    """شريحة الملفات (الرقم، العدد) من قائمة مرتبة، فتتقاسم الأجهزة الملفات دون تنسيق"""
+    index, count = shard
+    return [path for position, path in enumerate(paths) if position % count == index]
+
+
+def parse_shard(value):
+    """i/n ← (i، n) مع 0 <= i < n"""
+    index, separator, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"صيغة الشريحة i/n، مثل 0/4: {value}")
+    if not separator or count < 1 or not 0 <= index < count:
+        raise ValueError(f"صيغة الشريحة i/n، مثل 0/4: {value}")
+    return index, count
+
+
+def _init_worker(corrections_path, normalizer, overlap, layers=()):
+    global _worker_matcher, _worker_overlap
+    _worker_matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+    _worker_overlap = overlap
+
+
+def document_counts(path, matcher=None, overlap=None):
+    """(الكلمات، الأحرف، Counter المطابقات حسب ترتيب المدخل) لملف، أو None إن تعذرت قراءته"""
+    matcher = matcher or _worker_matcher
+    overlap = overlap or _worker_overlap
+    try:
+        text = read_document(path)
+    except Exception:
+        return None
+    index = entry_index(matcher)
+    counts = Counter(index[key_id] for _, _, key_id in matcher.iter_matches(text, overlap))
+    return len(text.split()), len(text), counts
+
+
+def collect_stats(paths, corrections_path, normalizer, overlap=OVERLAP_LONGEST, jobs=None,
+                  chunksize=8, layers=()):
+    """إحصاءات الملفات في جزء واحد، وإرجاع (الإحصاءات، الثواني)"""
+    started = time.perf_counter()
+    matcher = load_dictionary(corrections_path, normalizer=normalizer, layers=layers)
+    stats = CorpusStats.for_matcher(matcher, overlap)
+
+    def consume(results):
+        for result in results:
+            if result is None:
+                stats.totals['failed'] += 1
+            else:
+                stats.add_document(*result)
+
+    if jobs == 1:
+        consume(document_counts(path, matcher, overlap) for path in paths)
+    else:
+        with Pool(jobs, initializer=_init_worker,
+                  initargs=(corrections_path, normalizer, overlap, layers)) as pool:
+            consume(pool.imap_unordered(document_counts, paths, chunksize=chunksize))
+    return stats, time.perf_counter() - started
+
+
+def merge_shards(file_paths):
+    """دمج ملفات الأجزاء في إحصاءات واحدة"""
+    merged = None
+    for file_path in file_paths:
+        shard = CorpusStats.load(file_path)
+        merged = shard if merged is None else merged.merge(shard)
+    if merged is None:
+        raise ValueError("لا توجد أجزاء للدمج")
+    return merged
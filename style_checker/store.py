@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+قاعدة بيانات دائمة لنتائج الفحص يستعلم منها دون إعادة الفحص
+كل فحص لمستند يسجل مع أخطائه في SQLite بوضع WAL وبإدراج مجمع في معاملة واحدة،
+وتجمع الأخطاء على مفتاح القاموس لا على صيغتها في النص، والفهارس على المستند والمفتاح والموضع تجعل أسئلة مثل "كل المستندات التي فيها كلمة كذا"
+أو "تطور الأخطاء لكل مؤلف" استعلامات بأجزاء من الثانية على الأرشيف كله
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# عدد الفحوص المجمعة في معاملة واحدة عند الإدراج من الفحص الجماعي
+STORE_BATCH = 64
+# فترات التجميع في تقرير التطور وصيغها في strftime
+PERIODS = {'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m', 'year': '%Y'}
+TREND_GROUPS = ('author', 'document')
+# رقم صيغة الجداول في PRAGMA user_version؛ 1: الكلمات بمفتاح القاموس وصيغة كل خطأ في النص
+SCHEMA_VERSION = 1
+# ترحيل قاعدة من الصيغة السابقة لكل رقم؛ الأخطاء المسجلة قبل الترحيل تبقى على كلماتها
+_MIGRATIONS = {
+    1: '''
+ALTER TABLE entries RENAME COLUMN word TO key;
+ALTER TABLE errors ADD COLUMN word TEXT;
+''',
+}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    author TEXT
+);
+CREATE TABLE IF NOT EXISTS checks (
+    id INTEGER PRIMARY KEY,
+    document INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    checked REAL NOT NULL,
+    dictionary TEXT,
+    chars INTEGER,
+    words INTEGER,
+    errors INTEGER NOT NULL,
+    latest INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    correct TEXT
+);
+-- word الكلمة كما وردت في النص إذا اختلفت عن مفتاح القاموس، وإلا NULL
+CREATE TABLE IF NOT EXISTS errors (
+    check_id INTEGER NOT NULL REFERENCES checks (id) ON DELETE CASCADE,
+    entry INTEGER NOT NULL REFERENCES entries (id),
+    position INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    layer TEXT,
+    word TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_author ON documents (author);
+CREATE INDEX IF NOT EXISTS checks_document ON checks (document, checked);
+CREATE INDEX IF NOT EXISTS checks_latest ON checks (document) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS errors_entry ON errors (entry, check_id);
+CREATE INDEX IF NOT EXISTS errors_check ON errors (check_id, position);
+CREATE INDEX IF NOT EXISTS errors_word ON errors (word) WHERE word IS NOT NULL;
+'''
+
+
+def default_store_path():
+    """مسار قاعدة النتائج الافتراضي في مجلد بيانات المستخدم"""
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'aslobi', 'results.db')
+
+
+class ResultStore:
+    """سجل الفحوص: مستند ← فحوصه ← أخطاء كل فحص، ويعلَّم آخر فحص لكل مستند
+
+    الاستعلامات عن "المستندات التي فيها كلمة" تعتمد آخر فحص لكل مستند، وتقرير التطور
+    يعتمد آخر فحص لكل مستند في كل فترة حتى لا تحتسب إعادة الفحص مرتين.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        self._lock = threading.Lock()
+        self._entries = {}
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            if self.path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute('PRAGMA foreign_keys=ON')
+            self._migrate()
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _migrate(self):
+        """ترحيل قاعدة أنشأها إصدار سابق إلى SCHEMA_VERSION"""
+        connection = self._connection
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(f"قاعدة النتائج من إصدار أحدث ({version})")
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries'").fetchone()
+        if exists is None:
+            return
+        for number in range(version + 1, SCHEMA_VERSION + 1):
+            connection.executescript(_MIGRATIONS[number])
+
+    def _entry_ids(self, errors):
+        """أرقام مفاتيح الأخطاء في جدول entries، مع إضافة الجديد منها وتحديث تصحيح ما تغير"""
+        connection = self._connection
+        changed = {}
+        for error in errors:
+            key = error.get('key', error['word'])
+            correct = json.dumps(error['correct'], ensure_ascii=False)
+            known = self._entries.get(key)
+            if (known is None or known[1] != correct) and key not in changed:
+                changed[key] = correct
+        if changed:
+            connection.executemany(
+                'INSERT INTO entries (key, correct) VALUES (?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET correct = excluded.correct',
+                changed.items())
+            keys = list(changed)
+            for index in range(0, len(keys), 500):
+                batch = keys[index:index + 500]
+                rows = connection.execute(
+                    f'SELECT key, id, correct FROM entries WHERE key IN ({",".join("?" * len(batch))})', batch)
+                self._entries.update((key, (entry_id, correct)) for key, entry_id, correct in rows)
+        return self._entries
+
+    def _document_id(self, path, author):
+        connection = self._connection
+        row = connection.execute('SELECT id, author FROM documents WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return connection.execute('INSERT INTO documents (path, author) VALUES (?, ?)',
+                                      (path, author)).lastrowid
+        if author is not None and author != row['author']:
+            connection.execute('UPDATE documents SET author = ? WHERE id = ?', (author, row['id']))
+        return row['id']
+
+    def record_many(self, checks):
+        """تسجيل عدة فحوص في معاملة واحدة وإرجاع أرقامها
+
+        كل فحص قاموس فيه path و errors، واختيارياً author و chars و words و dictionary
+        (بصمة القاموس) و checked (زمن الفحص، الافتراضي الآن).
+        """
+        now = time.time()
+        ids = []
+        with self._lock:
+            try:
+                self._insert(checks, now, ids)
+            except Exception:
+                # أرقام الكلمات المضافة في المعاملة الملغاة لم تعد صالحة
+                self._entries.clear()
+                raise
+        return ids
+
+    def _insert(self, checks, now, ids):
+        rows = []
+        with self._connection as connection:
+            for check in checks:
+                errors = check['errors']
+                document = self._document_id(os.fspath(check['path']), check.get('author'))
+                connection.execute('UPDATE checks SET latest = 0 WHERE document = ? AND latest = 1', (document,))
+                check_id = connection.execute(
+                    'INSERT INTO checks (document, checked, dictionary, chars, words, errors) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (document, check.get('checked') or now, check.get('dictionary'),
+                     check.get('chars'), check.get('words'), len(errors))).lastrowid
+                entries = self._entry_ids(errors)
+                for error in errors:
+                    word = error['word']
+                    key = error.get('key', word)
+                    rows.append((check_id, entries[key][0], error['position'], len(word),
+                                 error.get('layer'), None if key == word else word))
+                ids.append(check_id)
+            connection.executemany(
+                'INSERT INTO errors (check_id, entry, position, length, layer, word) VALUES (?, ?, ?, ?, ?, ?)',
+                rows)
+
+    def record(self, path, errors, **details):
+        """تسجيل فحص واحد وإرجاع رقمه"""
+        return self.record_many([dict(details, path=path, errors=errors)])[0]
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, parameters)]
+
+    def documents_with(self, word, author=None, limit=None):
+        """المستندات التي تحتوي الكلمة في آخر فحص لها، مرتبة حسب عدد مراتها
+
+        word مفتاح في القاموس أو صيغة وردت بها كلمة في النص، وتحتسب كل صيغ مفتاحها.
+        """
+        sql = '''
+            WITH matched AS (
+                SELECT id FROM entries WHERE key = ?
+                UNION SELECT entry FROM errors WHERE word = ?
+            )
+            SELECT documents.path, documents.author, COUNT(*) AS count,
+                   MIN(errors.position) AS first, checks.checked
+            FROM matched
+            JOIN errors ON errors.entry = matched.id
+            JOIN checks ON checks.id = errors.check_id AND checks.latest = 1
+            JOIN documents ON documents.id = checks.document'''
+        parameters = [word, word]
+        if author is not None:
+            sql += ' WHERE documents.author = ?'
+            parameters.append(author)
+        sql += ' GROUP BY checks.id ORDER BY count DESC, documents.path'
+        if limit:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        return self._query(sql, parameters)
+
+    def top_entries(self, author=None, limit=20):
+        """أكثر مفاتيح القاموس تكراراً في آخر فحص لكل مستند، مع عدد المستندات التي ظهرت فيها"""
+        # التجميع على أرقام الكلمات أولاً ثم جلب نصوص الأكثر تكراراً وحدها
+        sql = '''
+            WITH counts AS (
+                SELECT errors.entry, COUNT(*) AS count, COUNT(DISTINCT checks.document) AS documents
+                FROM errors JOIN checks ON checks.id = errors.check_id AND checks.latest = 1'''
+        parameters = []
+        if author is not None:
+            sql += ' JOIN documents ON documents.id = checks.document AND documents.author = ?'
+            parameters.append(author)
+        sql += '''
+                GROUP BY errors.entry ORDER BY count DESC LIMIT ?
+            )
+            SELECT entries.key AS word, entries.correct, counts.count, counts.documents
+            FROM counts JOIN entries ON entries.id = counts.entry
+            ORDER BY counts.count DESC, entries.key'''
+        parameters.append(limit)
+        rows = self._query(sql, parameters)
+        for row in rows:
+            row['correct'] = json.loads(row['correct'])
+        return rows
+
+    def trend(self, by='author', period='month', author=None):
+        """الأخطاء لكل مجموعة (مؤلف أو مستند) في كل فترة، بآخر فحص لكل مستند في الفترة
+
+        density أخطاء لكل ألف كلمة، ولا تحسب إلا من الفحوص التي سجل عدد كلماتها.
+        """
+        if by not in TREND_GROUPS:
+            raise ValueError(f"تجميع غير معروف: {by}")
+        if period not in PERIODS:
+            raise ValueError(f"فترة غير معروفة: {period}")
+        group = "COALESCE(documents.author, '')" if by == 'author' else 'documents.path'
+        sql = f'''
+            WITH ranked AS (
+                SELECT checks.*, strftime(?, checks.checked, 'unixepoch', 'localtime') AS period,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY checks.document,
+                                        strftime(?, checks.checked, 'unixepoch', 'localtime')
+                           ORDER BY checks.checked DESC, checks.id DESC) AS rank
+                FROM checks
+            )
+            SELECT {group} AS name, ranked.period, COUNT(*) AS documents,
+                   SUM(ranked.errors) AS errors, SUM(ranked.words) AS words,
+                   ROUND(1000.0 * SUM(CASE WHEN ranked.words > 0 THEN ranked.errors END)
+                         / SUM(ranked.words), 3) AS density
+            FROM ranked JOIN documents ON documents.id = ranked.document
+            WHERE ranked.rank = 1'''
+        parameters = [PERIODS[period], PERIODS[period]]
+        if author is not None:
+            sql += ' AND documents.author = ?'
+            parameters.append(author)
+        sql += ' GROUP BY name, ranked.period ORDER BY name, ranked.period'
+        return self._query(sql, parameters)
+
+    def history(self, path):
+        """فحوص مستند واحد من الأحدث إلى الأقدم"""
+        return self._query('''
+            SELECT checks.id, checks.checked, checks.errors, checks.words, checks.chars,
+                   checks.dictionary, checks.latest
+            FROM checks JOIN documents ON documents.id = checks.document
+            WHERE documents.path = ? ORDER BY checks.checked DESC, checks.id DESC''', (os.fspath(path),))
+
+    def errors_of(self, check_id):
+        """أخطاء فحص واحد مرتبة حسب الموضع، مع 'key' إذا اختلف المفتاح عن الكلمة كما في make_error"""
+        rows = self._query('''
+            SELECT COALESCE(errors.word, entries.key) AS word, entries.correct, errors.position,
+                   errors.layer, entries.key
+            FROM errors JOIN entries ON entries.id = errors.entry
+            WHERE errors.check_id = ? ORDER BY errors.position''', (check_id,))
+        for row in rows:
+            row['correct'] = json.loads(row['correct'])
+            if row['layer'] is None:
+                del row['layer']
+            if row['key'] == row['word']:
+                del row['key']
+        return rows
+
+    def __len__(self):
+        """عدد الفحوص المسجلة"""
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM checks').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+فحص الملفات الكبيرة جداً على دفعات بذاكرة ثابتة
+تستأنف آلة المطابقة حالتها بين الدفعات، ويُحتفظ بنافذة صغيرة من النص
+تكفي لحدود الكلمات والسياق حول الأخطاء التي تقع على حدود الدفعات
+"""
+
+import codecs
+from time import perf_counter
+
+from .docx_stream import CHUNK_SIZE as DOCX_CHUNK_SIZE, iter_docx_chunks
+from .matcher import CONTEXT_WIDTH, OVERLAP_ALL, OverlapSelector, fold_case, is_word_char
+from .profiling import STAGE_MATCH, STAGE_NORMALIZE
+
+# حجم الدفعة الافتراضي بالأحرف
+CHUNK_SIZE = 1 << 20
+
+
+def detect_encoding(file_path, chunk_size=CHUNK_SIZE):
+    """تحديد ترميز الملف (utf-8 أو windows-1256) بقراءة متدرجة دون تحميله كاملاً"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'windows-1256'
+    return 'utf-8'
+
+
+def iter_chunks(file_path, encoding=None, chunk_size=CHUNK_SIZE):
+    """قراءة الملف على دفعات نصية دون تحويل نهايات الأسطر"""
+    encoding = encoding or detect_encoding(file_path)
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            yield chunk
+
+
+def iter_errors(matcher, chunks, encoding=None, overlap=OVERLAP_ALL, profile=None):
+    """إرجاع الأخطاء تباعاً من سلسلة دفعات نصية
+
+    كل خطأ بالصيغة المعتادة مع 'position' موضعاً مطلقاً بالأحرف، ويضاف إليه
+    'byte_offset' موضعاً مطلقاً بالبايت إذا حدد الترميز. تبقى الذاكرة محدودة
+    بحجم الدفعة مضافاً إليه طول أطول مدخل في القاموس ونافذة السياق.
+    overlap سياسة التداخل كما في Matcher.iter_matches، والنتائج مطابقة لها.
+    profile سجل Profile اختياري تضاف إليه أزمنة التوحيد والمطابقة والحجم والمطابقات.
+    """
+    corrections = matcher.corrections
+    keys = matcher.keys
+    sources = matcher.sources
+    lengths = matcher.lengths
+    normalizer = matcher.normalizer
+    # ما يلزم الاحتفاظ به من النص الممسوح خلف آخر حرف: بداية مطابقة لم تكتمل
+    # والحرف الذي يسبقها لفحص الحدود
+    margin = matcher.max_length + 1
+
+    # النص الأصلي للكلمات والسياق، والنص الممسوح (الموحد إن وجد خط توحيد)
+    # مع المواضع الأصلية المطلقة لحروفه
+    window = ''
+    window_start = 0
+    scanned = ''
+    scanned_start = 0
+    offsets = None if normalizer is None else []
+    state = 0
+    pending = []
+    selector = OverlapSelector(overlap)
+    ready = selector.ready
+    cursor_char = 0
+    cursor_byte = 0
+
+    def byte_offset(position):
+        """تحويل موضع بالأحرف إلى موضع بالبايت بتحريك مؤشر داخل النافذة"""
+        nonlocal cursor_char, cursor_byte
+        low = cursor_char - window_start
+        high = position - window_start
+        if high >= low:
+            cursor_byte += len(window[low:high].encode(encoding))
+        else:
+            cursor_byte -= len(window[high:low].encode(encoding))
+        cursor_char = position
+        return cursor_byte
+
+    def original(position):
+        """الموضع الأصلي لحرف من النص الممسوح"""
+        if offsets is None:
+            return position
+        return offsets[position - scanned_start]
+
+    def resolve(final):
+        """معالجة المطابقات المرشحة التي توفر نصها وسياقها كاملاً"""
+        scanned_end = scanned_start + len(scanned)
+        data_end = window_start + len(window)
+        done = 0
+        for end, key_ids in pending:
+            if not final and (end >= scanned_end or original(end) + CONTEXT_WIDTH > data_end):
+                break
+            done += 1
+            taken = ()
+            for key_id in key_ids:
+                length = lengths[key_id]
+                if length in taken:
+                    continue
+                start = end - length
+                local_start = start - scanned_start
+                local_end = end - scanned_start
+                before = is_word_char(scanned[local_start - 1]) if start > 0 else False
+                if before == is_word_char(scanned[local_start]):
+                    continue
+                after = is_word_char(scanned[local_end]) if end < scanned_end else False
+                if is_word_char(scanned[local_end - 1]) == after:
+                    continue
+                if offsets is None:
+                    span_start, span_end = start, end
+                else:
+                    span_start, span_end = matcher.original_span(
+                        offsets, local_start, local_end, key_id, data_end)
+                word_start = span_start - window_start
+                word_end = span_end - window_start
+                if not matcher.accepts(key_id, window, word_start, word_end):
+                    continue
+                taken += (length,)
+                error = {
+                    'word': window[word_start:word_end],
+                    'correct': corrections[keys[key_id]],
+                    'position': span_start,
+                    'context': window[max(0, word_start - CONTEXT_WIDTH):word_end + CONTEXT_WIDTH]
+                }
+                if sources is not None:
+                    error['layer'] = sources.get(keys[key_id])
+                if keys[key_id] != error['word']:
+                    error['key'] = keys[key_id]
+                if encoding:
+                    error['byte_offset'] = byte_offset(span_start)
+                selector.feed(start, end, key_id, error)
+            selector.close_hit()
+            if ready:
+                yield from ready
+                ready.clear()
+        del pending[:done]
+        # مرشحو سياسة الأطول يحسمون حين لا تبقى مطابقة قادمة تبدأ قبلهم
+        if final:
+            selector.flush()
+        else:
+            next_end = pending[0][0] if pending else scanned_end + 1
+            selector.flush(next_end - matcher.max_length)
+        yield from ready
+        ready.clear()
+
+    for chunk in chunks:
+        if profile is not None:
+            started = perf_counter()
+        data_start = window_start + len(window)
+        window += chunk
+        if normalizer is None:
+            folded = fold_case(chunk)
+            scanned += chunk
+        else:
+            normalized, chunk_offsets = normalizer.normalize(chunk)
+            folded = fold_case(normalized)
+            scanned += folded
+            if chunk_offsets is None:
+                offsets.extend(range(data_start, data_start + len(chunk)))
+            else:
+                offsets.extend(data_start + offset for offset in chunk_offsets)
+        if profile is not None:
+            normalized = perf_counter()
+            profile.add(STAGE_NORMALIZE, normalized - started)
+        base = scanned_start + len(scanned) - len(folded)
+        hits, state = matcher.walk(folded, state)
+        pending.extend((base + end, key_ids) for end, key_ids in hits)
+
+        if profile is None:
+            yield from resolve(False)
+        else:
+            # تجمع أخطاء الدفعة قبل إرجاعها حتى لا يحتسب زمن المستهلك في المطابقة
+            found = list(resolve(False))
+            profile.add(STAGE_MATCH, perf_counter() - normalized)
+            profile.count_matches(found)
+            profile.chars += len(chunk)
+            profile.bytes += len(chunk.encode(encoding or 'utf-8', 'surrogatepass'))
+            yield from found
+
+        # قص النافذتين مع إبقاء ما تحتاجه المطابقات المعلقة والقادمة
+        scanned_end = scanned_start + len(scanned)
+        keep_scanned = scanned_end - margin
+        if pending:
+            keep_scanned = min(keep_scanned, pending[0][0] - margin)
+        keep_scanned = max(keep_scanned, scanned_start)
+        if keep_scanned < scanned_end:
+            keep_from = original(keep_scanned) - CONTEXT_WIDTH
+        else:
+            keep_from = window_start + len(window) - CONTEXT_WIDTH
+        keep_from = max(keep_from, window_start)
+        if encoding and keep_from > cursor_char:
+            byte_offset(keep_from)
+        window = window[keep_from - window_start:]
+        window_start = keep_from
+        if offsets is not None:
+            del offsets[:keep_scanned - scanned_start]
+        scanned = scanned[keep_scanned - scanned_start:]
+        scanned_start = keep_scanned
+
+    if profile is None:
+        yield from resolve(True)
+    else:
+        started = perf_counter()
+        found = list(resolve(True))
+        profile.add(STAGE_MATCH, perf_counter() - started, 0)
+        profile.count_matches(found)
+        yield from found
+
+
+def check_file_streaming(matcher, file_path, encoding=None, chunk_size=CHUNK_SIZE,
+                         overlap=OVERLAP_ALL, profile=None):
+    """فحص ملف نصي كبير وإرجاع الأخطاء كمولّد"""
+    encoding = encoding or detect_encoding(file_path, chunk_size)
+    return iter_errors(matcher, iter_chunks(file_path, encoding, chunk_size), encoding, overlap, profile)
+
+
+def _counted(chunks, counts):
+    """تمرير الدفعات مع إضافة عدد أحرفها وكلماتها إلى counts"""
+    counts['chars'] = counts['words'] = 0
+    for chunk in chunks:
+        counts['chars'] += len(chunk)
+        counts['words'] += len(chunk.split())
+        yield chunk
+
+
+def check_docx_streaming(matcher, file_path, chunk_size=DOCX_CHUNK_SIZE, overlap=OVERLAP_ALL,
+                         profile=None, counts=None):
+    """فحص ملف Word فقرة فقرة دون بناء نصه كاملاً، بمواضع مطابقة لنص read_docx
+
+    counts قاموس اختياري يضاف إليه عدد أحرف النص 'chars' وكلماته 'words'؛ الدفعات
+    تنقسم عند فواصل الفقرات فلا تنقسم كلمة بين دفعتين.
+    """
+    chunks = iter_docx_chunks(file_path, chunk_size)
+    if counts is not None:
+        chunks = _counted(chunks, counts)
+    return iter_errors(matcher, chunks, overlap=overlap, profile=profile)
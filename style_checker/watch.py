@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+مراقبة ملف التصحيحات وإعادة تحميله عند تعديله دون إيقاف الخادم أو المحرر
+المراقبة بالاستطلاع الدوري لـ os.stat لأن المكتبة القياسية لا توفر inotify أو ما يماثله،
+ولا يعاد التحميل إلا بعد أن يستقر الملف فترة كاملة حتى لا يقرأ وهو نصف مكتوب
+"""
+
+import os
+import sys
+import threading
+
+from .dictionary import reload_dictionary
+
+# الفاصل بين فحصين لحالة الملف بالثواني
+POLL_INTERVAL = 0.5
+
+
+def _signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileWatcher:
+    """استطلاع ملف في خيط خلفي واستدعاء callback(file_path) بعد استقرار كل تعديل"""
+
+    def __init__(self, file_path, callback, interval=POLL_INTERVAL):
+        self.file_path = file_path
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='aslobi-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        current = _signature(self.file_path)
+        pending = None
+        while not self._stop.wait(self.interval):
+            signature = _signature(self.file_path)
+            if signature == current or signature is None:
+                # لا تغيير، أو الملف محذوف مؤقتاً أثناء حفظه باستبدال ذري
+                pending = None
+                continue
+            if signature != pending:
+                # تغير منذ الاستطلاع السابق: ينتظر فترة أخرى حتى يستقر
+                pending = signature
+                continue
+            current, pending = signature, None
+            try:
+                self.callback(self.file_path)
+            except Exception as error:  # لا يوقف خطأ في ملف معدل المراقبة
+                print(f"تعذرت إعادة تحميل {self.file_path}: {error}", file=sys.stderr)
+
+
+class LiveDictionary:
+    """محرك مطابقة يعاد تحميله عند تعديل ملفه
+
+    يبنى المحرك الجديد في خيط المراقبة ثم يستبدل بإسناد واحد، فكل فحص بدأ قبل
+    الاستبدال يكمل على النسخة القديمة كاملة ولا يرى أي فحص قاموساً نصف محدث.
+    on_reload(result) تستدعى بعد كل استبدال بنتيجة reload_dictionary.
+    تراقب ملفات الطبقات (layers) أيضاً، ويعاد دمجها كلها عند تعديل أي منها.
+    """
+
+    def __init__(self, matcher, file_path, on_reload=None, interval=POLL_INTERVAL, layers=()):
+        self.matcher = matcher
+        self.file_path = file_path
+        self.layers = layers
+        self.on_reload = on_reload
+        self.generation = 0
+        self.last = None
+        self._lock = threading.Lock()
+        paths = [file_path] + [layer.path for layer in layers if layer.enabled]
+        self._watchers = [FileWatcher(path, self.reload, interval) for path in paths]
+
+    def start(self):
+        for watcher in self._watchers:
+            watcher.start()
+        return self
+
+    def stop(self):
+        for watcher in self._watchers:
+            watcher.stop()
+
+    def reload(self, file_path=None):
+        with self._lock:
+            result = reload_dictionary(self.matcher, self.file_path, layers=self.layers)
+            self.matcher = result.matcher
+            self.generation += 1
+            self.last = result
+        if self.on_reload is not None:
+            self.on_reload(result)
+        return result
+
+
+def describe_reload(result):
+    """سطر يلخص إعادة التحميل لشريط الحالة أو السجل"""
+    method = 'تعديل تدريجي' if result.incremental else 'إعادة بناء كاملة'
+    return (f"تم تحديث القاموس (+{len(result.added)} −{len(result.removed)} ~{len(result.changed)}) "
+            f"في {result.seconds:.2f} ث، {method}")
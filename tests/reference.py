@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+مراجع الاختبارات التفاضلية: قواميس ونصوص عشوائية، والفحص القديم بتعبير منتظم لكل مدخل
+تقارن بها نتائج محرك المطابقة في كل مسار (الكامل والمتدفق والجزئي وإعادة التحميل)
+"""
+
+import re
+
+from style_checker.matcher import OVERLAP_ALL, OVERLAP_LONGEST, fold_case
+from style_checker.normalize import ARABIC_MARKS, TATWEEL, ZERO_WIDTH
+
+# أحرف كلمات عربية ولاتينية بحالتيها، وفواصل وعلامات ترقيم تدخل في المفاتيح نفسها
+# (مثل "!!") حتى تختبر حدود \b عند طرف ليس حرف كلمة
+LETTERS = 'ابتسلمنهوي'
+LATIN = 'aAbB'
+SEPARATORS = '  .!،'
+ALPHABET = LETTERS + LATIN + '1' + SEPARATORS
+
+# ما يحذفه خط التوحيد الافتراضي وما يبدله، لتزيين النص بما لا يغير المطابقة
+DECORATIONS = '\u064e\u0650\u0651' + TATWEEL + '\u200c'
+ALEF_FORMS = 'أإآ'
+_REMOVED = re.compile(f'[{ARABIC_MARKS}{TATWEEL}{ZERO_WIDTH}]')
+_ALEF = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا'})
+
+
+def random_key(rng):
+    length = rng.randint(1, 5)
+    key = ''.join(rng.choice(ALPHABET) for _ in range(length))
+    # مفاتيح من أحرف الكلمات غالباً، كما في القاموس الحقيقي
+    if rng.random() < 0.6:
+        key = ''.join(rng.choice(LETTERS + LATIN) for _ in range(length))
+    return key.strip() or key
+
+
+def random_corrections(rng, size, taken=()):
+    """قاموس عشوائي لا يتطابق فيه مفتاحان بعد توحيد الحالة"""
+    folded = {fold_case(key) for key in taken}
+    corrections = {}
+    while len(corrections) < size:
+        key = random_key(rng)
+        if fold_case(key) in folded:
+            continue
+        folded.add(fold_case(key))
+        corrections[key] = f'صواب{len(folded)}'
+    return corrections
+
+
+def random_text(rng, corrections, size):
+    """نص عشوائي تتخلله مفاتيح القاموس بحالات أحرف مختلفة"""
+    keys = list(corrections)
+    pieces = []
+    length = 0
+    while length < size:
+        if keys and rng.random() < 0.4:
+            piece = rng.choice(keys)
+            if rng.random() < 0.3:
+                piece = piece.swapcase()
+            if rng.random() < 0.5:
+                piece = f' {piece} '
+        else:
+            piece = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 6)))
+        pieces.append(piece)
+        length += len(piece)
+    return ''.join(pieces)
+
+
+def decorate(rng, text):
+    """إضافة تشكيل وتطويل ومحارف خفية وصور ألف لا يفرق بينها خط التوحيد الافتراضي"""
+    result = []
+    for char in text:
+        if char == 'ا' and rng.random() < 0.3:
+            char = rng.choice(ALEF_FORMS)
+        result.append(char)
+        if char in LETTERS + ALEF_FORMS and rng.random() < 0.25:
+            result.append(rng.choice(DECORATIONS))
+    return ''.join(result)
+
+
+def default_fold(text):
+    """توحيد مرجعي مستقل عن normalize.py: النص الموحد ومواضع حروفه في النص الأصلي"""
+    folded = []
+    offsets = []
+    for index, char in enumerate(text):
+        if _REMOVED.match(char):
+            continue
+        folded.append(char.translate(_ALEF))
+        offsets.append(index)
+    return ''.join(folded), offsets
+
+
+def legacy_spans(corrections, text, fold=None):
+    """الفحص القديم: re.finditer مع \\b لكل مدخل، ويرجع (البداية، النهاية، المفتاح)
+
+    إذا مرر fold يجري البحث في النص الموحد وترد المواضع إلى النص الأصلي.
+    """
+    scanned, offsets = (text, None) if fold is None else fold(text)
+    spans = []
+    for key in corrections:
+        pattern = key if fold is None else fold(key)[0]
+        for match in re.finditer(r'\b' + re.escape(pattern) + r'\b', scanned, re.IGNORECASE):
+            spans.append(_original(match.start(), match.end(), key, offsets))
+    return spans
+
+
+def all_occurrences(corrections, text, fold=None):
+    """كل مطابقة صالحة الحدود لكل مفتاح، ولو تداخلت مطابقات المفتاح الواحد"""
+    scanned, offsets = (text, None) if fold is None else fold(text)
+    spans = []
+    for key in corrections:
+        pattern = key if fold is None else fold(key)[0]
+        regex = re.compile(r'(?=(\b' + re.escape(pattern) + r'\b))', re.IGNORECASE)
+        for match in regex.finditer(scanned):
+            spans.append(_original(match.start(1), match.end(1), key, offsets))
+    return spans
+
+
+def _original(start, end, key, offsets):
+    if offsets is None:
+        return start, end, key
+    return offsets[start], offsets[end - 1] + 1, key
+
+
+def select(spans, overlap):
+    """تطبيق سياسة التداخل بالقوة الغاشمة على كل المطابقات الصالحة"""
+    if overlap == OVERLAP_ALL:
+        raise ValueError("OVERLAP_ALL تقارن بـ legacy_spans")
+    if overlap == OVERLAP_LONGEST:
+        ordered = sorted(spans, key=lambda span: (span[0], span[0] - span[1]))
+    else:
+        ordered = sorted(spans, key=lambda span: (span[1], span[0]))
+    selected = []
+    last_end = 0
+    for span in ordered:
+        if span[0] >= last_end:
+            selected.append(span)
+            last_end = span[1]
+    return selected
+
+
+def as_errors(text, corrections, spans):
+    """(الموضع، الكلمة، الصواب) مرتبة للمقارنة بنتائج find_errors"""
+    return sorted((start, text[start:end], corrections[key]) for start, end, key in spans)
+
+
+def summarize(errors):
+    return sorted((error['position'], error['word'], error['correct']) for error in errors)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""تحديث مطابقات الفقرة بعد كل تعديل مقارناً بإعادة فحصها كاملة"""
+
+import random
+
+import pytest
+
+from style_checker.incremental import scan_paragraph, update_matches
+from style_checker.matcher import OVERLAP_POLICIES, Matcher
+from style_checker.normalize import DEFAULT_NORMALIZER
+
+from reference import ALPHABET, decorate, random_corrections, random_text
+
+SEEDS = range(15)
+
+
+def random_edit(rng, text, corrections):
+    """(الموضع، عدد المحذوف، النص المضاف): حذف أو كتابة أو لصق مفتاح أو استبدال"""
+    position = rng.randint(0, len(text))
+    removed = rng.choice([0, 0, 1, rng.randint(0, 8)])
+    removed = min(removed, len(text) - position)
+    if rng.random() < 0.3:
+        inserted = rng.choice(list(corrections))
+    else:
+        inserted = ''.join(rng.choice(ALPHABET) for _ in range(rng.choice([0, 1, 1, 3])))
+    return position, removed, inserted
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('overlap', OVERLAP_POLICIES)
+@pytest.mark.parametrize('normalizer', [None, DEFAULT_NORMALIZER], ids=['plain', 'normalized'])
+def test_update_matches_equals_full_rescan(seed, overlap, normalizer):
+    rng = random.Random(seed)
+    corrections = random_corrections(rng, rng.randint(1, 20))
+    text = random_text(rng, corrections, 200)
+    if normalizer is not None:
+        text = decorate(rng, text)
+    matcher = Matcher(corrections, normalizer)
+    matches = scan_paragraph(matcher, text, overlap)
+    for _ in range(60):
+        position, removed, inserted = random_edit(rng, text, corrections)
+        if normalizer is not None:
+            inserted = decorate(rng, inserted)
+        before = set(matches)
+        text = text[:position] + inserted + text[position + removed:]
+        matches, dropped, found = update_matches(
+            matcher, text, matches, position, removed, len(inserted), overlap)
+        expected = scan_paragraph(matcher, text, overlap)
+        assert matches == expected
+        # المضاف والمحذوف يطابقان الفرق بين المطابقات قبل التعديل وبعده
+        assert set(found) <= set(expected)
+        assert len(before) - len(dropped) + len(found) == len(expected)
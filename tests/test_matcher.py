@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""محرك Aho–Corasick مقارناً بالفحص القديم بتعبير منتظم لكل مدخل"""
+
+import random
+
+import pytest
+
+from style_checker.matcher import OVERLAP_ALL, OVERLAP_LONGEST, OVERLAP_NON_OVERLAPPING, Matcher
+from style_checker.normalize import DEFAULT_NORMALIZER
+
+from reference import (
+    all_occurrences, as_errors, decorate, default_fold, legacy_spans, random_corrections, random_text,
+    select, summarize,
+)
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_all_matches_legacy_regex(seed):
+    rng = random.Random(seed)
+    corrections = random_corrections(rng, rng.randint(1, 30))
+    text = random_text(rng, corrections, 400)
+    matcher = Matcher(corrections, normalizer=None)
+    expected = as_errors(text, corrections, legacy_spans(corrections, text))
+    assert summarize(matcher.find_errors(text, OVERLAP_ALL)) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('overlap', [OVERLAP_LONGEST, OVERLAP_NON_OVERLAPPING])
+def test_overlap_policies(seed, overlap):
+    rng = random.Random(seed)
+    corrections = random_corrections(rng, rng.randint(1, 30))
+    text = random_text(rng, corrections, 400)
+    matcher = Matcher(corrections, normalizer=None)
+    expected = as_errors(text, corrections, select(all_occurrences(corrections, text), overlap))
+    errors = matcher.find_errors(text, overlap)
+    assert summarize(errors) == expected
+    ends = [error['position'] + len(error['word']) for error in errors]
+    assert all(end <= error['position'] for end, error in zip(ends, errors[1:]))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_normalized_offsets(seed):
+    rng = random.Random(seed)
+    corrections = random_corrections(rng, rng.randint(1, 30))
+    text = decorate(rng, random_text(rng, corrections, 400))
+    matcher = Matcher(corrections, normalizer=DEFAULT_NORMALIZER)
+    expected = as_errors(text, corrections, legacy_spans(corrections, text, default_fold))
+    assert summarize(matcher.find_errors(text, OVERLAP_ALL)) == expected
+    for overlap in (OVERLAP_LONGEST, OVERLAP_NON_OVERLAPPING):
+        spans = select(all_occurrences(corrections, text, default_fold), overlap)
+        assert summarize(matcher.find_errors(text, overlap)) == as_errors(text, corrections, spans)
+
+
+def test_boundaries_of_punctuation_keys():
+    # مفتاح يبدأ وينتهي بغير حرف كلمة لا يطابق إلا بين كلمتين ملاصقتين له، كما يفعل \b،
+    # ومفتاح ينتهي بحرف كلمة لا يطابق بداية كلمة أطول
+    corrections = {'!!': '!', 'و ال': 'وال'}
+    text = 'قال!!نعم !! و الكتاب'
+    matcher = Matcher(corrections, normalizer=None)
+    expected = as_errors(text, corrections, legacy_spans(corrections, text))
+    assert summarize(matcher.find_errors(text)) == expected
+    assert [error['position'] for error in matcher.find_errors(text)] == [3]
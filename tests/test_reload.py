@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""إعادة التحميل الفورية (تعديل الآلة القائمة) مقارنة ببناء المحرك من جديد"""
+
+import itertools
+import json
+import os
+import random
+import time
+
+import pytest
+
+from style_checker.dictionary import load_dictionary, reload_dictionary
+from style_checker.layers import Layer
+from style_checker.matcher import OVERLAP_POLICIES, Matcher
+from style_checker.normalize import DEFAULT_NORMALIZER
+
+from reference import decorate, random_corrections, random_text
+
+SEEDS = range(12)
+# ثوانٍ تضاف إلى زمن تعديل كل ملف يكتب، فيختلف زمنا كتابتين متتاليتين دائماً
+_TICKS = itertools.count(1)
+
+
+def write_json(path, corrections):
+    """كتابة القاموس مع تقديم زمن التعديل حتى لا يقرأ الفهرس القديم على أنه حديث"""
+    path.write_text(json.dumps(corrections, ensure_ascii=False), encoding='utf-8')
+    mtime = time.time_ns() + next(_TICKS) * 10**9
+    os.utime(path, ns=(mtime, mtime))
+
+
+def edited(rng, corrections):
+    """قاموس بعد إضافة مفاتيح وحذف أخرى وتغيير تصحيح بعضها"""
+    result = dict(corrections)
+    for key in rng.sample(list(result), min(len(result), rng.randint(0, 3))):
+        del result[key]
+    for key in rng.sample(list(result), min(len(result), rng.randint(0, 3))):
+        result[key] += '!'
+    result.update(random_corrections(rng, rng.randint(0, 4), taken=result))
+    return result
+
+
+def assert_same_results(matcher, fresh, texts):
+    for text in texts:
+        for overlap in OVERLAP_POLICIES:
+            assert matcher.find_errors(text, overlap) == fresh.find_errors(text, overlap)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('normalizer', [None, DEFAULT_NORMALIZER], ids=['plain', 'normalized'])
+def test_reload_equals_rebuild(tmp_path, seed, normalizer):
+    rng = random.Random(seed)
+    path = tmp_path / 'corrections.json'
+    corrections = random_corrections(rng, rng.randint(5, 30))
+    write_json(path, corrections)
+    load_dictionary(path, normalizer=normalizer)
+    # المحرك الثاني يقرأ من ملف الفهرس، فيبدأ التعديل من جداوله المقروءة
+    matcher = load_dictionary(path, normalizer=normalizer)
+    for _ in range(6):
+        corrections = edited(rng, corrections)
+        write_json(path, corrections)
+        result = reload_dictionary(matcher, path)
+        assert result.incremental
+        matcher = result.matcher
+        fresh = Matcher(corrections, normalizer)
+        texts = [random_text(rng, corrections, 300) for _ in range(3)]
+        if normalizer is not None:
+            texts = [decorate(rng, text) for text in texts]
+        assert_same_results(matcher, fresh, texts)
+        # الفهرس المكتوب بعد إعادة التحميل يحمّل محركاً مطابقاً
+        assert_same_results(load_dictionary(path, normalizer=normalizer), fresh, texts)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_reload_layers(tmp_path, seed):
+    rng = random.Random(seed)
+    base_path = tmp_path / 'corrections.json'
+    house_path = tmp_path / 'house.json'
+    base = random_corrections(rng, 20)
+    house = random_corrections(rng, 5, taken=base)
+    # طبقة الدار تستبدل تصحيح مفتاح من الأساس وتسقط آخر
+    overridden, hidden = list(base)[:2]
+    house[overridden] = 'صواب الدار'
+    house[hidden] = None
+    write_json(base_path, base)
+    write_json(house_path, house)
+    layers = [Layer('house', str(house_path))]
+    matcher = load_dictionary(base_path, layers=layers)
+    for _ in range(4):
+        house = edited(rng, {key: value for key, value in house.items() if value is not None})
+        write_json(house_path, house)
+        matcher = reload_dictionary(matcher, base_path, layers=layers).matcher
+        fresh = load_dictionary(base_path, use_cache=False, layers=layers)
+        texts = [decorate(rng, random_text(rng, {**base, **house}, 300)) for _ in range(3)]
+        assert_same_results(matcher, fresh, texts)
+        assert_same_results(load_dictionary(base_path, layers=layers), fresh, texts)
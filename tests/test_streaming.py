@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""الفحص المتدفق على دفعات مقارناً بالفحص الكامل للنص نفسه"""
+
+import random
+
+import pytest
+
+from style_checker.matcher import OVERLAP_POLICIES, Matcher
+from style_checker.normalize import DEFAULT_NORMALIZER
+from style_checker.streaming import iter_errors
+
+from reference import decorate, random_corrections, random_text
+
+SEEDS = range(20)
+
+
+def chunked(text, rng, largest):
+    """تقسيم النص على دفعات بأطوال عشوائية، قد تفصل الحرف عن تشكيله"""
+    chunks = []
+    index = 0
+    while index < len(text):
+        size = rng.randint(1, largest)
+        chunks.append(text[index:index + size])
+        index += size
+    return chunks
+
+
+def ordered(errors):
+    return sorted(errors, key=lambda error: (error['position'], len(error['word'])))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('overlap', OVERLAP_POLICIES)
+@pytest.mark.parametrize('normalizer', [None, DEFAULT_NORMALIZER], ids=['plain', 'normalized'])
+def test_streaming_matches_full_scan(seed, overlap, normalizer):
+    rng = random.Random(seed)
+    corrections = random_corrections(rng, rng.randint(1, 30))
+    text = random_text(rng, corrections, 600)
+    if normalizer is not None:
+        text = decorate(rng, text)
+    matcher = Matcher(corrections, normalizer)
+    expected = ordered(matcher.find_errors(text, overlap))
+    for largest in (1, 3, 16, 200):
+        found = list(iter_errors(matcher, chunked(text, rng, largest), overlap=overlap))
+        assert ordered(found) == expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_streaming_byte_offsets(seed):
+    rng = random.Random(seed)
+    corrections = random_corrections(rng, 20)
+    text = decorate(rng, random_text(rng, corrections, 600))
+    matcher = Matcher(corrections, DEFAULT_NORMALIZER)
+    found = list(iter_errors(matcher, chunked(text, rng, 16), encoding='utf-8'))
+    assert found
+    for error in found:
+        assert error['byte_offset'] == len(text[:error['position']].encode('utf-8'))